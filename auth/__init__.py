@@ -1,8 +1,16 @@
-from .hash_password import hash_password, verify_password
+from .hash_password import (
+    hash_password,
+    verify_password,
+    hash_password_async,
+    verify_password_async,
+    hash_password_lote,
+    obtener_metricas_hash,
+)
 from .jwt_handler import (
     create_access_token,
     create_refresh_token,
     verify_token,
+    verify_token_cacheado,
 )
 from .dependencies import get_current_user
 
@@ -10,7 +18,12 @@ __all__ = [
     "get_current_user",
     "hash_password",
     "verify_password",
+    "hash_password_async",
+    "verify_password_async",
+    "hash_password_lote",
+    "obtener_metricas_hash",
     "create_access_token",
     "create_refresh_token",
     "verify_token",
+    "verify_token_cacheado",
 ]
@@ -1,20 +1,39 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from auth import verify_token
-from utils import get_usuario_by_id
-from constants import TokenData, UsuarioRespuesta, ROLES
+from auth import verify_token_cacheado
+from utils import get_usuario_by_id_async, get_usuario_indexado, cache_usuarios
+from constants import TokenData, UsuarioDB, UsuarioRespuesta, ROLES
 
 # Esquema de seguridad para Bearer tokens
 security = HTTPBearer()
 
+# Campos públicos del usuario (todos menos el hash de la contraseña)
+CAMPOS_USUARIO_RESPUESTA = tuple(UsuarioRespuesta.model_fields)
 
-def get_current_user(
+
+def usuario_respuesta(usuario: UsuarioDB | UsuarioRespuesta) -> UsuarioRespuesta:
+    """
+    Proyecta un usuario a UsuarioRespuesta sin volver a validar los campos.
+
+    El usuario ya se validó al guardarse; revalidarlo (en particular el
+    email) era la mayor parte del costo de cada solicitud autenticada.
+    """
+    return UsuarioRespuesta.model_construct(
+        **{campo: getattr(usuario, campo) for campo in CAMPOS_USUARIO_RESPUESTA}
+    )
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ) -> UsuarioRespuesta:
     """
     Dependencia para obtener el usuario actual desde el token JWT.
 
+    El usuario se busca en la cache del worker, luego en el índice
+    compartido entre workers y por último en el almacenamiento (en el pool,
+    sin bloquear el event loop).
+
     Args:
         credentials: Credenciales del header Authorization
 
@@ -25,7 +44,7 @@ def get_current_user(
         HTTPException: Si el token es inválido o el usuario no existe
     """
     token = credentials.credentials
-    token_data = verify_token(token, "access")
+    token_data = verify_token_cacheado(token, "access")
 
     if token_data is None:
         raise HTTPException(
@@ -34,7 +53,13 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    usuario = get_usuario_by_id(token_data.user_id)
+    usuario = cache_usuarios.obtener(token_data.user_id) or get_usuario_indexado(
+        token_data.user_id
+    )
+    if usuario is None:
+        usuario = await cache_usuarios.obtener_o_cargar_async(
+            token_data.user_id, get_usuario_by_id_async
+        )
     if usuario is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -49,17 +74,7 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Convertir UsuarioDB a UsuarioRespuesta
-    return UsuarioRespuesta(
-        id=usuario.id,
-        email=usuario.email,
-        nombre=usuario.nombre,
-        apellido=usuario.apellido,
-        rol=usuario.rol,
-        fecha_creacion=usuario.fecha_creacion,
-        fecha_actualizacion=usuario.fecha_actualizacion,
-        activo=usuario.activo,
-    )
+    return usuario_respuesta(usuario)
 
 
 def get_current_token_data(
@@ -78,7 +93,7 @@ def get_current_token_data(
         HTTPException: Si el token es inválido
     """
     token = credentials.credentials
-    token_data = verify_token(token, "access")
+    token_data = verify_token_cacheado(token, "access")
 
     if token_data is None:
         raise HTTPException(
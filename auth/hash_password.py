@@ -1,5 +1,17 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
+from constants import HASH_WORKERS, HASH_MAX_PENDIENTES
+from logs.metricas import bcrypt_segundos
+
+T = TypeVar("T")
+
 # Configuración del contexto de hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -29,3 +41,140 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         True si la contraseña es correcta, False en caso contrario
     """
     return pwd_context.verify(plain_password, hashed_password)
+
+
+class MetricasHash:
+    """Métricas del pool de hashing: profundidad de cola y latencias."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pendientes = 0
+        self.max_pendientes_observado = 0
+        self.completados = 0
+        self.rechazados = 0
+        self.segundos_espera = 0.0
+        self.segundos_hash = 0.0
+        self.max_segundos_hash = 0.0
+
+    def snapshot(self) -> dict[str, float]:
+        """Copia consistente de las métricas actuales."""
+        with self._lock:
+            completados = self.completados or 1
+            return {
+                "workers": HASH_WORKERS,
+                "max_pendientes": HASH_MAX_PENDIENTES,
+                "pendientes": self.pendientes,
+                "max_pendientes_observado": self.max_pendientes_observado,
+                "completados": self.completados,
+                "rechazados": self.rechazados,
+                "promedio_espera_ms": self.segundos_espera / completados * 1000,
+                "promedio_hash_ms": self.segundos_hash / completados * 1000,
+                "max_hash_ms": self.max_segundos_hash * 1000,
+            }
+
+
+metricas_hash = MetricasHash()
+
+# bcrypt libera el GIL, así que un pool de hilos aprovecha varios núcleos
+_pool_hash = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+
+
+def _medir(funcion: Callable[..., T], encolado: float, *args) -> T:
+    inicio = time.perf_counter()
+    try:
+        return funcion(*args)
+    finally:
+        fin = time.perf_counter()
+        bcrypt_segundos.observar((funcion.__name__,), fin - inicio)
+        with metricas_hash._lock:
+            metricas_hash.segundos_espera += inicio - encolado
+            metricas_hash.segundos_hash += fin - inicio
+            metricas_hash.max_segundos_hash = max(
+                metricas_hash.max_segundos_hash, fin - inicio
+            )
+
+
+async def _ejecutar_en_pool(funcion: Callable[..., T], *args) -> T:
+    """
+    Ejecuta una función de hashing en el pool sin bloquear el event loop.
+
+    Raises:
+        HTTPException: 503 si ya hay HASH_MAX_PENDIENTES operaciones en cola
+    """
+    with metricas_hash._lock:
+        if metricas_hash.pendientes >= HASH_MAX_PENDIENTES:
+            metricas_hash.rechazados += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servidor ocupado, intente nuevamente",
+                headers={"Retry-After": "1"},
+            )
+        metricas_hash.pendientes += 1
+        metricas_hash.max_pendientes_observado = max(
+            metricas_hash.max_pendientes_observado, metricas_hash.pendientes
+        )
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _pool_hash, _medir, funcion, time.perf_counter(), *args
+        )
+    finally:
+        with metricas_hash._lock:
+            metricas_hash.pendientes -= 1
+            metricas_hash.completados += 1
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hashea una contraseña en el pool de hashing sin bloquear el event loop.
+
+    Args:
+        password: La contraseña en texto plano
+
+    Returns:
+        El hash de la contraseña
+    """
+    return await _ejecutar_en_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verifica una contraseña en el pool de hashing sin bloquear el event loop.
+
+    Args:
+        plain_password: La contraseña en texto plano
+        hashed_password: El hash almacenado de la contraseña
+
+    Returns:
+        True si la contraseña es correcta, False en caso contrario
+    """
+    return await _ejecutar_en_pool(verify_password, plain_password, hashed_password)
+
+
+async def hash_password_lote(password: str) -> str:
+    """
+    Hashea una contraseña de una importación masiva en el pool de hashing.
+
+    No aplica el límite HASH_MAX_PENDIENTES: quien llama debe acotar cuántos
+    hashes tiene en vuelo (ver HASH_LOTE_EN_VUELO).
+
+    Args:
+        password: La contraseña en texto plano
+
+    Returns:
+        El hash de la contraseña
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(
+            _pool_hash, _medir, hash_password, time.perf_counter(), password
+        )
+    finally:
+        with metricas_hash._lock:
+            metricas_hash.completados += 1
+
+
+def obtener_metricas_hash() -> dict[str, float]:
+    """Obtiene las métricas actuales del pool de hashing."""
+    return metricas_hash.snapshot()
@@ -0,0 +1,251 @@
+import asyncio
+import codecs
+import csv
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Optional, Union
+
+from pydantic import ValidationError
+
+from constants import (
+    HASH_LOTE_EN_VUELO,
+    IMPORTACION_LOTE,
+    IMPORTACION_MAX_FILAS,
+    UsuarioCrear,
+    UsuarioDB,
+)
+from utils import (
+    ejecutar_almacenamiento,
+    get_emails_registrados,
+    get_next_usuario_ids,
+    save_usuarios,
+)
+
+from .hash_password import hash_password_lote
+
+# Content-Type aceptados y formato de cada uno
+FORMATOS_IMPORTACION = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+@dataclass
+class ResultadoFila:
+    """Resultado de importar una fila: el ID creado o el motivo del error."""
+
+    fila: int
+    email: Optional[str] = None
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+    def como_dict(self) -> dict[str, Any]:
+        if self.error is not None:
+            return {
+                "fila": self.fila,
+                "email": self.email,
+                "estado": "error",
+                "detalle": self.error,
+            }
+        return {
+            "fila": self.fila,
+            "email": self.email,
+            "estado": "creado",
+            "id": self.id,
+        }
+
+
+def formato_importacion(content_type: str) -> Optional[str]:
+    """Formato ("csv" o "ndjson") según el Content-Type, o None si no se acepta."""
+    return FORMATOS_IMPORTACION.get(content_type.split(";")[0].strip().lower())
+
+
+async def lineas(contenido: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Divide en líneas un cuerpo recibido por partes, sin juntarlo entero."""
+    decodificador = codecs.getincrementaldecoder("utf-8-sig")()
+    resto = ""
+    async for parte in contenido:
+        *completas, resto = (resto + decodificador.decode(parte)).split("\n")
+        for linea in completas:
+            yield linea.rstrip("\r")
+    resto += decodificador.decode(b"", final=True)
+    if resto:
+        yield resto.rstrip("\r")
+
+
+async def filas(
+    texto: AsyncIterator[str], formato: str
+) -> AsyncIterator[tuple[int, Union[dict[str, Any], str]]]:
+    """
+    Convierte cada línea en un diccionario de campos.
+
+    En CSV la primera línea no vacía es el encabezado y cada fila ocupa una
+    sola línea. Las líneas vacías se ignoran.
+
+    Yields:
+        Tuplas (número de fila, campos) o (número de fila, mensaje de error)
+    """
+    columnas: Optional[list[str]] = None
+    numero = 0
+    async for linea in texto:
+        if not linea.strip():
+            continue
+        if formato == "csv":
+            valores = next(csv.reader([linea]))
+            if columnas is None:
+                columnas = [c.strip().lower() for c in valores]
+                continue
+            numero += 1
+            if len(valores) != len(columnas):
+                yield numero, f"Se esperaban {len(columnas)} columnas"
+            else:
+                yield numero, dict(zip(columnas, (v.strip() for v in valores)))
+        else:
+            numero += 1
+            try:
+                campos = json.loads(linea)
+            except json.JSONDecodeError:
+                yield numero, "JSON inválido"
+                continue
+            if isinstance(campos, dict):
+                yield numero, campos
+            else:
+                yield numero, "Cada línea debe ser un objeto JSON"
+
+
+def _error_validacion(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(c) for c in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+
+async def importar_usuarios(
+    contenido: AsyncIterator[bytes], formato: str, roles_permitidos: list[str]
+) -> AsyncIterator[ResultadoFila]:
+    """
+    Importa usuarios desde un archivo CSV o NDJSON recibido en streaming.
+
+    Las filas se validan con UsuarioCrear a medida que llegan y se procesan
+    en lotes de IMPORTACION_LOTE: los emails de cada lote se comparan
+    contra los usuarios registrados con una sola búsqueda y contra los del
+    propio archivo, las contraseñas se hashean en el pool de hashing con a
+    lo sumo HASH_LOTE_EN_VUELO en vuelo y los usuarios nuevos del lote se
+    guardan en una sola escritura, con IDs reservados de una vez. El
+    resultado de cada fila se entrega apenas se guarda su lote.
+
+    Args:
+        contenido: Cuerpo de la solicitud, por partes
+        formato: "csv" o "ndjson"
+        roles_permitidos: Roles que pueden asignarse a los usuarios importados
+
+    Yields:
+        Resultado de cada fila, en orden
+
+    Raises:
+        ValueError: Si el archivo supera IMPORTACION_MAX_FILAS filas; los
+            lotes anteriores ya quedaron guardados
+    """
+    emails: set[str] = set()
+    lote: list[tuple[ResultadoFila, Optional[UsuarioCrear]]] = []
+
+    async for numero, campos in filas(lineas(contenido), formato):
+        if numero > IMPORTACION_MAX_FILAS:
+            raise ValueError(
+                f"El archivo supera el máximo de {IMPORTACION_MAX_FILAS} filas"
+            )
+        resultado = ResultadoFila(fila=numero)
+        datos = None
+        if isinstance(campos, str):
+            resultado.error = campos
+        else:
+            resultado.email = campos.get("email")
+            try:
+                datos = UsuarioCrear(**campos)
+            except ValidationError as e:
+                resultado.error = _error_validacion(e)
+        lote.append((resultado, datos))
+
+        if len(lote) >= IMPORTACION_LOTE:
+            await _importar_lote(lote, emails, roles_permitidos)
+            for resultado, _ in lote:
+                yield resultado
+            lote = []
+
+    if lote:
+        await _importar_lote(lote, emails, roles_permitidos)
+        for resultado, _ in lote:
+            yield resultado
+
+
+async def _importar_lote(
+    lote: list[tuple[ResultadoFila, Optional[UsuarioCrear]]],
+    emails: set[str],
+    roles_permitidos: list[str],
+):
+    """
+    Decide y guarda las filas validadas de un lote, completando sus resultados.
+
+    Args:
+        lote: Filas del lote con sus datos, o None si ya tienen error
+        emails: Emails aceptados en los lotes anteriores del archivo; se
+            agregan los de este lote
+        roles_permitidos: Roles que pueden asignarse a los usuarios importados
+    """
+    registrados = await ejecutar_almacenamiento(
+        get_emails_registrados, [datos.email for _, datos in lote if datos]
+    )
+    validos: list[tuple[ResultadoFila, UsuarioCrear, asyncio.Task]] = []
+    en_vuelo = asyncio.Semaphore(HASH_LOTE_EN_VUELO)
+
+    async def hashear(password: str) -> str:
+        try:
+            return await hash_password_lote(password)
+        finally:
+            en_vuelo.release()
+
+    try:
+        for resultado, datos in lote:
+            if datos is None:
+                continue
+            email = datos.email.lower()
+            if email in emails:
+                resultado.error = "Email repetido en el archivo"
+            elif email in registrados:
+                resultado.error = "El email ya está registrado"
+            elif datos.rol not in roles_permitidos:
+                resultado.error = f"Rol no permitido: {datos.rol}"
+            else:
+                emails.add(email)
+                await en_vuelo.acquire()
+                tarea = asyncio.create_task(hashear(datos.password))
+                validos.append((resultado, datos, tarea))
+
+        hashes = await asyncio.gather(*(tarea for _, _, tarea in validos))
+    except BaseException:
+        for _, _, tarea in validos:
+            tarea.cancel()
+        raise
+    if not validos:
+        return
+
+    ids = await ejecutar_almacenamiento(get_next_usuario_ids, len(validos))
+    ahora = datetime.now(timezone.utc)
+    nuevos = []
+    for (resultado, datos, _), usuario_id, password_hash in zip(validos, ids, hashes):
+        # Los datos ya se validaron con UsuarioCrear; no se vuelven a validar
+        usuario = UsuarioDB.model_construct(
+            id=usuario_id,
+            email=datos.email,
+            nombre=datos.nombre,
+            apellido=datos.apellido,
+            rol=datos.rol,
+            password_hash=password_hash,
+            fecha_creacion=ahora,
+            activo=True,
+        )
+        resultado.id = usuario.id
+        nuevos.append(usuario)
+    await ejecutar_almacenamiento(save_usuarios, nuevos)
@@ -1,3 +1,5 @@
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional, cast, Literal
 from jose import JWTError, jwt
@@ -7,8 +9,14 @@ from constants import (
     ALGORITHM,
     ACCESS_TOKEN_EXPIRE_MINUTES,
     REFRESH_TOKEN_EXPIRE_DAYS,
+    TOKEN_CACHE_MAX,
     TokenData,
 )
+from logs.metricas import jwt_segundos
+from utils.cache import CacheLRU
+
+# Tokens ya verificados, por digest del token, hasta su expiración
+_cache_tokens: CacheLRU = CacheLRU(TOKEN_CACHE_MAX)
 
 
 def create_refresh_token(data: dict):
@@ -50,6 +58,32 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+def _decodificar_token(
+    token: str, token_type: Literal["access", "refresh"]
+) -> Optional[tuple[TokenData, Optional[float]]]:
+    """Verifica un token JWT y retorna sus datos junto a su expiración (epoch)."""
+    inicio = time.perf_counter()
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    finally:
+        jwt_segundos.observar((), time.perf_counter() - inicio)
+
+    if payload.get("type") != token_type:
+        return None
+
+    user_id = cast(int, payload.get("user_id"))
+    email = cast(str, payload.get("email"))
+    rol = cast(str, payload.get("rol"))
+
+    if None in (user_id, email, rol):
+        return None
+
+    exp = payload.get("exp")
+    return TokenData(user_id=user_id, email=email, rol=rol), exp
+
+
 def verify_token(
     token: str, token_type: Literal["access", "refresh"] = "access"
 ) -> Optional[TokenData]:
@@ -63,20 +97,36 @@ def verify_token(
     Returns:
         TokenData si el token es válido, None en caso contrario
     """
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        token_type_payload = payload.get("type")
+    resultado = _decodificar_token(token, token_type)
+    return resultado[0] if resultado else None
 
-        if token_type_payload != token_type:
-            return None
 
-        user_id = cast(int, payload.get("user_id"))
-        email = cast(str, payload.get("email"))
-        rol = cast(str, payload.get("rol"))
+def verify_token_cacheado(
+    token: str, token_type: Literal["access", "refresh"] = "access"
+) -> Optional[TokenData]:
+    """
+    Verifica un token JWT usando una cache LRU de tokens ya verificados.
 
-        if None in (user_id, email, rol):
-            return None
+    La cache se indexa por el SHA-256 del token y cada entrada vive hasta el
+    `exp` del token, así que un token repetido no vuelve a decodificarse ni
+    a verificar su firma. Los tokens inválidos no se cachean.
 
-        return TokenData(user_id=user_id, email=email, rol=rol)
-    except JWTError:
+    Args:
+        token: El token JWT a verificar
+        token_type: Tipo de token esperado ("access" o "refresh")
+
+    Returns:
+        TokenData si el token es válido, None en caso contrario
+    """
+    clave = (hashlib.sha256(token.encode("utf-8")).digest(), token_type)
+    token_data = _cache_tokens.obtener(clave)
+    if token_data is not None:
+        return token_data
+
+    resultado = _decodificar_token(token, token_type)
+    if resultado is None:
         return None
+    token_data, exp = resultado
+    if exp is not None:
+        _cache_tokens.guardar(clave, token_data, expira=float(exp))
+    return token_data
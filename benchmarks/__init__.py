@@ -0,0 +1,21 @@
+"""
+Benchmarks de rendimiento.
+
+Se ejecutan como módulos desde la raíz del repositorio, por ejemplo:
+    python -m benchmarks.bench_suizo
+
+`constants` exige la configuración de JWT: si no está definida se usan
+valores de prueba (bench_api firma y valida tokens reales con ellos).
+Algunos benchmarks usan dependencias de desarrollo:
+    pip install -r requirements-dev.txt
+"""
+
+import os
+
+for _variable, _valor in (
+    ("SECRET_KEY", "benchmark"),
+    ("ALGORITHM", "HS256"),
+    ("ACCESS_TOKEN_EXPIRE_MINUTES", "30"),
+    ("REFRESH_TOKEN_EXPIRE_DAYS", "7"),
+):
+    os.environ.setdefault(_variable, _valor)
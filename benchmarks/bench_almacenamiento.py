@@ -0,0 +1,350 @@
+"""
+Microbenchmarks del almacenamiento sobre un dataset sintético.
+
+Mide cada función de utils (lecturas puntuales, por índice, paginadas,
+recorridos completos, escrituras y reserva de IDs) en cada backend
+(json, journal y sqlite), además de load_json/save_json sobre cada
+archivo. Cada backend corre en un proceso aparte (STORAGE_BACKEND se lee
+al importar) y sobre una copia del dataset, así las escrituras no lo
+modifican. Con sqlite la copia se importa primero a una base nueva.
+
+El dataset se genera con benchmarks.generar_datos.
+
+Uso:
+    python -m benchmarks.generar_datos --escala 100k --destino datos_sinteticos
+    python -m benchmarks.bench_almacenamiento --datos datos_sinteticos
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKENDS = ("json", "journal", "sqlite")
+COLECCIONES = ("usuarios", "torneos", "inscripciones", "partidas", "ratings")
+
+
+def medir(funcion: Callable, argumentos: list[tuple]) -> dict[str, Any]:
+    """Llama a `funcion` con cada tupla de argumentos y mide el tiempo."""
+    tiempos = []
+    for args in argumentos:
+        inicio = time.perf_counter()
+        funcion(*args)
+        tiempos.append(time.perf_counter() - inicio)
+    tiempos.sort()
+    total = sum(tiempos)
+    return {
+        "operaciones": len(tiempos),
+        "us_por_operacion": round(total / len(tiempos) * 1e6, 1),
+        "p99_us": round(
+            tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.99))] * 1e6, 1
+        ),
+        "segundos": round(total, 4),
+    }
+
+
+def medir_una_vez(funcion: Callable) -> dict[str, Any]:
+    inicio = time.perf_counter()
+    funcion()
+    return {"segundos": round(time.perf_counter() - inicio, 4)}
+
+
+def recorrer(iterador) -> int:
+    return sum(1 for _ in iterador)
+
+
+def correr_backend(backend: str, lecturas: int, escrituras: int) -> dict[str, Any]:
+    """Corre todas las mediciones en este proceso, sobre `./data`."""
+    import utils
+    from constants import InscripcionDB, PartidaDB, RatingDB, UsuarioDB
+    from utils.json_utils import load_json, save_json
+
+    resultado: dict[str, Any] = {"backend": backend}
+    rng = random.Random(1)
+
+    # load_json de cada archivo (también da los tamaños y las claves a consultar)
+    cantidades, muestras, primitivas = {}, {}, {}
+    for nombre in COLECCIONES:
+        ruta = os.path.join("data", f"{nombre}.json")
+        inicio = time.perf_counter()
+        registros = load_json(ruta)
+        segundos = time.perf_counter() - inicio
+        cantidades[nombre] = len(registros)
+        muestras[nombre] = [rng.choice(registros) for _ in range(lecturas)]
+        primitivas[f"load_json_{nombre}"] = {
+            "segundos": round(segundos, 4),
+            "mb": round(os.path.getsize(ruta) / 1e6, 1),
+        }
+        if backend == "json":
+            primitivas[f"save_json_{nombre}"] = medir_una_vez(
+                lambda: save_json(ruta + ".bench", registros)
+            )
+            os.remove(ruta + ".bench")
+        if backend == "sqlite":
+            from utils.sqlite_utils import get_conexion, insertar_filas
+
+            conexion = get_conexion()
+            inicio = time.perf_counter()
+            with conexion:
+                insertar_filas(conexion, nombre, registros)
+            primitivas[f"importar_sqlite_{nombre}"] = {
+                "segundos": round(time.perf_counter() - inicio, 4)
+            }
+        del registros
+    resultado["registros"] = cantidades
+    resultado["primitivas"] = primitivas
+
+    usuarios = muestras["usuarios"]
+    torneos = muestras["torneos"]
+    inscripciones = muestras["inscripciones"]
+    partidas = muestras["partidas"]
+    ratings = muestras["ratings"]
+    ahora = datetime.now(timezone.utc)
+
+    # Primera lectura: carga la colección (en json/journal) o abre la base
+    resultado["primer_acceso"] = medir_una_vez(
+        lambda: utils.get_usuario_by_id(usuarios[0]["id"])
+    )
+    for nombre, cargar in (
+        ("torneos", lambda: utils.get_torneo_by_id(1)),
+        ("inscripciones", lambda: utils.get_inscripciones_by_torneo(1)),
+        ("partidas", lambda: utils.get_partida_by_id(1)),
+        ("ratings", lambda: utils.get_ratings_by_usuario(1)),
+    ):
+        resultado["primer_acceso_" + nombre] = medir_una_vez(cargar)
+
+    resultado["lecturas"] = {
+        "get_usuario_by_id": medir(
+            utils.get_usuario_by_id, [(u["id"],) for u in usuarios]
+        ),
+        "get_usuario_by_email": medir(
+            utils.get_usuario_by_email, [(u["email"],) for u in usuarios]
+        ),
+        "get_torneo_by_id": medir(
+            utils.get_torneo_by_id, [(t["id"],) for t in torneos]
+        ),
+        "get_torneos_by_organizador": medir(
+            utils.get_torneos_by_organizador, [(t["organizador_id"],) for t in torneos]
+        ),
+        "get_torneos_pagina": medir(
+            utils.get_torneos_pagina, [(t["id"], 50) for t in torneos]
+        ),
+        "get_inscripciones_by_usuario": medir(
+            utils.get_inscripciones_by_usuario,
+            [(i["usuario_id"],) for i in inscripciones],
+        ),
+        "get_inscripciones_by_torneo": medir(
+            utils.get_inscripciones_by_torneo,
+            [(i["torneo_id"],) for i in inscripciones],
+        ),
+        "get_inscripciones_pagina": medir(
+            utils.get_inscripciones_pagina,
+            [(i["torneo_id"], 0, 50) for i in inscripciones],
+        ),
+        "get_partida_by_id": medir(
+            utils.get_partida_by_id, [(p["id"],) for p in partidas]
+        ),
+        "get_partidas_by_torneo": medir(
+            utils.get_partidas_by_torneo, [(p["torneo_id"],) for p in partidas]
+        ),
+        "get_partidas_pagina": medir(
+            utils.get_partidas_pagina, [(p["torneo_id"], 0, 50) for p in partidas]
+        ),
+        "get_ratings_by_usuario": medir(
+            utils.get_ratings_by_usuario, [(r["usuario_id"],) for r in ratings]
+        ),
+    }
+
+    resultado["recorridos"] = {
+        "get_torneos": medir_una_vez(utils.get_torneos),
+        "iterar_partidas": medir_una_vez(lambda: recorrer(utils.iterar_partidas())),
+        "iterar_ratings": medir_una_vez(lambda: recorrer(utils.iterar_ratings())),
+    }
+
+    # Escrituras: en json cada una reescribe el archivo entero
+    lote = 100
+
+    def nuevo_usuario(i: int) -> UsuarioDB:
+        return UsuarioDB(
+            id=utils.get_next_usuario_id(),
+            email=f"bench{i}.{time.time_ns()}@example.com",
+            nombre="Bench",
+            apellido="Mark",
+            password_hash=usuarios[0]["password_hash"],
+            fecha_creacion=ahora,
+        )
+
+    def nueva_partida() -> PartidaDB:
+        return PartidaDB(
+            id=utils.get_next_partida_id(),
+            torneo_id=partidas[0]["torneo_id"],
+            ronda=1,
+            jugador_blancas_id=partidas[0]["jugador_blancas_id"],
+            jugador_negras_id=partidas[0]["jugador_negras_id"],
+        )
+
+    def nuevo_rating() -> RatingDB:
+        return RatingDB(
+            id=utils.get_next_rating_id(),
+            usuario_id=ratings[0]["usuario_id"],
+            rating=1500,
+            fecha=ahora,
+        )
+
+    resultado["escrituras"] = {
+        "save_usuario": medir(
+            utils.save_usuario, [(nuevo_usuario(i),) for i in range(escrituras)]
+        ),
+        f"save_usuarios_x{lote}": medir(
+            utils.save_usuarios,
+            [([nuevo_usuario(i) for i in range(lote)],) for _ in range(escrituras)],
+        ),
+        "update_usuario": medir(
+            utils.update_usuario,
+            [(u["id"], {"nombre": "Cambiado"}) for u in usuarios[:escrituras]],
+        ),
+        "update_torneo": medir(
+            utils.update_torneo,
+            [(t["id"], {"descripcion": "Cambiado"}) for t in torneos[:escrituras]],
+        ),
+        "save_inscripcion": medir(
+            utils.save_inscripcion,
+            [
+                (
+                    InscripcionDB(
+                        id=utils.get_next_inscripcion_id(),
+                        usuario_id=usuarios[i]["id"],
+                        torneo_id=torneos[i]["id"],
+                    ),
+                )
+                for i in range(escrituras)
+            ],
+        ),
+        f"update_inscripciones_x{lote}": medir(
+            utils.update_inscripciones,
+            [
+                ({i["id"]: {"puntos": 1.0} for i in inscripciones[:lote]},)
+                for _ in range(escrituras)
+            ],
+        ),
+        "save_partida": medir(
+            utils.save_partida, [(nueva_partida(),) for _ in range(escrituras)]
+        ),
+        f"save_partidas_x{lote}": medir(
+            utils.save_partidas,
+            [([nueva_partida() for _ in range(lote)],) for _ in range(escrituras)],
+        ),
+        f"update_partidas_x{lote}": medir(
+            utils.update_partidas,
+            [
+                ({p["id"]: {"resultado": "tablas"} for p in partidas[:lote]},)
+                for _ in range(escrituras)
+            ],
+        ),
+        "save_rating": medir(
+            utils.save_rating, [(nuevo_rating(),) for _ in range(escrituras)]
+        ),
+        f"save_ratings_x{lote}": medir(
+            utils.save_ratings,
+            [([nuevo_rating() for _ in range(lote)],) for _ in range(escrituras)],
+        ),
+    }
+
+    resultado["ids"] = {
+        nombre: medir(funcion, [()] * lecturas)
+        for nombre, funcion in (
+            ("get_next_usuario_id", utils.get_next_usuario_id),
+            ("get_next_torneo_id", utils.get_next_torneo_id),
+            ("get_next_inscripcion_id", utils.get_next_inscripcion_id),
+            ("get_next_partida_id", utils.get_next_partida_id),
+            ("get_next_rating_id", utils.get_next_rating_id),
+        )
+    }
+    return resultado
+
+
+def lanzar_backend(
+    backend: str, datos: str, lecturas: int, escrituras: int
+) -> dict[str, Any]:
+    """Corre un backend en un proceso aparte, sobre una copia del dataset."""
+    directorio = tempfile.mkdtemp(prefix=f"bench_almacenamiento_{backend}_")
+    try:
+        shutil.copytree(
+            os.path.join(datos, "data"),
+            os.path.join(directorio, "data"),
+            ignore=shutil.ignore_patterns("*.journal", "*.seq", "*.db*", "*.lock"),
+        )
+        entorno = dict(os.environ)
+        entorno["STORAGE_BACKEND"] = backend
+        entorno.pop("SQLITE_PATH", None)
+        entorno["PYTHONPATH"] = os.pathsep.join(
+            p for p in (RAIZ, entorno.get("PYTHONPATH")) if p
+        )
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.bench_almacenamiento",
+                "--interno",
+                backend,
+                "--lecturas",
+                str(lecturas),
+                "--escrituras",
+                str(escrituras),
+            ],
+            cwd=directorio,
+            env=entorno,
+            check=True,
+        )
+        with open(os.path.join(directorio, "resultado.json"), encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--datos", default="datos_sinteticos")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--lecturas", type=int, default=1000)
+    parser.add_argument("--escrituras", type=int, default=10)
+    parser.add_argument("--salida", help="Archivo donde guardar el JSON")
+    # Uso interno: correr un backend en este proceso
+    parser.add_argument("--interno", choices=BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno:
+        # En un archivo: stdout puede tener mensajes de error del almacenamiento
+        resultado = correr_backend(args.interno, args.lecturas, args.escrituras)
+        with open("resultado.json", "w", encoding="utf-8") as f:
+            json.dump(resultado, f)
+        return
+
+    resultado = {
+        "datos": os.path.abspath(args.datos),
+        "backends": {
+            backend: lanzar_backend(
+                backend, os.path.abspath(args.datos), args.lecturas, args.escrituras
+            )
+            for backend in args.backends
+        },
+    }
+    salida = json.dumps(resultado, indent=2)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(salida + "\n")
+    print(salida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Benchmark de carga de la API: throughput y latencias p50/p95/p99.
+
+Corre escenarios sobre las rutas más usadas, en orden, cada uno con la
+concurrencia indicada:
+
+- registro: ráfaga de POST /auth/register (usuarios nuevos)
+- login: tormenta de POST /auth/login con los usuarios registrados
+- me: consultas repetidas de GET /auth/me con los tokens obtenidos
+- refresh: POST /auth/refresh con los refresh tokens
+
+Modos:
+
+- asgi: despacha las solicitudes a `main.app` en el mismo proceso
+  (httpx.ASGITransport, sin red). Mide el costo del framework y la API.
+- uvicorn: levanta `uvicorn main:app --workers N` en localhost y le envía
+  las solicitudes por HTTP. Mide el servicio como se despliega.
+
+En ambos modos los datos se crean en un directorio temporal. La salida es
+JSON (por stdout o en --salida) para comparar corridas entre versiones.
+Requiere httpx, además de las dependencias de la API (ver
+requirements-dev.txt).
+
+Uso:
+    python -m benchmarks.bench_api --modo asgi
+    python -m benchmarks.bench_api --modo uvicorn --workers 4 --concurrencia 64
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Awaitable, Callable
+
+import httpx
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "benchmark-1234"
+
+
+def percentil(ordenados: list[float], p: float) -> float:
+    """Percentil p (0-100) por rango más cercano de una lista ordenada."""
+    if not ordenados:
+        return 0.0
+    indice = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+async def ejecutar(
+    solicitudes: int,
+    concurrencia: int,
+    solicitud: Callable[[int], Awaitable[httpx.Response]],
+) -> tuple[dict, list[httpx.Response]]:
+    """
+    Envía `solicitudes` con a lo sumo `concurrencia` en vuelo y mide cada una.
+
+    Returns:
+        Tupla (métricas del escenario, respuestas en el orden de envío)
+    """
+    latencias: list[float] = [0.0] * solicitudes
+    respuestas: list[httpx.Response] = [None] * solicitudes  # type: ignore
+    siguiente = iter(range(solicitudes))
+
+    async def trabajador():
+        for i in siguiente:
+            inicio = time.perf_counter()
+            respuestas[i] = await solicitud(i)
+            latencias[i] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    segundos = time.perf_counter() - inicio
+
+    ordenadas = sorted(latencias)
+    codigos = Counter(r.status_code for r in respuestas)
+    metricas = {
+        "solicitudes": solicitudes,
+        "concurrencia": concurrencia,
+        "segundos": round(segundos, 3),
+        "solicitudes_por_segundo": round(solicitudes / segundos, 1),
+        "latencia_ms": {
+            "p50": round(percentil(ordenadas, 50) * 1000, 2),
+            "p95": round(percentil(ordenadas, 95) * 1000, 2),
+            "p99": round(percentil(ordenadas, 99) * 1000, 2),
+            "max": round(ordenadas[-1] * 1000, 2),
+        },
+        "codigos": {str(c): n for c, n in sorted(codigos.items())},
+        "errores": sum(n for c, n in codigos.items() if c >= 400),
+    }
+    return metricas, respuestas
+
+
+async def correr_escenarios(
+    cliente: httpx.AsyncClient, args: argparse.Namespace
+) -> dict:
+    resultados = {}
+    prefijo = f"bench{time.time_ns()}"
+
+    # Registro: crea los usuarios que usan los demás escenarios
+    def registrar(i: int):
+        return cliente.post(
+            "/auth/register",
+            json={
+                "email": f"{prefijo}.{i}@example.com",
+                "password": PASSWORD,
+                "nombre": "Bench",
+                "apellido": f"Usuario{i}",
+            },
+        )
+
+    metricas, respuestas = await ejecutar(args.registros, args.concurrencia, registrar)
+    resultados["registro"] = metricas
+    emails = [
+        f"{prefijo}.{i}@example.com"
+        for i, r in enumerate(respuestas)
+        if r.status_code == 201
+    ]
+    if not emails:
+        raise RuntimeError("Ningún registro fue exitoso; no se puede continuar")
+
+    # Login: reparte las solicitudes entre los usuarios registrados
+    def login(i: int):
+        return cliente.post(
+            "/auth/login", json={"email": emails[i % len(emails)], "password": PASSWORD}
+        )
+
+    metricas, respuestas = await ejecutar(args.logins, args.concurrencia, login)
+    resultados["login"] = metricas
+    tokens = [r.json() for r in respuestas if r.status_code == 200]
+    if not tokens:
+        raise RuntimeError("Ningún login fue exitoso; no se puede continuar")
+
+    # /auth/me: consultas con los access tokens
+    def me(i: int):
+        token = tokens[i % len(tokens)]["access_token"]
+        return cliente.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+    resultados["me"], _ = await ejecutar(args.consultas, args.concurrencia, me)
+
+    # Refresh: cada solicitud usa un refresh token de los logins
+    def refresh(i: int):
+        token = tokens[i % len(tokens)]["refresh_token"]
+        return cliente.post("/auth/refresh", params={"refresh_token": token})
+
+    resultados["refresh"], _ = await ejecutar(
+        args.refreshes, args.concurrencia, refresh
+    )
+    return resultados
+
+
+async def modo_asgi(args: argparse.Namespace) -> dict:
+    # main usa rutas relativas (data/...): importarlo ya dentro del temporal
+    sys.path.insert(0, RAIZ)
+    import main
+
+    transporte = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(
+        transport=transporte, base_url="http://bench"
+    ) as cliente:
+        return await correr_escenarios(cliente, args)
+
+
+def puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def esperar_servidor(url: str, proceso: subprocess.Popen, timeout: float):
+    limite = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=url) as cliente:
+        while time.monotonic() < limite:
+            if proceso.poll() is not None:
+                raise RuntimeError("uvicorn terminó antes de quedar listo")
+            try:
+                if (await cliente.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"uvicorn no respondió en {timeout} s")
+
+
+async def modo_uvicorn(args: argparse.Namespace) -> dict:
+    puerto = puerto_libre()
+    url = f"http://127.0.0.1:{puerto}"
+    entorno = dict(os.environ)
+    entorno["PYTHONPATH"] = os.pathsep.join(
+        p for p in (RAIZ, entorno.get("PYTHONPATH")) if p
+    )
+    proceso = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(puerto),
+            "--workers",
+            str(args.workers),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        env=entorno,
+    )
+    try:
+        await esperar_servidor(url, proceso, timeout=60)
+        limites = httpx.Limits(
+            max_connections=args.concurrencia,
+            max_keepalive_connections=args.concurrencia,
+        )
+        async with httpx.AsyncClient(
+            base_url=url, limits=limites, timeout=120
+        ) as cliente:
+            return await correr_escenarios(cliente, args)
+    finally:
+        proceso.terminate()
+        try:
+            proceso.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proceso.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--modo", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrencia", type=int, default=32)
+    # El registro y el login hashean con bcrypt: son los escenarios más lentos
+    parser.add_argument("--registros", type=int, default=50)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--consultas", type=int, default=5000)
+    parser.add_argument("--refreshes", type=int, default=2000)
+    parser.add_argument("--salida", help="Archivo donde guardar el JSON")
+    args = parser.parse_args()
+
+    salida_path = os.path.abspath(args.salida) if args.salida else None
+    os.chdir(tempfile.mkdtemp(prefix="bench_api_"))
+    correr = modo_asgi if args.modo == "asgi" else modo_uvicorn
+    resultado = {
+        "modo": args.modo,
+        "workers": args.workers if args.modo == "uvicorn" else 1,
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "escenarios": asyncio.run(correr(args)),
+    }
+
+    salida = json.dumps(resultado, indent=2)
+    if salida_path:
+        with open(salida_path, "w", encoding="utf-8") as f:
+            f.write(salida + "\n")
+    print(salida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark de CPU por solicitud de GET /auth/me.
+
+Compara dos aplicaciones con el mismo token y el mismo almacenamiento:
+
+- antes: la ruta original, que valida el registro como UsuarioDB, copia
+  cada campo a un UsuarioRespuesta nuevo, lo revalida con el
+  response_model y lo serializa con json de la biblioteca estándar.
+- despues: la aplicación actual (registro confiable, proyección sin
+  revalidar y ORJSONResponse).
+
+Las solicitudes se despachan directamente a la aplicación ASGI, sin red,
+así el tiempo medido es solo el del framework y el código de la API. Los
+datos se crean en un directorio temporal.
+
+Uso:
+    python -m benchmarks.bench_auth_me --solicitudes 20000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Rutas relativas de datos (data/...) dentro de un directorio temporal
+sys.path.insert(0, os.getcwd())
+os.chdir(tempfile.mkdtemp(prefix="bench_auth_me_"))
+
+from datetime import datetime, timezone  # noqa: E402
+
+from fastapi import Depends, FastAPI, HTTPException, status  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+
+import main  # noqa: E402
+from auth import create_access_token, verify_token_cacheado  # noqa: E402
+from auth.dependencies import security  # noqa: E402
+from constants import UsuarioDB, UsuarioRespuesta  # noqa: E402
+from utils import get_next_usuario_id, save_usuario  # noqa: E402
+from utils.cache import CacheLRU  # noqa: E402
+from utils.json_utils import usuarios  # noqa: E402
+
+
+def app_anterior() -> FastAPI:
+    """Aplicación con la implementación original de /auth/me."""
+    app = FastAPI(default_response_class=JSONResponse)
+    cache = CacheLRU(100, ttl=60)
+
+    def cargar(user_id: int) -> UsuarioDB:
+        return UsuarioDB(**usuarios.por_id(user_id))
+
+    def get_current_user(
+        credentials: HTTPAuthorizationCredentials = Depends(security),
+    ) -> UsuarioRespuesta:
+        token_data = verify_token_cacheado(credentials.credentials, "access")
+        if token_data is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        usuario = cache.obtener_o_cargar(token_data.user_id, cargar)
+        return UsuarioRespuesta(
+            id=usuario.id,
+            email=usuario.email,
+            nombre=usuario.nombre,
+            apellido=usuario.apellido,
+            rol=usuario.rol,
+            fecha_creacion=usuario.fecha_creacion,
+            fecha_actualizacion=usuario.fecha_actualizacion,
+            activo=usuario.activo,
+        )
+
+    @app.get("/auth/me", response_model=UsuarioRespuesta)
+    async def me(current_user: UsuarioRespuesta = Depends(get_current_user)):
+        return current_user
+
+    return app
+
+
+async def medir(app, token: str, solicitudes: int) -> dict:
+    """Despacha `solicitudes` GET /auth/me y mide CPU y tiempo por solicitud."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/auth/me",
+        "raw_path": b"/auth/me",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+    cuerpo = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(mensaje):
+        if mensaje["type"] == "http.response.start":
+            assert mensaje["status"] == 200, mensaje
+        elif mensaje["type"] == "http.response.body":
+            cuerpo.append(mensaje["body"])
+
+    # Calentar caches (token, usuario, rutas)
+    for _ in range(100):
+        await app(dict(scope), receive, send)
+
+    inicio_cpu, inicio = time.process_time(), time.perf_counter()
+    for _ in range(solicitudes):
+        await app(dict(scope), receive, send)
+    cpu = time.process_time() - inicio_cpu
+    total = time.perf_counter() - inicio
+    return {
+        "cpu_us_por_solicitud": round(cpu / solicitudes * 1e6, 1),
+        "solicitudes_por_segundo": round(solicitudes / total),
+        "respuesta": json.loads(cuerpo[-1]),
+    }
+
+
+def main_bench(solicitudes: int) -> dict:
+    usuario = UsuarioDB(
+        id=get_next_usuario_id(),
+        email="benchmark@example.com",
+        nombre="Bench",
+        apellido="Mark",
+        password_hash="x" * 60,
+        fecha_creacion=datetime.now(timezone.utc),
+    )
+    save_usuario(usuario)
+    token = create_access_token(
+        {"user_id": usuario.id, "email": usuario.email, "rol": usuario.rol}
+    )
+
+    antes = asyncio.run(medir(app_anterior(), token, solicitudes))
+    despues = asyncio.run(medir(main.app, token, solicitudes))
+    # Ambas rutas deben responder exactamente lo mismo
+    assert antes.pop("respuesta") == despues.pop("respuesta")
+    return {
+        "solicitudes": solicitudes,
+        "antes": antes,
+        "despues": despues,
+        "mejora": round(
+            antes["cpu_us_por_solicitud"] / despues["cpu_us_por_solicitud"], 2
+        ),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--solicitudes", type=int, default=20000)
+    args = parser.parse_args()
+    print(json.dumps(main_bench(args.solicitudes), indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
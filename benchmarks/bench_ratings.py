@@ -0,0 +1,103 @@
+"""
+Benchmark del motor de ratings (Elo y Glicko-2).
+
+Genera un historial sintético de partidas repartidas en torneos, con
+resultados sorteados según una fuerza oculta de cada jugador, y mide:
+el replay histórico completo con cada sistema y el cálculo de un torneo
+grande al finalizar.
+
+Uso:
+    python -m benchmarks.bench_ratings --jugadores 100000 --partidas 2000000
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from ratings.elo import factores_k, variacion_elo
+from ratings.replay import Historial, recalcular
+
+
+def generar_historial(
+    jugadores: int, partidas: int, torneos: int, semilla: int
+) -> tuple[Historial, np.ndarray]:
+    """Historial sintético y la fuerza real de cada jugador."""
+    rng = np.random.default_rng(semilla)
+    fuerza = rng.normal(1500, 300, jugadores)
+    blancas = rng.integers(0, jugadores, partidas)
+    negras = (blancas + rng.integers(1, jugadores, partidas)) % jugadores
+    esperado = 1 / (1 + 10 ** ((fuerza[negras] - fuerza[blancas]) / 400))
+    azar = rng.random(partidas)
+    puntos = np.where(
+        azar < esperado - 0.1, 1.0, np.where(azar > esperado + 0.1, 0.0, 0.5)
+    )
+    historial = Historial(
+        usuarios=list(range(1, jugadores + 1)),
+        periodo=np.sort(rng.integers(0, torneos, partidas)),
+        blancas=blancas,
+        negras=negras,
+        puntos_blancas=puntos,
+    )
+    return historial, fuerza
+
+
+def medir_torneo(jugadores: int, rondas: int, semilla: int) -> float:
+    """Segundos para calcular los ratings de un torneo al finalizar."""
+    rng = np.random.default_rng(semilla)
+    ratings = rng.normal(1500, 300, jugadores)
+    periodos = rng.integers(0, 10, jugadores)
+    pares = [rng.permutation(jugadores).reshape(-1, 2) for _ in range(rondas)]
+    pares = np.concatenate(pares)
+    puntos = rng.choice([0.0, 0.5, 1.0], len(pares))
+
+    inicio = time.perf_counter()
+    variacion_elo(
+        ratings, factores_k(ratings, periodos), pares[:, 0], pares[:, 1], puntos
+    )
+    return time.perf_counter() - inicio
+
+
+def simular(jugadores: int, partidas: int, torneos: int, semilla: int) -> dict:
+    historial, fuerza = generar_historial(jugadores, partidas, torneos, semilla)
+    resultado = {
+        "jugadores": jugadores,
+        "partidas": partidas,
+        "torneos": torneos,
+    }
+    for sistema in ("elo", "glicko2"):
+        inicio = time.perf_counter()
+        replay = recalcular(historial, sistema)
+        segundos = time.perf_counter() - inicio
+        resultado[sistema] = {
+            "segundos": round(segundos, 3),
+            "partidas_por_segundo": round(partidas / segundos),
+            # Qué tan bien el rating recupera la fuerza real
+            "correlacion_fuerza": round(
+                float(np.corrcoef(replay.ratings, fuerza)[0, 1]), 4
+            ),
+        }
+    resultado["torneo_10000_jugadores_9_rondas_segundos"] = round(
+        medir_torneo(10000, 9, semilla), 4
+    )
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jugadores", type=int, default=100000)
+    parser.add_argument("--partidas", type=int, default=2000000)
+    parser.add_argument("--torneos", type=int, default=20000)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+    print(
+        json.dumps(
+            simular(args.jugadores, args.partidas, args.torneos, args.semilla),
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark del motor de emparejamiento suizo.
+
+Simula un torneo completo: empareja cada ronda, sortea los resultados según
+la diferencia de rating y mide el tiempo de cada emparejamiento.
+
+Uso:
+    python -m benchmarks.bench_suizo --jugadores 10000 --rondas 9
+"""
+
+import argparse
+import json
+import random
+import time
+
+from constants import BYE_ID
+from torneos.suizo import emparejar_ronda
+
+
+def simular(jugadores: int, rondas: int, semilla: int) -> dict:
+    rng = random.Random(semilla)
+    ratings = {i: rng.randint(1000, 2700) for i in range(1, jugadores + 1)}
+    puntos = {i: 0.0 for i in ratings}
+    historial: list[tuple[int, int]] = []
+    enfrentados: set[tuple[int, int]] = set()
+    tiempos = []
+    revanchas = 0
+
+    for _ in range(rondas):
+        inicio = time.perf_counter()
+        ronda = emparejar_ronda(
+            [(i, puntos[i], ratings[i]) for i in ratings], historial
+        )
+        tiempos.append(time.perf_counter() - inicio)
+
+        vistos = [b for par in ronda.pares for b in par]
+        if ronda.bye is not None:
+            vistos.append(ronda.bye)
+        assert sorted(vistos) == sorted(ratings), "Emparejamiento incompleto"
+
+        for blancas, negras in ronda.pares:
+            clave = (min(blancas, negras), max(blancas, negras))
+            revanchas += clave in enfrentados
+            enfrentados.add(clave)
+            esperado = 1 / (1 + 10 ** ((ratings[negras] - ratings[blancas]) / 400))
+            azar = rng.random()
+            if azar < esperado - 0.1:
+                puntos[blancas] += 1
+            elif azar > esperado + 0.1:
+                puntos[negras] += 1
+            else:
+                puntos[blancas] += 0.5
+                puntos[negras] += 0.5
+            historial.append((blancas, negras))
+        if ronda.bye is not None:
+            puntos[ronda.bye] += 1
+            historial.append((ronda.bye, BYE_ID))
+
+    return {
+        "jugadores": jugadores,
+        "rondas": rondas,
+        "segundos_por_ronda": [round(t, 4) for t in tiempos],
+        "max_segundos": round(max(tiempos), 4),
+        "revanchas": revanchas,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jugadores", type=int, default=10000)
+    parser.add_argument("--rondas", type=int, default=9)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+    print(json.dumps(simular(args.jugadores, args.rondas, args.semilla), indent=2))
+
+
+if __name__ == "__main__":
+    main()
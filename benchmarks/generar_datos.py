@@ -0,0 +1,303 @@
+"""
+Generador de datasets sintéticos para el almacenamiento JSON.
+
+Escribe `<destino>/data/*.json` con el mismo formato que guarda la API
+(fechas como strings, registros normalizados) y claves foráneas
+consistentes:
+
+- usuarios: jugadores, organizadores, árbitros y administradores
+- torneos: de organizadores existentes, abiertos, en curso o finalizados
+- inscripciones: jugadores distintos por torneo, con su rating inicial
+- partidas: rondas completas de los torneos en curso y finalizados
+- ratings: un rating por jugador al finalizar cada torneo
+
+Todos los usuarios comparten la contraseña "benchmark-1234" (se hashea una
+sola vez). Para usar el dataset con la API o con los benchmarks basta con
+trabajar desde `<destino>`.
+
+Uso:
+    python -m benchmarks.generar_datos --escala 100k --destino datos_sinteticos
+    python -m benchmarks.generar_datos --usuarios 1000000 --torneos 100000
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+import numpy as np
+from passlib.context import CryptContext
+
+from constants import ESTADOS_TORNEO, FORMATOS_TORNEO, RESULTADOS_PARTIDA, ROLES
+
+PASSWORD = "benchmark-1234"
+
+# Escalas predefinidas: (usuarios, torneos)
+ESCALAS = {
+    "1k": (1_000, 100),
+    "10k": (10_000, 1_000),
+    "100k": (100_000, 10_000),
+    "1m": (1_000_000, 100_000),
+}
+
+# Proporción de cada rol entre los usuarios
+PROPORCION_ROLES = {
+    ROLES["admin"]: 0.001,
+    ROLES["arbitro"]: 0.005,
+    ROLES["organizador"]: 0.01,
+}
+
+# Proporción de torneos en cada estado
+PROPORCION_ESTADOS = {
+    ESTADOS_TORNEO["finalizado"]: 0.7,
+    ESTADOS_TORNEO["en_curso"]: 0.2,
+    ESTADOS_TORNEO["abierto"]: 0.1,
+}
+
+INICIO = datetime(2020, 1, 1, tzinfo=timezone.utc)
+RESULTADOS = np.array(
+    [
+        RESULTADOS_PARTIDA["blancas_ganan"],
+        RESULTADOS_PARTIDA["negras_ganan"],
+        RESULTADOS_PARTIDA["tablas"],
+    ]
+)
+
+
+def fecha(segundos: float) -> str:
+    """Fecha `segundos` después de INICIO, como la guarda la API."""
+    return str(INICIO + timedelta(seconds=float(segundos)))
+
+
+def escribir_json(file_path: str, registros: Iterator[dict]) -> int:
+    """Escribe una lista JSON registro por registro, sin armarla en memoria."""
+    cantidad = 0
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for registro in registros:
+            f.write(",\n" if cantidad else "\n")
+            f.write(json.dumps(registro, ensure_ascii=False))
+            cantidad += 1
+        f.write("\n]\n")
+    return cantidad
+
+
+def generar(
+    destino: str,
+    usuarios: int,
+    torneos: int,
+    jugadores_por_torneo: int,
+    rondas: int,
+    semilla: int,
+) -> dict[str, int]:
+    """
+    Genera el dataset completo.
+
+    Returns:
+        Cantidad de registros escritos en cada colección
+    """
+    rng = np.random.default_rng(semilla)
+    directorio = os.path.join(destino, "data")
+    os.makedirs(directorio, exist_ok=True)
+    # Journals y secuencias de un dataset anterior no corresponden a este
+    for nombre in os.listdir(directorio):
+        if nombre.endswith((".journal", ".seq", ".db", ".db-wal", ".db-shm")):
+            os.remove(os.path.join(directorio, nombre))
+
+    # Usuarios: los primeros IDs de cada rol especial, el resto jugadores
+    roles = np.full(usuarios + 1, ROLES["jugador"], dtype=object)
+    siguiente = 1
+    for rol, proporcion in PROPORCION_ROLES.items():
+        cantidad = max(1, int(usuarios * proporcion))
+        roles[siguiente : siguiente + cantidad] = rol
+        siguiente += cantidad
+    organizadores = np.flatnonzero(roles == ROLES["organizador"])
+    jugadores = np.arange(siguiente, usuarios + 1)
+    if len(jugadores) < jugadores_por_torneo:
+        raise ValueError("No hay suficientes jugadores para llenar un torneo")
+
+    password_hash = CryptContext(schemes=["bcrypt"]).hash(PASSWORD)
+    altas = rng.uniform(0, 86400 * 365, usuarios + 1)
+    ratings = np.clip(rng.normal(1500, 300, usuarios + 1), 100, 2800).astype(int)
+
+    def filas_usuarios():
+        for i in range(1, usuarios + 1):
+            yield {
+                "email": f"usuario{i}@example.com",
+                "nombre": f"Nombre{i}",
+                "apellido": f"Apellido{i % 997}",
+                "rol": roles[i],
+                "id": i,
+                "password_hash": password_hash,
+                "fecha_creacion": fecha(altas[i]),
+                "fecha_actualizacion": None,
+                "activo": True,
+            }
+
+    # Torneos
+    estados = rng.choice(
+        list(PROPORCION_ESTADOS), torneos, p=list(PROPORCION_ESTADOS.values())
+    )
+    inicios = rng.uniform(86400 * 365, 86400 * 365 * 5, torneos + 1)
+    organizador_de = rng.choice(organizadores, torneos + 1)
+
+    def filas_torneos():
+        for t in range(1, torneos + 1):
+            estado = estados[t - 1]
+            yield {
+                "nombre": f"Torneo {t}",
+                "descripcion": None,
+                "fecha_inicio": fecha(inicios[t]),
+                "fecha_fin": (
+                    fecha(inicios[t] + 86400 * 3)
+                    if estado == ESTADOS_TORNEO["finalizado"]
+                    else None
+                ),
+                "formato": FORMATOS_TORNEO["suizo"],
+                "max_rondas": rondas,
+                "estado": estado,
+                "id": t,
+                "organizador_id": int(organizador_de[t]),
+                "fecha_creacion": fecha(inicios[t] - 86400 * 30),
+                "fecha_actualizacion": None,
+            }
+
+    # Inscripciones, partidas y ratings se generan juntas, torneo por torneo
+    conteos = {"inscripciones": 0, "partidas": 0, "ratings": 0}
+    rutas = {
+        nombre: open(os.path.join(directorio, f"{nombre}.json"), "w", encoding="utf-8")
+        for nombre in conteos
+    }
+
+    def escribir(nombre: str, registro: dict):
+        rutas[nombre].write(",\n" if conteos[nombre] else "[\n")
+        rutas[nombre].write(json.dumps(registro, ensure_ascii=False))
+        conteos[nombre] += 1
+
+    cantidades = {
+        "usuarios": escribir_json(
+            os.path.join(directorio, "usuarios.json"), filas_usuarios()
+        ),
+        "torneos": escribir_json(
+            os.path.join(directorio, "torneos.json"), filas_torneos()
+        ),
+    }
+    try:
+        for t in range(1, torneos + 1):
+            estado = estados[t - 1]
+            inscriptos = rng.choice(jugadores, jugadores_por_torneo, replace=False)
+            puntos = dict.fromkeys(inscriptos.tolist(), 0.0)
+            jugadas = {
+                ESTADOS_TORNEO["finalizado"]: rondas,
+                ESTADOS_TORNEO["en_curso"]: int(rng.integers(1, rondas + 1)),
+                ESTADOS_TORNEO["abierto"]: 0,
+            }[estado]
+
+            for ronda in range(1, jugadas + 1):
+                orden = rng.permutation(inscriptos).reshape(-1, 2)
+                resultados = RESULTADOS[rng.integers(0, 3, len(orden))]
+                # En un torneo en curso la última ronda aún se está jugando
+                pendiente = estado == ESTADOS_TORNEO["en_curso"] and ronda == jugadas
+                momento = inicios[t] + 3600 * 4 * ronda
+                for (blancas, negras), resultado in zip(orden.tolist(), resultados):
+                    if not pendiente:
+                        if resultado == RESULTADOS_PARTIDA["blancas_ganan"]:
+                            puntos[blancas] += 1
+                        elif resultado == RESULTADOS_PARTIDA["negras_ganan"]:
+                            puntos[negras] += 1
+                        else:
+                            puntos[blancas] += 0.5
+                            puntos[negras] += 0.5
+                    escribir(
+                        "partidas",
+                        {
+                            "torneo_id": t,
+                            "ronda": ronda,
+                            "jugador_blancas_id": blancas,
+                            "jugador_negras_id": negras,
+                            "resultado": None if pendiente else str(resultado),
+                            "id": conteos["partidas"] + 1,
+                            "fecha_creacion": fecha(momento),
+                            "fecha_resultado": (
+                                None if pendiente else fecha(momento + 3600 * 3)
+                            ),
+                        },
+                    )
+
+            for usuario_id in inscriptos.tolist():
+                escribir(
+                    "inscripciones",
+                    {
+                        "usuario_id": usuario_id,
+                        "torneo_id": t,
+                        "rating_inicial": int(ratings[usuario_id]),
+                        "id": conteos["inscripciones"] + 1,
+                        "fecha_inscripcion": fecha(inicios[t] - 86400),
+                        "puntos": puntos[usuario_id],
+                    },
+                )
+                if estado == ESTADOS_TORNEO["finalizado"]:
+                    # Variación acotada según el desempeño en el torneo
+                    ratings[usuario_id] = min(
+                        3000,
+                        max(
+                            0,
+                            ratings[usuario_id]
+                            + int(20 * (puntos[usuario_id] - jugadas / 2)),
+                        ),
+                    )
+                    escribir(
+                        "ratings",
+                        {
+                            "usuario_id": usuario_id,
+                            "rating": int(ratings[usuario_id]),
+                            "fecha": fecha(inicios[t] + 86400 * 3),
+                            "id": conteos["ratings"] + 1,
+                        },
+                    )
+    finally:
+        for nombre, archivo in rutas.items():
+            archivo.write("\n]\n" if conteos[nombre] else "[]\n")
+            archivo.close()
+
+    cantidades.update(conteos)
+    return cantidades
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--escala", choices=list(ESCALAS), default="10k")
+    parser.add_argument("--usuarios", type=int, help="Reemplaza el de la escala")
+    parser.add_argument("--torneos", type=int, help="Reemplaza el de la escala")
+    parser.add_argument("--jugadores-por-torneo", type=int, default=16)
+    parser.add_argument("--rondas", type=int, default=5)
+    parser.add_argument("--destino", default="datos_sinteticos")
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+    if args.jugadores_por_torneo % 2:
+        parser.error("--jugadores-por-torneo debe ser par")
+
+    usuarios, torneos = ESCALAS[args.escala]
+    inicio = time.perf_counter()
+    cantidades = generar(
+        args.destino,
+        args.usuarios or usuarios,
+        args.torneos or torneos,
+        args.jugadores_por_torneo,
+        args.rondas,
+        args.semilla,
+    )
+    resultado = {
+        "destino": os.path.abspath(args.destino),
+        "registros": cantidades,
+        "segundos": round(time.perf_counter() - inicio, 2),
+    }
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
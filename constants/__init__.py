@@ -3,10 +3,44 @@ from .constants import (
     ALGORITHM,
     ACCESS_TOKEN_EXPIRE_MINUTES,
     REFRESH_TOKEN_EXPIRE_DAYS,
+    TOKEN_CACHE_MAX,
+    USUARIO_CACHE_MAX,
+    USUARIO_CACHE_TTL,
+    CACHE_RESPUESTAS_MAX,
+    CACHE_RESPUESTAS_TTL,
+    HASH_WORKERS,
+    HASH_MAX_PENDIENTES,
+    HASH_LOTE_EN_VUELO,
+    IMPORTACION_MAX_FILAS,
+    IMPORTACION_LOTE,
+    BACKENDS_ALMACENAMIENTO,
+    ALMACENAMIENTO_WORKERS,
+    STORAGE_BACKEND,
+    SQLITE_PATH,
+    COMMIT_VENTANA_MS,
+    SECUENCIA_BLOQUE,
+    JOURNAL_MAX_ENTRADAS,
+    JOURNAL_INTERVALO_COMPACTACION,
+    INDICE_USUARIOS_DIR,
+    INDICE_USUARIOS_INTERVALO,
+    VERSIONES_PATH,
+    VERSIONES_CASILLAS,
+    RATINGS_HISTORIAL_DIR,
+    CLASIFICACION_TTL,
+    BLOQUEOS_DIR,
+    PAGINA_STREAMING,
+    EVENTOS_DIR,
+    EVENTOS_INTERVALO,
+    EVENTOS_BUFFER,
+    EVENTOS_KEEPALIVE,
     ROLES,
     ESTADOS_TORNEO,
     FORMATOS_TORNEO,
+    RATING_INICIAL,
+    BYE_ID,
     RESULTADOS_PARTIDA,
+    PUNTOS_RESULTADO,
+    TIPOS_EVENTO,
 )
 from .modelos import (
     UsuarioBase,
@@ -17,11 +51,22 @@ from .modelos import (
     Token,
     TokenData,
     TorneoDB,
+    TorneoRespuesta,
+    TorneoActualizar,
     InscripcionDB,
+    InscripcionRespuesta,
     PartidaDB,
+    PartidaRespuesta,
+    PartidaActualizarResultado,
+    ResultadoPartidaLote,
+    ResultadosLote,
     RatingDB,
+    HistorialRating,
+    PosicionRanking,
     UsuarioActualizar,
     CambiarPassword,
+    PosicionTabla,
+    Pagina,
 )
 
 
@@ -30,10 +75,44 @@ __all__ = [
     "ALGORITHM",
     "ACCESS_TOKEN_EXPIRE_MINUTES",
     "REFRESH_TOKEN_EXPIRE_DAYS",
+    "TOKEN_CACHE_MAX",
+    "USUARIO_CACHE_MAX",
+    "USUARIO_CACHE_TTL",
+    "CACHE_RESPUESTAS_MAX",
+    "CACHE_RESPUESTAS_TTL",
+    "HASH_WORKERS",
+    "HASH_MAX_PENDIENTES",
+    "HASH_LOTE_EN_VUELO",
+    "IMPORTACION_MAX_FILAS",
+    "IMPORTACION_LOTE",
+    "BACKENDS_ALMACENAMIENTO",
+    "ALMACENAMIENTO_WORKERS",
+    "STORAGE_BACKEND",
+    "SQLITE_PATH",
+    "COMMIT_VENTANA_MS",
+    "SECUENCIA_BLOQUE",
+    "JOURNAL_MAX_ENTRADAS",
+    "JOURNAL_INTERVALO_COMPACTACION",
+    "INDICE_USUARIOS_DIR",
+    "INDICE_USUARIOS_INTERVALO",
+    "VERSIONES_PATH",
+    "VERSIONES_CASILLAS",
+    "RATINGS_HISTORIAL_DIR",
+    "CLASIFICACION_TTL",
+    "BLOQUEOS_DIR",
+    "PAGINA_STREAMING",
+    "EVENTOS_DIR",
+    "EVENTOS_INTERVALO",
+    "EVENTOS_BUFFER",
+    "EVENTOS_KEEPALIVE",
     "ROLES",
     "ESTADOS_TORNEO",
     "FORMATOS_TORNEO",
+    "RATING_INICIAL",
+    "BYE_ID",
     "RESULTADOS_PARTIDA",
+    "PUNTOS_RESULTADO",
+    "TIPOS_EVENTO",
     "UsuarioBase",
     "UsuarioCrear",
     "UsuarioDB",
@@ -42,9 +121,20 @@ __all__ = [
     "Token",
     "TokenData",
     "TorneoDB",
+    "TorneoRespuesta",
+    "TorneoActualizar",
     "InscripcionDB",
+    "InscripcionRespuesta",
     "PartidaDB",
+    "PartidaRespuesta",
+    "PartidaActualizarResultado",
+    "ResultadoPartidaLote",
+    "ResultadosLote",
     "RatingDB",
+    "HistorialRating",
+    "PosicionRanking",
     "UsuarioActualizar",
     "CambiarPassword",
+    "PosicionTabla",
+    "Pagina",
 ]
@@ -19,6 +19,99 @@ if None in (
 ACCESS_TOKEN_EXPIRE_MINUTES = int(cast(str, ACCESS_TOKEN_EXPIRE_MINUTES))
 REFRESH_TOKEN_EXPIRE_DAYS = int(cast(str, REFRESH_TOKEN_EXPIRE_DAYS))
 
+# Caches de autenticación (tokens verificados y registros de usuario)
+TOKEN_CACHE_MAX = int(os.getenv("TOKEN_CACHE_MAX", "10000"))
+USUARIO_CACHE_MAX = int(os.getenv("USUARIO_CACHE_MAX", "10000"))
+USUARIO_CACHE_TTL = float(os.getenv("USUARIO_CACHE_TTL", "5"))
+
+# Cache de respuestas de las lecturas públicas caras (detalle de torneo,
+# partidas y tabla de posiciones): máximo de respuestas guardadas y segundos
+# que se usa una respuesta aunque sus datos no hayan cambiado
+CACHE_RESPUESTAS_MAX = int(os.getenv("CACHE_RESPUESTAS_MAX", "1024"))
+CACHE_RESPUESTAS_TTL = float(os.getenv("CACHE_RESPUESTAS_TTL", "60"))
+
+# Pool de hashing de contraseñas (bcrypt)
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+HASH_MAX_PENDIENTES = int(os.getenv("HASH_MAX_PENDIENTES", "100"))
+# Hashes de una importación masiva en vuelo a la vez (deja lugar a los
+# logins y registros interactivos en la cola del pool)
+HASH_LOTE_EN_VUELO = int(os.getenv("HASH_LOTE_EN_VUELO", str(HASH_WORKERS)))
+
+# Importación masiva de usuarios
+IMPORTACION_MAX_FILAS = int(os.getenv("IMPORTACION_MAX_FILAS", "50000"))
+# Filas que se validan, guardan y responden juntas
+IMPORTACION_LOTE = int(os.getenv("IMPORTACION_LOTE", "500"))
+
+# Backends de almacenamiento disponibles
+BACKENDS_ALMACENAMIENTO = {
+    "json": "json",
+    "journal": "journal",
+    "sqlite": "sqlite",
+}
+
+# Configuración de almacenamiento
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", BACKENDS_ALMACENAMIENTO["json"])
+if STORAGE_BACKEND not in BACKENDS_ALMACENAMIENTO.values():
+    raise ValueError(
+        f"STORAGE_BACKEND debe ser uno de: {list(BACKENDS_ALMACENAMIENTO.values())}"
+    )
+
+# Ruta de la base de datos (solo con STORAGE_BACKEND=sqlite)
+SQLITE_PATH = os.getenv("SQLITE_PATH", os.path.join("data", "torneos.db"))
+
+# Ventana de agrupación de escrituras (group commit), en milisegundos
+COMMIT_VENTANA_MS = float(os.getenv("COMMIT_VENTANA_MS", "2"))
+
+# Hilos que ejecutan el almacenamiento de las rutas async fuera del event loop
+ALMACENAMIENTO_WORKERS = int(os.getenv("ALMACENAMIENTO_WORKERS", "4"))
+
+# Cantidad de IDs que cada worker reserva de una vez por colección
+SECUENCIA_BLOQUE = int(os.getenv("SECUENCIA_BLOQUE", "16"))
+
+# Compactación del journal (solo con STORAGE_BACKEND=journal)
+JOURNAL_MAX_ENTRADAS = int(os.getenv("JOURNAL_MAX_ENTRADAS", "1000"))
+JOURNAL_INTERVALO_COMPACTACION = float(
+    os.getenv("JOURNAL_INTERVALO_COMPACTACION", "30")
+)
+
+# Índice binario de usuarios compartido entre workers (mapeado en memoria,
+# solo con STORAGE_BACKEND=json o journal) y cada cuántos segundos se
+# revisa si usuarios.json cambió
+INDICE_USUARIOS_DIR = os.getenv(
+    "INDICE_USUARIOS_DIR", os.path.join("data", "indice_usuarios")
+)
+INDICE_USUARIOS_INTERVALO = float(os.getenv("INDICE_USUARIOS_INTERVALO", "1"))
+
+# Contadores de versión de las colecciones compartidos entre workers
+# (mapeados en memoria) y cantidad de contadores del archivo
+VERSIONES_PATH = os.getenv("VERSIONES_PATH", os.path.join("data", "versiones.bin"))
+VERSIONES_CASILLAS = int(os.getenv("VERSIONES_CASILLAS", "4096"))
+
+# Directorio del historial de ratings en arreglos (mapeados en memoria)
+RATINGS_HISTORIAL_DIR = os.getenv(
+    "RATINGS_HISTORIAL_DIR", os.path.join("data", "ratings_historial")
+)
+
+# Segundos que una tabla de posiciones en memoria se usa antes de
+# reconstruirla (para ver resultados registrados por otros workers)
+CLASIFICACION_TTL = float(os.getenv("CLASIFICACION_TTL", "5"))
+
+# Archivos de bloqueo por torneo, para serializar entre workers las
+# escrituras que dependen de lo ya guardado (puntos, rondas)
+BLOQUEOS_DIR = os.getenv("BLOQUEOS_DIR", os.path.join("data", "bloqueos"))
+
+# Registros que se leen por vez al recorrer un listado en streaming (NDJSON)
+PAGINA_STREAMING = int(os.getenv("PAGINA_STREAMING", "500"))
+
+# Eventos en vivo de los torneos (SSE/WebSocket): directorio del log de
+# eventos compartido entre workers, cada cuántos segundos se lee, eventos
+# que se acumulan por conexión antes de descartarla por lenta y segundos
+# entre comentarios de keep-alive
+EVENTOS_DIR = os.getenv("EVENTOS_DIR", os.path.join("data", "eventos"))
+EVENTOS_INTERVALO = float(os.getenv("EVENTOS_INTERVALO", "0.1"))
+EVENTOS_BUFFER = int(os.getenv("EVENTOS_BUFFER", "256"))
+EVENTOS_KEEPALIVE = float(os.getenv("EVENTOS_KEEPALIVE", "15"))
+
 # Roles de usuario
 ROLES = {
     "jugador": "jugador",
@@ -41,6 +134,12 @@ FORMATOS_TORNEO = {
     "eliminacion": "eliminacion",
 }
 
+# Rating de un jugador sin historial
+RATING_INICIAL = 1200
+
+# ID usado como rival en las partidas que representan un bye
+BYE_ID = 0
+
 # Resultados de partida
 RESULTADOS_PARTIDA = {
     "blancas_ganan": "blancas_ganan",
@@ -48,3 +147,19 @@ RESULTADOS_PARTIDA = {
     "tablas": "tablas",
     "no_jugada": "no_jugada",
 }
+
+# Puntos que otorga cada resultado: (blancas, negras)
+PUNTOS_RESULTADO = {
+    RESULTADOS_PARTIDA["blancas_ganan"]: (1.0, 0.0),
+    RESULTADOS_PARTIDA["negras_ganan"]: (0.0, 1.0),
+    RESULTADOS_PARTIDA["tablas"]: (0.5, 0.5),
+    RESULTADOS_PARTIDA["no_jugada"]: (0.0, 0.0),
+}
+
+# Tipos de evento en vivo de un torneo
+TIPOS_EVENTO = {
+    "torneo": "torneo",
+    "emparejamientos": "emparejamientos",
+    "resultados": "resultados",
+    "clasificacion": "clasificacion",
+}
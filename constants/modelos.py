@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional
+from typing import Generic, Optional, TypeVar
 from datetime import datetime
 
 from constants import (
@@ -7,8 +7,11 @@ from constants import (
     ESTADOS_TORNEO,
     FORMATOS_TORNEO,
     RESULTADOS_PARTIDA,
+    RATING_INICIAL,
 )
 
+T = TypeVar("T")
+
 
 # Modelo base para Usuario
 class UsuarioBase(BaseModel):
@@ -121,6 +124,8 @@ class TorneoDB(TorneoBase):
     organizador_id: int
     fecha_creacion: datetime = Field(default_factory=datetime.utcnow)
     fecha_actualizacion: Optional[datetime] = None
+    # Se marca al finalizar el torneo y se desmarca al guardar sus ratings
+    ratings_pendientes: bool = False
 
 
 # Modelo para respuesta de torneo
@@ -160,7 +165,7 @@ class TorneoActualizar(BaseModel):
 class InscripcionBase(BaseModel):
     usuario_id: int
     torneo_id: int
-    rating_inicial: int = Field(default=1200, ge=0, le=3000)
+    rating_inicial: int = Field(default=RATING_INICIAL, ge=0, le=3000)
 
 
 # Modelo para crear inscripción
@@ -172,14 +177,14 @@ class InscripcionCrear(BaseModel):
 class InscripcionDB(InscripcionBase):
     id: int
     fecha_inscripcion: datetime = Field(default_factory=datetime.utcnow)
-    puntos: int = 0
+    puntos: float = 0
 
 
 # Modelo para respuesta de inscripción
 class InscripcionRespuesta(InscripcionBase):
     id: int
     fecha_inscripcion: datetime
-    puntos: int
+    puntos: float
 
 
 # Modelo para partida
@@ -231,6 +236,16 @@ class PartidaActualizarResultado(BaseModel):
         return v
 
 
+# Modelo para un resultado dentro de una carga por lote
+class ResultadoPartidaLote(PartidaActualizarResultado):
+    partida_id: int
+
+
+# Modelo para cargar los resultados de una ronda en una sola solicitud
+class ResultadosLote(BaseModel):
+    resultados: list[ResultadoPartidaLote] = Field(..., min_length=1)
+
+
 # Modelo para rating
 class RatingBase(BaseModel):
     usuario_id: int
@@ -248,6 +263,24 @@ class RatingRespuesta(RatingBase):
     id: int
 
 
+# Modelo para historial de ratings (columnas paralelas, fechas en segundos epoch)
+class HistorialRating(BaseModel):
+    usuario_id: int
+    actual: Optional[int] = None
+    fechas: list[int]
+    ratings: list[int]
+
+
+# Modelo para posición en el ranking global de ratings
+class PosicionRanking(BaseModel):
+    usuario_id: int
+    nombre: str
+    apellido: str
+    rating: int
+    puesto: int
+    percentil: float
+
+
 # Modelo para tabla de posiciones
 class PosicionTabla(BaseModel):
     usuario_id: int
@@ -258,3 +291,13 @@ class PosicionTabla(BaseModel):
     victorias: int
     derrotas: int
     tablas: int
+    buchholz: float = 0
+    buchholz_mediano: float = 0
+    sonneborn_berger: float = 0
+
+
+# Modelo para una página de un listado paginado por cursor
+class Pagina(BaseModel, Generic[T]):
+    elementos: list[T]
+    # ID a pasar como `despues` para pedir la página siguiente (None si no hay más)
+    siguiente: Optional[int] = None
@@ -0,0 +1,296 @@
+"""
+Métricas de la API en formato de texto de Prometheus.
+
+Registra, por ruta, histogramas de latencia, solicitudes en curso y
+respuestas por código de estado, y el tiempo de bcrypt, de la
+decodificación de JWT y de cada función de almacenamiento.
+
+Cada hilo escribe en sus propios contadores (sin bloqueos en el camino
+caliente) y los buckets de los histogramas se crean una sola vez; al
+exportar se suman los valores de todos los hilos. Cada worker de uvicorn
+tiene sus propias métricas.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Any, Callable, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+Etiquetas = tuple[str, ...]
+
+# Límites (en segundos) de los buckets de latencia
+BUCKETS_HTTP = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+BUCKETS_OPERACION = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+
+
+class _PorHilo:
+    """Un valor por hilo: cada hilo escribe solo el suyo y no hace falta bloquear."""
+
+    def __init__(self, crear: Callable[[], Any]):
+        self._crear = crear
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._todos: list[Any] = []
+
+    def propio(self) -> Any:
+        try:
+            return self._local.valor
+        except AttributeError:
+            valor = self._local.valor = self._crear()
+            # Solo la primera vez de cada hilo
+            with self._lock:
+                self._todos.append(valor)
+            return valor
+
+    def todos(self) -> list[Any]:
+        with self._lock:
+            return list(self._todos)
+
+
+def _formatear_etiquetas(
+    nombres: Etiquetas, valores: Etiquetas, extra: str = ""
+) -> str:
+    partes = [f'{nombre}="{valor}"' for nombre, valor in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _numero(valor: float) -> str:
+    return str(int(valor)) if float(valor).is_integer() else repr(float(valor))
+
+
+class Contador:
+    """Contador monotónico (o medidor, si se resta) con etiquetas."""
+
+    def __init__(
+        self, nombre: str, ayuda: str, etiquetas: Etiquetas = (), tipo="counter"
+    ):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.tipo = tipo
+        self._valores = _PorHilo(dict)
+
+    def sumar(self, valores: Etiquetas = (), cantidad: float = 1):
+        propios = self._valores.propio()
+        propios[valores] = propios.get(valores, 0) + cantidad
+
+    def valores(self) -> dict[Etiquetas, float]:
+        total: dict[Etiquetas, float] = {}
+        for propios in self._valores.todos():
+            for clave, valor in list(propios.items()):
+                total[clave] = total.get(clave, 0) + valor
+        return total
+
+    def exportar(self) -> list[str]:
+        lineas = [
+            f"# HELP {self.nombre} {self.ayuda}",
+            f"# TYPE {self.nombre} {self.tipo}",
+        ]
+        valores = self.valores() or ({(): 0} if not self.etiquetas else {})
+        for clave, valor in sorted(valores.items()):
+            etiquetas = _formatear_etiquetas(self.etiquetas, clave)
+            lineas.append(f"{self.nombre}{etiquetas} {_numero(valor)}")
+        return lineas
+
+
+class Histograma:
+    """Histograma con buckets fijos y etiquetas."""
+
+    def __init__(
+        self,
+        nombre: str,
+        ayuda: str,
+        etiquetas: Etiquetas = (),
+        limites: tuple[float, ...] = BUCKETS_HTTP,
+    ):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.limites = limites
+        # Por hilo: etiquetas -> [conteo de cada bucket (+Inf al final), suma]
+        self._series = _PorHilo(dict)
+
+    def observar(self, valores: Etiquetas, segundos: float):
+        series = self._series.propio()
+        serie = series.get(valores)
+        if serie is None:
+            serie = series[valores] = [[0] * (len(self.limites) + 1), 0.0]
+        serie[0][bisect_left(self.limites, segundos)] += 1
+        serie[1] += segundos
+
+    def medir(self, *valores: str) -> Callable[[F], F]:
+        """Decorador que observa la duración de cada llamada a la función."""
+
+        def decorador(funcion: F) -> F:
+            @wraps(funcion)
+            def envoltura(*args, **kwargs):
+                inicio = time.perf_counter()
+                try:
+                    return funcion(*args, **kwargs)
+                finally:
+                    self.observar(valores, time.perf_counter() - inicio)
+
+            return envoltura  # type: ignore[return-value]
+
+        return decorador
+
+    def exportar(self) -> list[str]:
+        total: dict[Etiquetas, list] = {}
+        for series in self._series.todos():
+            for clave, (conteos, suma) in list(series.items()):
+                acumulado = total.setdefault(clave, [[0] * len(conteos), 0.0])
+                for i, conteo in enumerate(list(conteos)):
+                    acumulado[0][i] += conteo
+                acumulado[1] += suma
+
+        lineas = [
+            f"# HELP {self.nombre} {self.ayuda}",
+            f"# TYPE {self.nombre} histogram",
+        ]
+        for clave, (conteos, suma) in sorted(total.items()):
+            acumulado = 0
+            for limite, conteo in zip(self.limites + (float("inf"),), conteos):
+                acumulado += conteo
+                le = "+Inf" if limite == float("inf") else repr(limite)
+                etiquetas = _formatear_etiquetas(self.etiquetas, clave, f'le="{le}"')
+                lineas.append(f"{self.nombre}_bucket{etiquetas} {acumulado}")
+            etiquetas = _formatear_etiquetas(self.etiquetas, clave)
+            lineas.append(f"{self.nombre}_sum{etiquetas} {repr(suma)}")
+            lineas.append(f"{self.nombre}_count{etiquetas} {acumulado}")
+        return lineas
+
+
+# Métricas de la API
+solicitudes_segundos = Histograma(
+    "http_solicitud_segundos",
+    "Latencia de las solicitudes HTTP por ruta",
+    ("metodo", "ruta"),
+)
+solicitudes_en_curso = Contador(
+    "http_solicitudes_en_curso", "Solicitudes HTTP en curso", tipo="gauge"
+)
+respuestas_total = Contador(
+    "http_respuestas_total",
+    "Respuestas HTTP por ruta y código de estado",
+    ("metodo", "ruta", "estado"),
+)
+bcrypt_segundos = Histograma(
+    "bcrypt_segundos",
+    "Tiempo de cada hash o verificación de bcrypt (sin la espera en cola)",
+    ("operacion",),
+    BUCKETS_HTTP,
+)
+jwt_segundos = Histograma(
+    "jwt_decodificacion_segundos",
+    "Tiempo de decodificar y verificar un JWT (sin contar la cache)",
+    limites=BUCKETS_OPERACION,
+)
+almacenamiento_segundos = Histograma(
+    "almacenamiento_segundos",
+    "Tiempo de cada llamada a una función de almacenamiento",
+    ("funcion",),
+    BUCKETS_OPERACION,
+)
+respuestas_cacheadas_total = Contador(
+    "cache_respuestas_total",
+    "Lecturas de la cache de respuestas: aciertos y cálculos (el resto de los "
+    "fallos esperó un cálculo en vuelo)",
+    ("resultado",),
+)
+
+METRICAS = (
+    solicitudes_segundos,
+    solicitudes_en_curso,
+    respuestas_total,
+    bcrypt_segundos,
+    jwt_segundos,
+    almacenamiento_segundos,
+    respuestas_cacheadas_total,
+)
+
+
+def medir_almacenamiento(funcion: F) -> F:
+    """Registra en almacenamiento_segundos la duración de una función de utils."""
+    return almacenamiento_segundos.medir(funcion.__name__)(funcion)
+
+
+def exportar_metricas() -> str:
+    """Todas las métricas en el formato de texto de Prometheus."""
+    lineas: list[str] = []
+    for metrica in METRICAS:
+        lineas.extend(metrica.exportar())
+    return "\n".join(lineas) + "\n"
+
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI que mide cada solicitud HTTP.
+
+    La ruta se toma de la plantilla (`/torneos/{torneo_id}`), no de la URL,
+    para que la cantidad de series no crezca con los IDs. Las solicitudes
+    que no coinciden con ninguna ruta se agrupan como "sin_ruta".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estado: Optional[int] = None
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+            await send(mensaje)
+
+        solicitudes_en_curso.sumar()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracion = time.perf_counter() - inicio
+            solicitudes_en_curso.sumar(cantidad=-1)
+            # FastAPI deja la ruta que atendió la solicitud en el scope
+            ruta = getattr(scope.get("route"), "path", "sin_ruta")
+            solicitudes_segundos.observar((scope["method"], ruta), duracion)
+            respuestas_total.sumar((scope["method"], ruta, str(estado or 500)))
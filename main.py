@@ -1,6 +1,27 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from logs.metricas import MiddlewareMetricas, exportar_metricas
 from routers.auth_endpoints import router as auth_router
+from routers.torneos_endpoints import router as torneos_router
+from routers.ratings_endpoints import router as ratings_router
+from ratings import ranking_global
+from utils import ejecutar_almacenamiento
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prepara el historial y el ranking de ratings antes de atender solicitudes."""
+    try:
+        # Mapea la versión vigente del historial (o la reconstruye si no hay)
+        # y arma el ranking, en el pool de almacenamiento
+        await ejecutar_almacenamiento(ranking_global.total)
+    except Exception as e:
+        print(f"Error al preparar los ratings: {e}")
+    yield
+
 
 # Crear aplicación FastAPI
 app = FastAPI(
@@ -9,6 +30,9 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    # orjson serializa bastante más rápido que json de la biblioteca estándar
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # Configurar CORS
@@ -20,8 +44,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Latencias, solicitudes en curso y códigos de estado por ruta
+app.add_middleware(MiddlewareMetricas)
+
 # Incluir routers
 app.include_router(auth_router)
+app.include_router(torneos_router)
+app.include_router(ratings_router)
 
 
 # Ruta raíz
@@ -38,6 +67,16 @@ async def root():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """
+    Métricas en el formato de texto de Prometheus.
+    """
+    return PlainTextResponse(
+        exportar_metricas(), media_type="text/plain; version=0.0.4"
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
 
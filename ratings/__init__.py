@@ -0,0 +1,19 @@
+from .elo import factores_k, puntaje_esperado, variacion_elo
+from .glicko2 import EstadoGlicko, periodo_glicko2
+from .historial import HistorialRatings, historial_ratings
+from .ranking import RankingGlobal, ranking_global
+from .motor import calcular_ratings_torneo, finalizar_ratings_torneo
+
+__all__ = [
+    "factores_k",
+    "puntaje_esperado",
+    "variacion_elo",
+    "EstadoGlicko",
+    "periodo_glicko2",
+    "HistorialRatings",
+    "historial_ratings",
+    "RankingGlobal",
+    "ranking_global",
+    "calcular_ratings_torneo",
+    "finalizar_ratings_torneo",
+]
@@ -0,0 +1,70 @@
+import numpy as np
+
+# Factores K: los jugadores nuevos se mueven rápido y la élite, despacio
+K_NUEVO = 40
+K_NORMAL = 20
+K_ELITE = 10
+UMBRAL_ELITE = 2400
+# Cantidad de torneos con rating a partir de la cual un jugador deja de ser nuevo
+PERIODOS_NUEVO = 3
+
+RATING_MIN = 0
+RATING_MAX = 3000
+
+
+def factores_k(ratings: np.ndarray, periodos: np.ndarray) -> np.ndarray:
+    """
+    Factor K de cada jugador según su rating y su experiencia.
+
+    Args:
+        ratings: Rating actual de cada jugador
+        periodos: Cantidad de torneos con rating que jugó cada uno
+
+    Returns:
+        Arreglo con el factor K de cada jugador
+    """
+    return np.where(
+        periodos < PERIODOS_NUEVO,
+        K_NUEVO,
+        np.where(ratings >= UMBRAL_ELITE, K_ELITE, K_NORMAL),
+    )
+
+
+def puntaje_esperado(rating: np.ndarray, rival: np.ndarray) -> np.ndarray:
+    """Puntaje esperado de `rating` frente a `rival` según la curva logística de Elo."""
+    return 1.0 / (1.0 + 10.0 ** ((rival - rating) / 400.0))
+
+
+def variacion_elo(
+    ratings: np.ndarray,
+    k: np.ndarray,
+    blancas: np.ndarray,
+    negras: np.ndarray,
+    puntos_blancas: np.ndarray,
+) -> np.ndarray:
+    """
+    Variación de rating de todos los jugadores en un período (un torneo).
+
+    Todas las partidas se evalúan con los ratings previos al período, como
+    en el cálculo de la FIDE, así el resultado no depende del orden de las
+    partidas y se calcula en una sola pasada vectorizada.
+
+    Args:
+        ratings: Rating de cada jugador antes del período
+        k: Factor K de cada jugador
+        blancas: Índice (en `ratings`) del jugador con blancas de cada partida
+        negras: Índice del jugador con negras de cada partida
+        puntos_blancas: Puntaje obtenido por las blancas (1, 0,5 o 0)
+
+    Returns:
+        Arreglo con la variación de rating de cada jugador
+    """
+    diferencia = puntos_blancas - puntaje_esperado(ratings[blancas], ratings[negras])
+    n = len(ratings)
+    saldo = np.bincount(blancas, diferencia, n) - np.bincount(negras, diferencia, n)
+    return k * saldo
+
+
+def redondear_ratings(ratings: np.ndarray) -> np.ndarray:
+    """Redondea ratings a enteros dentro del rango válido de RatingDB."""
+    return np.clip(np.rint(ratings), RATING_MIN, RATING_MAX).astype(np.int64)
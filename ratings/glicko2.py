@@ -0,0 +1,141 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+# Conversión entre la escala de Glicko y la interna de Glicko-2
+ESCALA = 173.7178
+RATING_BASE = 1500.0
+
+RD_INICIAL = 350.0
+VOLATILIDAD_INICIAL = 0.06
+# Restricción del cambio de volatilidad entre períodos
+TAU = 0.5
+# Tolerancia y tope de iteraciones del cálculo de la nueva volatilidad
+EPSILON = 1e-6
+MAX_ITERACIONES = 100
+
+
+@dataclass
+class EstadoGlicko:
+    """Rating, desviación (RD) y volatilidad de cada jugador."""
+
+    rating: np.ndarray
+    rd: np.ndarray
+    volatilidad: np.ndarray
+
+    @classmethod
+    def nuevo(cls, ratings: np.ndarray) -> "EstadoGlicko":
+        """Estado inicial a partir de los ratings de partida de cada jugador."""
+        n = len(ratings)
+        return cls(
+            rating=np.asarray(ratings, dtype=np.float64).copy(),
+            rd=np.full(n, RD_INICIAL),
+            volatilidad=np.full(n, VOLATILIDAD_INICIAL),
+        )
+
+
+def _g(phi: np.ndarray) -> np.ndarray:
+    return 1.0 / np.sqrt(1.0 + 3.0 * phi**2 / np.pi**2)
+
+
+def _nueva_volatilidad(
+    phi: np.ndarray, sigma: np.ndarray, v: np.ndarray, delta: np.ndarray
+) -> np.ndarray:
+    """
+    Resuelve la nueva volatilidad de todos los jugadores a la vez.
+
+    Aplica el método Illinois (regula falsi) del paper de Glicko-2 sobre
+    arreglos; los jugadores que ya convergieron quedan congelados.
+    """
+    a = np.log(sigma**2)
+    phi2 = phi**2
+    delta2 = delta**2
+
+    def f(x):
+        ex = np.exp(x)
+        return ex * (delta2 - phi2 - v - ex) / (2.0 * (phi2 + v + ex) ** 2) - (
+            x - a
+        ) / (TAU**2)
+
+    A = a.copy()
+    B = np.where(delta2 > phi2 + v, np.log(np.maximum(delta2 - phi2 - v, 1e-300)), 0.0)
+    sin_cota = delta2 <= phi2 + v
+    if sin_cota.any():
+        k = np.ones_like(a)
+        pendientes = sin_cota & (f(a - k * TAU) < 0)
+        while pendientes.any():
+            k[pendientes] += 1
+            pendientes &= f(a - k * TAU) < 0
+        B = np.where(sin_cota, a - k * TAU, B)
+
+    fA, fB = f(A), f(B)
+    activos = np.abs(B - A) > EPSILON
+    for _ in range(MAX_ITERACIONES):
+        if not activos.any():
+            break
+        C = A + (A - B) * fA / np.where(activos, fB - fA, 1.0)
+        fC = f(C)
+        cruza = fC * fB <= 0
+        A = np.where(activos & cruza, B, A)
+        fA = np.where(activos, np.where(cruza, fB, fA / 2.0), fA)
+        B = np.where(activos, C, B)
+        fB = np.where(activos, fC, fB)
+        activos &= np.abs(B - A) > EPSILON
+    return np.exp(A / 2.0)
+
+
+def periodo_glicko2(
+    estado: EstadoGlicko,
+    blancas: np.ndarray,
+    negras: np.ndarray,
+    puntos_blancas: np.ndarray,
+) -> EstadoGlicko:
+    """
+    Aplica un período de rating de Glicko-2 a los jugadores que participaron.
+
+    Cada partida se cuenta desde la perspectiva de ambos jugadores y los
+    sumatorios del algoritmo se acumulan con `np.bincount`. Los jugadores
+    sin partidas en el período no se modifican (los períodos son torneos,
+    no intervalos de tiempo).
+
+    Args:
+        estado: Estado de los jugadores antes del período
+        blancas: Índice del jugador con blancas de cada partida
+        negras: Índice del jugador con negras de cada partida
+        puntos_blancas: Puntaje obtenido por las blancas (1, 0,5 o 0)
+
+    Returns:
+        Nuevo EstadoGlicko
+    """
+    n = len(estado.rating)
+    mu = (estado.rating - RATING_BASE) / ESCALA
+    phi = estado.rd / ESCALA
+    sigma = estado.volatilidad
+
+    jugador = np.concatenate([blancas, negras])
+    rival = np.concatenate([negras, blancas])
+    puntos = np.concatenate([puntos_blancas, 1.0 - puntos_blancas])
+
+    g = _g(phi[rival])
+    esperado = 1.0 / (1.0 + np.exp(-g * (mu[jugador] - mu[rival])))
+    inversa_v = np.bincount(jugador, g**2 * esperado * (1.0 - esperado), n)
+    suma = np.bincount(jugador, g * (puntos - esperado), n)
+
+    jugaron = inversa_v > 0
+    v = 1.0 / inversa_v[jugaron]
+    delta = v * suma[jugaron]
+
+    nueva_sigma = sigma.copy()
+    nueva_sigma[jugaron] = _nueva_volatilidad(phi[jugaron], sigma[jugaron], v, delta)
+    phi_previa = np.sqrt(phi[jugaron] ** 2 + nueva_sigma[jugaron] ** 2)
+
+    nueva_phi = phi.copy()
+    nueva_phi[jugaron] = 1.0 / np.sqrt(1.0 / phi_previa**2 + 1.0 / v)
+    nueva_mu = mu.copy()
+    nueva_mu[jugaron] += nueva_phi[jugaron] ** 2 * suma[jugaron]
+
+    return EstadoGlicko(
+        rating=nueva_mu * ESCALA + RATING_BASE,
+        rd=nueva_phi * ESCALA,
+        volatilidad=nueva_sigma,
+    )
@@ -0,0 +1,267 @@
+"""
+Historial de ratings en arreglos compactos mapeados en memoria.
+
+El historial se guarda en formato CSR: `fechas` (int64, segundos epoch) y
+`ratings` (int16) con las entradas de todos los usuarios, ordenadas por
+usuario y fecha, y `offsets` (int64) indexado por usuario_id, de modo que
+las entradas del usuario u son `[offsets[u], offsets[u + 1])`.
+
+Cada versión se escribe completa en su propio directorio y el archivo
+`ACTUAL` apunta a la vigente; cambiarla es un reemplazo atómico, así los
+lectores (de cualquier worker) ven siempre una versión completa.
+
+Uso:
+    python -m ratings.historial --reconstruir
+"""
+
+import argparse
+import os
+import shutil
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+import numpy as np
+
+from constants import RATINGS_HISTORIAL_DIR, RatingDB
+from utils import iterar_ratings, save_ratings
+from utils.bloqueo import bloqueo_archivo, escribir_atomico
+from utils.repositorio import firma_archivo
+
+# Arreglos de una versión: (offsets, fechas, ratings)
+Arreglos = tuple[np.ndarray, np.ndarray, np.ndarray]
+
+# Intentos de mapear la versión vigente si otro worker la reemplaza
+# mientras se lee
+INTENTOS_CARGA = 3
+
+_VACIO: Arreglos = (
+    np.zeros(1, dtype=np.int64),
+    np.zeros(0, dtype=np.int64),
+    np.zeros(0, dtype=np.int16),
+)
+
+
+def epoch(fecha: datetime) -> int:
+    """Segundos epoch de una fecha; las fechas sin zona se toman como UTC."""
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return int(fecha.timestamp())
+
+
+def construir_csr(
+    usuarios: np.ndarray, fechas: np.ndarray, ratings: np.ndarray
+) -> Arreglos:
+    """
+    Ordena entradas sueltas por usuario y fecha y calcula los offsets.
+
+    El ordenamiento es estable: entradas con la misma fecha conservan el
+    orden de llegada.
+    """
+    orden = np.lexsort((fechas, usuarios))
+    cantidad = int(usuarios.max()) + 1 if len(usuarios) else 0
+    offsets = np.zeros(cantidad + 1, dtype=np.int64)
+    np.cumsum(np.bincount(usuarios, minlength=cantidad), out=offsets[1:])
+    return (
+        offsets,
+        fechas[orden].astype(np.int64),
+        ratings[orden].astype(np.int16),
+    )
+
+
+class HistorialRatings:
+    """Historial de ratings de todos los usuarios con consultas O(1) y por rango."""
+
+    def __init__(self, directorio: str):
+        self.directorio = directorio
+        self._puntero = os.path.join(directorio, "ACTUAL")
+        self._lock = threading.RLock()
+        self._firma = None
+        self._datos: Arreglos = _VACIO
+
+    # Versiones en disco
+    def _cargar_vigente(self) -> bool:
+        """
+        Mapea la versión vigente si cambió.
+
+        Returns:
+            False si no hay ninguna o si no pudo mapearse en INTENTOS_CARGA
+            intentos
+        """
+        for _ in range(INTENTOS_CARGA):
+            firma = firma_archivo(self._puntero)
+            if firma is None:
+                return False
+            if firma == self._firma:
+                return True
+            with self._lock:
+                try:
+                    with open(self._puntero, "r", encoding="utf-8") as f:
+                        version = os.path.join(self.directorio, f.read().strip())
+                    self._datos = tuple(
+                        np.load(os.path.join(version, f"{nombre}.npy"), mmap_mode="r")
+                        for nombre in ("offsets", "fechas", "ratings")
+                    )
+                except FileNotFoundError:
+                    # Otro worker publicó una versión más nueva mientras se leía
+                    continue
+                self._firma = firma
+            return True
+        return False
+
+    def _publicar(self, datos: Arreglos):
+        """Escribe una versión nueva y la marca como vigente (con el bloqueo tomado)."""
+        nombre = f"v{time.time_ns()}"
+        version = os.path.join(self.directorio, nombre)
+        os.makedirs(version)
+        for archivo, arreglo in zip(("offsets", "fechas", "ratings"), datos):
+            with open(os.path.join(version, f"{archivo}.npy"), "wb") as f:
+                np.save(f, arreglo)
+                f.flush()
+                os.fsync(f.fileno())
+        escribir_atomico(self._puntero, nombre.encode("utf-8"))
+
+        # Los lectores que aún mapean una versión vieja la conservan abierta
+        for anterior in os.listdir(self.directorio):
+            if anterior.startswith("v") and anterior != nombre:
+                shutil.rmtree(os.path.join(self.directorio, anterior), True)
+        self._cargar_vigente()
+
+    def _reconstruir(self):
+        """Publica el historial leído del almacenamiento (con el bloqueo tomado)."""
+        usuarios, fechas, ratings = array("q"), array("q"), array("h")
+        for r in iterar_ratings():
+            usuarios.append(r.usuario_id)
+            fechas.append(epoch(r.fecha))
+            ratings.append(r.rating)
+        self._publicar(
+            construir_csr(
+                np.frombuffer(usuarios, dtype=np.int64),
+                np.frombuffer(fechas, dtype=np.int64),
+                np.frombuffer(ratings, dtype=np.int16),
+            )
+        )
+
+    def reconstruir(self):
+        """Reconstruye el historial completo desde el almacenamiento de ratings."""
+        with bloqueo_archivo(self._puntero):
+            self._reconstruir()
+
+    def guardar(self, nuevos: Iterable[RatingDB]):
+        """
+        Guarda ratings nuevos en el almacenamiento y los incorpora al historial.
+
+        Todo ocurre con el bloqueo del historial tomado, así una
+        reconstrucción de otro worker ve los ratings ya incorporados o
+        todavía sin guardar, nunca a medias: no se pierden ni se duplican.
+
+        La incorporación fusiona los nuevos con la versión vigente y escribe
+        una versión completa (con fsync) en un directorio nuevo, así que
+        cuesta O(tamaño del historial) dentro de la solicitud que la pide;
+        se hace una vez por lote (por ejemplo, al finalizar un torneo).
+        """
+        nuevos = list(nuevos)
+        if not nuevos:
+            return
+        with bloqueo_archivo(self._puntero):
+            save_ratings(nuevos)
+            if not self._cargar_vigente():
+                # Sin historial previo: los nuevos ya están en el almacenamiento
+                self._reconstruir()
+                return
+            offsets, fechas, ratings = self._datos
+            previos = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+            datos = construir_csr(
+                np.concatenate(
+                    (previos, np.array([r.usuario_id for r in nuevos], np.int64))
+                ),
+                np.concatenate(
+                    (fechas, np.array([epoch(r.fecha) for r in nuevos], np.int64))
+                ),
+                np.concatenate(
+                    (ratings, np.array([r.rating for r in nuevos], np.int16))
+                ),
+            )
+            self._publicar(datos)
+
+    def arreglos(self) -> Arreglos:
+        """
+        Arreglos (offsets, fechas, ratings) de la versión vigente.
+
+        Mientras no cambie la versión se devuelve siempre la misma tupla, así
+        quien derive datos del historial puede detectar cambios por identidad.
+        Si no hay versión se reconstruye; la aplicación la prepara al arrancar
+        para que no lo haga la primera consulta.
+        """
+        if not self._cargar_vigente():
+            with bloqueo_archivo(self._puntero):
+                # Otro worker pudo publicarla mientras se esperaba el bloqueo
+                if not self._cargar_vigente():
+                    self._reconstruir()
+        return self._datos
+
+    # Consultas
+    def _limites(self, offsets: np.ndarray, usuario_id: int) -> tuple[int, int]:
+        if not 0 <= usuario_id < len(offsets) - 1:
+            return 0, 0
+        return int(offsets[usuario_id]), int(offsets[usuario_id + 1])
+
+    def cantidad(self, usuario_id: int) -> int:
+        """Cantidad de entradas del historial de un usuario."""
+        inicio, fin = self._limites(self.arreglos()[0], usuario_id)
+        return fin - inicio
+
+    def actual(self, usuario_id: int) -> Optional[int]:
+        """Rating más reciente de un usuario en O(1), o None si no tiene."""
+        offsets, _, ratings = self.arreglos()
+        inicio, fin = self._limites(offsets, usuario_id)
+        return int(ratings[fin - 1]) if fin > inicio else None
+
+    def rango(
+        self,
+        usuario_id: int,
+        desde: Optional[datetime] = None,
+        hasta: Optional[datetime] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Entradas de un usuario entre dos fechas (inclusive), por búsqueda binaria.
+
+        Returns:
+            Tupla (fechas en segundos epoch, ratings), como vistas sin copiar
+            de los arreglos mapeados
+        """
+        offsets, fechas, ratings = self.arreglos()
+        inicio, fin = self._limites(offsets, usuario_id)
+        propias = fechas[inicio:fin]
+        if desde is not None:
+            inicio += int(np.searchsorted(propias, epoch(desde), side="left"))
+        if hasta is not None:
+            fin = inicio + int(
+                np.searchsorted(fechas[inicio:fin], epoch(hasta), side="right")
+            )
+        return fechas[inicio:fin], ratings[inicio:fin]
+
+
+historial_ratings = HistorialRatings(RATINGS_HISTORIAL_DIR)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--reconstruir",
+        action="store_true",
+        help="Reconstruir el historial desde el almacenamiento",
+    )
+    args = parser.parse_args()
+    if args.reconstruir:
+        inicio = time.perf_counter()
+        historial_ratings.reconstruir()
+        print(f"Historial reconstruido en {time.perf_counter() - inicio:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
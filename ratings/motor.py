@@ -0,0 +1,134 @@
+from datetime import datetime, timezone
+from typing import Iterable
+
+import numpy as np
+
+from constants import (
+    BYE_ID,
+    PUNTOS_RESULTADO,
+    RATING_INICIAL,
+    RESULTADOS_PARTIDA,
+    PartidaDB,
+    RatingDB,
+)
+from utils import (
+    get_inscripciones_by_torneo,
+    get_next_rating_id,
+    get_partidas_by_torneo,
+    get_torneo_by_id,
+    update_torneo,
+)
+from utils.bloqueo import bloqueo_torneo
+
+from .elo import factores_k, redondear_ratings, variacion_elo
+from .historial import historial_ratings
+
+
+def partida_puntuable(partida: PartidaDB) -> bool:
+    """Una partida cuenta para el rating si se jugó y no es un bye."""
+    return (
+        partida.resultado is not None
+        and partida.resultado != RESULTADOS_PARTIDA["no_jugada"]
+        and partida.jugador_negras_id != BYE_ID
+    )
+
+
+def arreglos_partidas(
+    partidas: Iterable[PartidaDB], slot: dict[int, int]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Convierte partidas en arreglos (blancas, negras, puntos de las blancas).
+
+    Los jugadores se traducen a su índice en los arreglos de ratings según `slot`.
+    """
+    filas = [
+        (
+            slot[p.jugador_blancas_id],
+            slot[p.jugador_negras_id],
+            PUNTOS_RESULTADO[p.resultado][0],
+        )
+        for p in partidas
+    ]
+    if not filas:
+        vacio = np.zeros(0, dtype=np.int64)
+        return vacio, vacio, np.zeros(0)
+    blancas, negras, puntos = zip(*filas)
+    return (
+        np.array(blancas, dtype=np.int64),
+        np.array(negras, dtype=np.int64),
+        np.array(puntos, dtype=np.float64),
+    )
+
+
+def calcular_ratings_torneo(torneo_id: int) -> list[RatingDB]:
+    """
+    Calcula los nuevos ratings de los participantes de un torneo.
+
+    El rating de partida de cada jugador es el último de su historial o, si
+    no tiene, el rating inicial de su inscripción; se consulta en O(1) sin
+    cargar sus RatingDB. Todas las partidas del torneo forman un único
+    período de Elo.
+
+    Returns:
+        Un RatingDB nuevo por cada jugador que disputó al menos una partida
+    """
+    partidas = [p for p in get_partidas_by_torneo(torneo_id) if partida_puntuable(p)]
+    if not partidas:
+        return []
+
+    iniciales = {
+        i.usuario_id: i.rating_inicial for i in get_inscripciones_by_torneo(torneo_id)
+    }
+    jugadores = sorted(
+        {p.jugador_blancas_id for p in partidas}
+        | {p.jugador_negras_id for p in partidas}
+    )
+    slot = {usuario_id: i for i, usuario_id in enumerate(jugadores)}
+
+    ratings = np.empty(len(jugadores), dtype=np.float64)
+    periodos = np.empty(len(jugadores), dtype=np.int64)
+    for i, usuario_id in enumerate(jugadores):
+        actual = historial_ratings.actual(usuario_id)
+        ratings[i] = (
+            actual if actual is not None else iniciales.get(usuario_id, RATING_INICIAL)
+        )
+        periodos[i] = historial_ratings.cantidad(usuario_id)
+
+    blancas, negras, puntos = arreglos_partidas(partidas, slot)
+    nuevos = redondear_ratings(
+        ratings
+        + variacion_elo(ratings, factores_k(ratings, periodos), blancas, negras, puntos)
+    )
+
+    ahora = datetime.now(timezone.utc)
+    return [
+        RatingDB(
+            id=get_next_rating_id(),
+            usuario_id=usuario_id,
+            rating=int(nuevos[i]),
+            fecha=ahora,
+        )
+        for i, usuario_id in enumerate(jugadores)
+    ]
+
+
+def finalizar_ratings_torneo(torneo_id: int) -> list[RatingDB]:
+    """
+    Calcula y guarda, en una sola escritura, los ratings de un torneo finalizado.
+
+    Solo actúa si el torneo tiene `ratings_pendientes`, que se desmarca al
+    terminar, con el bloqueo de ratings del torneo tomado: si falla puede
+    reintentarse y dos llamadas no guardan dos veces los mismos ratings.
+
+    Returns:
+        Los RatingDB guardados (ninguno si no había ratings pendientes)
+    """
+    with bloqueo_torneo(torneo_id, "ratings"):
+        torneo = get_torneo_by_id(torneo_id)
+        if torneo is None or not torneo.ratings_pendientes:
+            return []
+        nuevos = calcular_ratings_torneo(torneo_id)
+        if nuevos:
+            historial_ratings.guardar(nuevos)
+        update_torneo(torneo_id, {"ratings_pendientes": False})
+    return nuevos
@@ -0,0 +1,218 @@
+import threading
+from typing import Optional
+
+import numpy as np
+
+from .elo import RATING_MAX
+from .historial import Arreglos, HistorialRatings, historial_ratings
+
+# Si cambia más de esta fracción de los usuarios, se reconstruye todo de una vez
+FRACCION_RECONSTRUCCION = 0.125
+
+
+class ArbolFenwick:
+    """
+    Árbol de Fenwick (binary indexed tree) de conteos sobre índices 0..n-1.
+
+    Sumar, consultar prefijos y buscar el k-ésimo elemento cuestan O(log n).
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self._arbol = [0] * (n + 1)
+        self.total = 0
+
+    @classmethod
+    def desde_conteos(cls, conteos: list[int]) -> "ArbolFenwick":
+        """Construye el árbol en O(n) a partir del conteo de cada índice."""
+        arbol = cls(len(conteos))
+        arbol._arbol[1:] = conteos
+        for i in range(1, arbol.n + 1):
+            padre = i + (i & -i)
+            if padre <= arbol.n:
+                arbol._arbol[padre] += arbol._arbol[i]
+        arbol.total = sum(conteos)
+        return arbol
+
+    def sumar(self, indice: int, delta: int):
+        self.total += delta
+        i = indice + 1
+        while i <= self.n:
+            self._arbol[i] += delta
+            i += i & -i
+
+    def prefijo(self, indice: int) -> int:
+        """Suma de los conteos de los índices 0..indice (0 si indice < 0)."""
+        suma = 0
+        i = min(indice, self.n - 1) + 1
+        while i > 0:
+            suma += self._arbol[i]
+            i -= i & -i
+        return suma
+
+    def buscar(self, k: int) -> int:
+        """Menor índice cuyo prefijo alcanza k (1 <= k <= total)."""
+        posicion = 0
+        paso = 1 << self.n.bit_length()
+        while paso:
+            siguiente = posicion + paso
+            if siguiente <= self.n and self._arbol[siguiente] < k:
+                posicion = siguiente
+                k -= self._arbol[siguiente]
+            paso >>= 1
+        return posicion
+
+
+class RankingGlobal:
+    """
+    Ranking de todos los usuarios según su rating vigente.
+
+    Un árbol de Fenwick sobre el rango de ratings (0-3000) cuenta cuántos
+    usuarios hay en cada valor, y cada valor guarda el conjunto de sus
+    usuarios. El puesto y el percentil de un usuario cuestan O(log R) y el
+    top-N, O(N + log R) por cada rating distinto recorrido.
+
+    Se sincroniza con el historial de ratings: cuando aparece una versión
+    nueva, solo se mueven los usuarios cuyo rating vigente cambió.
+    """
+
+    def __init__(self, historial: HistorialRatings):
+        self._historial = historial
+        self._lock = threading.RLock()
+        self._version: Optional[Arreglos] = None
+        self._vigente = np.zeros(0, dtype=np.int16)  # -1: sin rating
+        self._arbol = ArbolFenwick(RATING_MAX + 1)
+        self._por_rating: list[set[int]] = [set() for _ in range(RATING_MAX + 1)]
+
+    # Sincronización con el historial
+    def _ratings_vigentes(self, datos: Arreglos) -> np.ndarray:
+        offsets, _, ratings = datos
+        vigente = np.full(len(offsets) - 1, -1, dtype=np.int16)
+        con_rating = np.diff(offsets) > 0
+        vigente[con_rating] = ratings[offsets[1:][con_rating] - 1]
+        return vigente
+
+    def _reconstruir(self, vigente: np.ndarray):
+        usuarios = np.flatnonzero(vigente >= 0)
+        valores = vigente[usuarios].astype(np.int64)
+        conteos = np.bincount(valores, minlength=RATING_MAX + 1)
+        por_valor = np.split(
+            usuarios[np.argsort(valores, kind="stable")], np.cumsum(conteos)[:-1]
+        )
+        self._por_rating = [set(grupo.tolist()) for grupo in por_valor]
+        self._arbol = ArbolFenwick.desde_conteos(conteos.tolist())
+
+    def _sincronizar(self):
+        datos = self._historial.arreglos()
+        if datos is self._version:
+            return
+        with self._lock:
+            if datos is self._version:
+                return
+            nuevo = self._ratings_vigentes(datos)
+            anterior = np.full(len(nuevo), -1, dtype=np.int16)
+            anterior[: len(self._vigente)] = self._vigente[: len(nuevo)]
+            cambiados = np.flatnonzero(nuevo != anterior)
+
+            if len(cambiados) > FRACCION_RECONSTRUCCION * len(nuevo):
+                self._reconstruir(nuevo)
+            else:
+                for usuario_id, viejo, actual in zip(
+                    cambiados.tolist(),
+                    anterior[cambiados].tolist(),
+                    nuevo[cambiados].tolist(),
+                ):
+                    if viejo >= 0:
+                        self._arbol.sumar(viejo, -1)
+                        self._por_rating[viejo].discard(usuario_id)
+                    if actual >= 0:
+                        self._arbol.sumar(actual, 1)
+                        self._por_rating[actual].add(usuario_id)
+            self._vigente = nuevo
+            self._version = datos
+
+    # Consultas
+    def total(self) -> int:
+        """Cantidad de usuarios con rating."""
+        self._sincronizar()
+        return self._arbol.total
+
+    def rating(self, usuario_id: int) -> Optional[int]:
+        """Rating vigente de un usuario o None si no tiene."""
+        self._sincronizar()
+        if not 0 <= usuario_id < len(self._vigente):
+            return None
+        valor = int(self._vigente[usuario_id])
+        return valor if valor >= 0 else None
+
+    def puesto_de_rating(self, rating: int) -> int:
+        """Puesto que corresponde a un rating (los empatados comparten puesto)."""
+        self._sincronizar()
+        return self._arbol.total - self._arbol.prefijo(rating) + 1
+
+    def percentil_de_rating(self, rating: int) -> float:
+        """Porcentaje de usuarios con rating estrictamente menor."""
+        self._sincronizar()
+        if self._arbol.total == 0:
+            return 0.0
+        return 100.0 * self._arbol.prefijo(rating - 1) / self._arbol.total
+
+    def posicion(self, usuario_id: int) -> Optional[tuple[int, int, float]]:
+        """
+        Posición de un usuario en el ranking.
+
+        Returns:
+            Tupla (puesto, rating, percentil) o None si el usuario no tiene rating
+        """
+        with self._lock:
+            rating = self.rating(usuario_id)
+            if rating is None:
+                return None
+            return (
+                self.puesto_de_rating(rating),
+                rating,
+                self.percentil_de_rating(rating),
+            )
+
+    def top(self, limite: int, desde: int = 0) -> list[tuple[int, int, int]]:
+        """
+        Mejores usuarios del ranking, paginados.
+
+        Dentro de un mismo rating se ordena por usuario_id.
+
+        Args:
+            limite: Cantidad máxima de usuarios a devolver
+            desde: Cantidad de usuarios a saltear desde el primero
+
+        Returns:
+            Lista de tuplas (usuario_id, rating, puesto)
+        """
+        self._sincronizar()
+        with self._lock:
+            arbol = self._arbol
+            if desde >= arbol.total or limite <= 0:
+                return []
+
+            # Rating del usuario número `desde + 1`, contando desde arriba
+            rating = arbol.buscar(arbol.total - desde)
+            por_encima = arbol.total - arbol.prefijo(rating)
+            saltear = desde - por_encima
+
+            resultado: list[tuple[int, int, int]] = []
+            while len(resultado) < limite:
+                usuarios = sorted(self._por_rating[rating])[saltear:]
+                puesto = por_encima + 1
+                for usuario_id in usuarios[: limite - len(resultado)]:
+                    resultado.append((usuario_id, rating, puesto))
+                por_encima += len(self._por_rating[rating])
+                saltear = 0
+
+                # Siguiente rating ocupado por debajo del actual
+                restantes = arbol.prefijo(rating - 1)
+                if restantes == 0:
+                    break
+                rating = arbol.buscar(restantes)
+            return resultado
+
+
+ranking_global = RankingGlobal(historial_ratings)
@@ -0,0 +1,229 @@
+"""
+Recalcula todos los ratings reproduciendo el historial completo de partidas.
+
+Cada torneo finalizado es un período de rating y los torneos se procesan en
+orden cronológico (fecha de fin o, si no tiene, de inicio). Todos los
+jugadores parten de RATING_INICIAL.
+
+Uso:
+    python -m ratings.replay [--sistema elo|glicko2] [--guardar]
+"""
+
+import argparse
+import json
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+
+from constants import (
+    ESTADOS_TORNEO,
+    PUNTOS_RESULTADO,
+    RATING_INICIAL,
+    RatingDB,
+)
+from utils import get_next_rating_id, get_torneos, iterar_partidas
+
+from .elo import factores_k, redondear_ratings, variacion_elo
+from .glicko2 import EstadoGlicko, periodo_glicko2
+from .historial import historial_ratings
+from .motor import partida_puntuable
+
+SISTEMAS = ("elo", "glicko2")
+
+
+@dataclass
+class Historial:
+    """Partidas puntuables como arreglos paralelos, con jugadores en índices densos."""
+
+    usuarios: list[int]
+    periodo: np.ndarray
+    blancas: np.ndarray
+    negras: np.ndarray
+    puntos_blancas: np.ndarray
+
+
+@dataclass
+class ResultadoReplay:
+    """Rating final y cantidad de períodos jugados por cada jugador."""
+
+    ratings: np.ndarray
+    periodos: np.ndarray
+
+
+def _como_utc(fecha: datetime) -> datetime:
+    return fecha.replace(tzinfo=timezone.utc) if fecha.tzinfo is None else fecha
+
+
+def cargar_historial() -> Historial:
+    """
+    Carga las partidas puntuables de los torneos finalizados.
+
+    Las partidas se recorren una vez, en streaming, y se acumulan en arreglos
+    compactos en lugar de conservar los objetos PartidaDB.
+    """
+    torneos = sorted(
+        (t for t in get_torneos() if t.estado == ESTADOS_TORNEO["finalizado"]),
+        key=lambda t: (_como_utc(t.fecha_fin or t.fecha_inicio), t.id),
+    )
+    orden = {t.id: i for i, t in enumerate(torneos)}
+
+    slot: dict[int, int] = {}
+    periodo, blancas, negras = array("q"), array("q"), array("q")
+    puntos = array("d")
+    for p in iterar_partidas():
+        if p.torneo_id not in orden or not partida_puntuable(p):
+            continue
+        periodo.append(orden[p.torneo_id])
+        blancas.append(slot.setdefault(p.jugador_blancas_id, len(slot)))
+        negras.append(slot.setdefault(p.jugador_negras_id, len(slot)))
+        puntos.append(PUNTOS_RESULTADO[p.resultado][0])
+
+    return Historial(
+        usuarios=list(slot),
+        periodo=np.frombuffer(periodo, dtype=np.int64),
+        blancas=np.frombuffer(blancas, dtype=np.int64),
+        negras=np.frombuffer(negras, dtype=np.int64),
+        puntos_blancas=np.frombuffer(puntos, dtype=np.float64),
+    )
+
+
+def recalcular(
+    historial: Historial,
+    sistema: str = "elo",
+    iniciales: Optional[np.ndarray] = None,
+) -> ResultadoReplay:
+    """
+    Reproduce todos los períodos del historial.
+
+    Las partidas se ordenan por período una sola vez y cada período se
+    procesa sobre el subconjunto de jugadores que participaron, de modo que
+    el costo es proporcional a la cantidad de partidas y no a jugadores ×
+    períodos.
+
+    Args:
+        historial: Partidas a reproducir
+        sistema: "elo" o "glicko2"
+        iniciales: Rating de partida de cada jugador (RATING_INICIAL si se omite)
+
+    Returns:
+        ResultadoReplay con los ratings finales (sin redondear)
+    """
+    if sistema not in SISTEMAS:
+        raise ValueError(f"Sistema debe ser uno de: {list(SISTEMAS)}")
+
+    n = len(historial.usuarios)
+    ratings = (
+        np.full(n, float(RATING_INICIAL))
+        if iniciales is None
+        else np.asarray(iniciales, dtype=np.float64).copy()
+    )
+    periodos = np.zeros(n, dtype=np.int64)
+    glicko = EstadoGlicko.nuevo(ratings) if sistema == "glicko2" else None
+
+    orden = np.argsort(historial.periodo, kind="stable")
+    periodo = historial.periodo[orden]
+    blancas = historial.blancas[orden]
+    negras = historial.negras[orden]
+    puntos = historial.puntos_blancas[orden]
+    limites = np.concatenate(
+        ([0], np.flatnonzero(np.diff(periodo)) + 1, [len(periodo)])
+    )
+
+    for inicio, fin in zip(limites[:-1].tolist(), limites[1:].tolist()):
+        cantidad = fin - inicio
+        locales, inversa = np.unique(
+            np.concatenate((blancas[inicio:fin], negras[inicio:fin])),
+            return_inverse=True,
+        )
+        b, ng, pt = inversa[:cantidad], inversa[cantidad:], puntos[inicio:fin]
+
+        if glicko is None:
+            r = ratings[locales]
+            k = factores_k(r, periodos[locales])
+            ratings[locales] = r + variacion_elo(r, k, b, ng, pt)
+        else:
+            nuevo = periodo_glicko2(
+                EstadoGlicko(
+                    glicko.rating[locales],
+                    glicko.rd[locales],
+                    glicko.volatilidad[locales],
+                ),
+                b,
+                ng,
+                pt,
+            )
+            glicko.rating[locales] = nuevo.rating
+            glicko.rd[locales] = nuevo.rd
+            glicko.volatilidad[locales] = nuevo.volatilidad
+        periodos[locales] += 1
+
+    return ResultadoReplay(
+        ratings=glicko.rating if glicko is not None else ratings, periodos=periodos
+    )
+
+
+def guardar_resultado(historial: Historial, resultado: ResultadoReplay) -> int:
+    """
+    Guarda el rating recalculado de cada jugador como un RatingDB nuevo.
+
+    El historial previo se conserva; el nuevo registro pasa a ser el último
+    de cada jugador. Todo se guarda en una sola escritura.
+
+    Returns:
+        Cantidad de ratings guardados
+    """
+    ahora = datetime.now(timezone.utc)
+    redondeados = redondear_ratings(resultado.ratings).tolist()
+    nuevos = [
+        RatingDB(
+            id=get_next_rating_id(), usuario_id=usuario_id, rating=rating, fecha=ahora
+        )
+        for usuario_id, rating in zip(historial.usuarios, redondeados)
+    ]
+    historial_ratings.guardar(nuevos)
+    return len(nuevos)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sistema", choices=SISTEMAS, default="elo")
+    parser.add_argument(
+        "--guardar", action="store_true", help="Guardar los ratings recalculados"
+    )
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    historial = cargar_historial()
+    carga = time.perf_counter() - inicio
+    resultado = recalcular(historial, args.sistema)
+    calculo = time.perf_counter() - inicio - carga
+
+    mejores = np.argsort(-resultado.ratings)[:10].tolist()
+    resumen = {
+        "sistema": args.sistema,
+        "jugadores": len(historial.usuarios),
+        "partidas": len(historial.periodo),
+        "periodos": int(len(np.unique(historial.periodo))),
+        "segundos_carga": round(carga, 3),
+        "segundos_calculo": round(calculo, 3),
+        "mejores": [
+            {
+                "usuario_id": historial.usuarios[i],
+                "rating": round(float(resultado.ratings[i]), 1),
+            }
+            for i in mejores
+        ],
+    }
+    if args.guardar:
+        resumen["guardados"] = guardar_resultado(historial, resultado)
+    print(json.dumps(resumen, indent=2))
+
+
+if __name__ == "__main__":
+    main()
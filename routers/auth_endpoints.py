@@ -1,6 +1,11 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+import json
+from typing import AsyncIterator
+from fastapi import APIRouter, HTTPException, status, Depends, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.types import Receive, Scope, Send
 from datetime import datetime, timezone
 from constants import (
+    ROLES,
     UsuarioCrear,
     UsuarioRespuesta,
     LoginRequest,
@@ -10,17 +15,23 @@ from constants import (
 )
 from auth import (
     get_current_user,
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
     verify_token,
 )
+from auth.dependencies import require_organizador_or_admin, usuario_respuesta
+from auth.importacion import ResultadoFila, formato_importacion, importar_usuarios
 from utils import (
+    ejecutar_almacenamiento,
     get_usuario_by_email,
-    get_next_usuario_id,
-    save_usuario,
-    update_usuario,
+    get_usuario_by_email_async,
+    get_usuario_by_id_async,
+    get_next_usuario_id_async,
+    save_usuario_async,
+    update_usuario_async,
+    invalidar_usuario,
 )
 
 router = APIRouter(prefix="/auth", tags=["autenticación"])
@@ -40,15 +51,16 @@ async def register(usuario_data: UsuarioCrear):
     - **rol**: Rol del usuario (por defecto 'jugador')
     """
     # Verificar si el email ya existe
-    if get_usuario_by_email(usuario_data.email):
+    if await get_usuario_by_email_async(usuario_data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="El email ya está registrado",
         )
 
-    # Crear nuevo usuario
-    user_id = get_next_usuario_id()
-    hashed_password = hash_password(usuario_data.password)
+    # Crear nuevo usuario (el hash va primero: si el pool rechaza la
+    # solicitud no se consume un ID)
+    hashed_password = await hash_password_async(usuario_data.password)
+    user_id = await get_next_usuario_id_async()
 
     from constants.modelos import UsuarioDB
 
@@ -64,17 +76,81 @@ async def register(usuario_data: UsuarioCrear):
     )
 
     # Guardar usuario
-    save_usuario(nuevo_usuario)
+    await save_usuario_async(nuevo_usuario)
 
     # Retornar respuesta sin contraseña
-    return UsuarioRespuesta(
-        id=nuevo_usuario.id,
-        email=nuevo_usuario.email,
-        nombre=nuevo_usuario.nombre,
-        apellido=nuevo_usuario.apellido,
-        rol=nuevo_usuario.rol,
-        fecha_creacion=nuevo_usuario.fecha_creacion,
-        activo=nuevo_usuario.activo,
+    return usuario_respuesta(nuevo_usuario)
+
+
+class _RespuestaImportacion(StreamingResponse):
+    """
+    StreamingResponse que responde mientras todavía se lee el cuerpo.
+
+    StreamingResponse espera en paralelo el aviso de desconexión con
+    `receive()`, que se quedaría con las partes del cuerpo que lee la
+    importación. Aquí solo se envía la respuesta: si el cliente se
+    desconecta, `request.stream()` lanza ClientDisconnect y corta el envío.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def _resultados_ndjson(resultados: AsyncIterator[ResultadoFila]):
+    """
+    Serializa los resultados de una importación como NDJSON a medida que llegan.
+
+    Si el archivo resulta demasiado grande, la respuesta ya empezó: el error
+    se informa en una línea antes del resumen.
+    """
+    creados = errores = 0
+    try:
+        async for resultado in resultados:
+            creados += resultado.id is not None
+            errores += resultado.id is None
+            yield json.dumps(resultado.como_dict(), ensure_ascii=False) + "\n"
+    except ValueError as e:
+        yield json.dumps({"error": str(e)}, ensure_ascii=False) + "\n"
+    resumen = {"creados": creados, "errores": errores}
+    yield json.dumps({"resumen": resumen}) + "\n"
+
+
+@router.post("/import")
+async def import_users(
+    request: Request,
+    current_user: UsuarioRespuesta = Depends(require_organizador_or_admin),
+):
+    """
+    Importa usuarios en lote desde un archivo CSV o NDJSON.
+
+    El cuerpo se envía con Content-Type `text/csv` (encabezado con las
+    columnas email, password, nombre, apellido y opcionalmente rol) o
+    `application/x-ndjson` (un objeto UsuarioCrear por línea). Los
+    organizadores solo pueden importar jugadores.
+
+    La respuesta es NDJSON con el resultado de cada fila (`creado` con su ID
+    o `error` con el detalle), que se envía a medida que se guarda cada lote
+    de filas, y una última línea con el resumen. Si el archivo supera el
+    máximo de filas, las filas ya respondidas quedan creadas y se agrega
+    una línea `error` antes del resumen.
+    """
+    formato = formato_importacion(request.headers.get("content-type", ""))
+    if formato is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Use Content-Type text/csv o application/x-ndjson",
+        )
+    roles = (
+        list(ROLES.values())
+        if current_user.rol == ROLES["admin"]
+        else [ROLES["jugador"]]
+    )
+
+    return _RespuestaImportacion(
+        _resultados_ndjson(importar_usuarios(request.stream(), formato, roles)),
+        media_type="application/x-ndjson",
     )
 
 
@@ -87,7 +163,7 @@ async def login(login_data: LoginRequest):
     - **password**: Contraseña del usuario
     """
     # Buscar usuario por email
-    usuario = get_usuario_by_email(login_data.email)
+    usuario = await get_usuario_by_email_async(login_data.email)
     if not usuario:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -95,7 +171,7 @@ async def login(login_data: LoginRequest):
         )
 
     # Verificar contraseña
-    if not verify_password(login_data.password, usuario.password_hash):
+    if not await verify_password_async(login_data.password, usuario.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email o contraseña incorrectos",
@@ -153,8 +229,11 @@ async def get_current_user_info(
 ):
     """
     Obtiene la información del usuario actualmente autenticado.
+
+    El usuario ya viene validado de `get_current_user`, así que se serializa
+    directamente con orjson sin pasar otra vez por el response_model.
     """
-    return current_user
+    return ORJSONResponse(current_user.model_dump(mode="json"))
 
 
 @router.put("/me", response_model=UsuarioRespuesta)
@@ -176,7 +255,7 @@ async def update_profile(
         updates["apellido"] = user_updates.apellido
     if user_updates.email is not None:
         # Verificar que el email no esté en uso por otro usuario
-        existing_user = get_usuario_by_email(user_updates.email)
+        existing_user = await get_usuario_by_email_async(user_updates.email)
         if existing_user and existing_user.id != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -186,31 +265,21 @@ async def update_profile(
 
     if updates:
         updates["fecha_actualizacion"] = datetime.now(timezone.utc)
-        success = update_usuario(current_user.id, updates)
+        success = await update_usuario_async(current_user.id, updates)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
             )
 
     # Retornar usuario actualizado
-    updated_user = (
-        get_usuario_by_email(user_updates.email)
-        if user_updates.email
-        else get_usuario_by_email(current_user.email)
+    # Sin coalescer: una lectura en vuelo desde antes del cambio no lo vería
+    updated_user = await ejecutar_almacenamiento(
+        get_usuario_by_email, user_updates.email or current_user.email
     )
     if updated_user:
-        return UsuarioRespuesta(
-            id=updated_user.id,
-            email=updated_user.email,
-            nombre=updated_user.nombre,
-            apellido=updated_user.apellido,
-            rol=updated_user.rol,
-            fecha_creacion=updated_user.fecha_creacion,
-            fecha_actualizacion=updated_user.fecha_actualizacion,
-            activo=updated_user.activo,
-        )
+        return ORJSONResponse(usuario_respuesta(updated_user).model_dump(mode="json"))
 
-    return current_user
+    return ORJSONResponse(current_user.model_dump(mode="json"))
 
 
 @router.post("/logout")
@@ -237,24 +306,24 @@ async def change_password(
     - **password_actual**: Contraseña actual
     - **password_nueva**: Nueva contraseña (mínimo 8 caracteres)
     """
-    from utils.json_utils import get_usuario_by_id as get_full_user
-
     # Obtener usuario completo con hash de contraseña
-    full_user = get_full_user(current_user.id)
+    full_user = await get_usuario_by_id_async(current_user.id)
     if not full_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
         )
 
     # Verificar contraseña actual
-    if not verify_password(password_data.password_actual, full_user.password_hash):
+    if not await verify_password_async(
+        password_data.password_actual, full_user.password_hash
+    ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Contraseña actual incorrecta",
         )
 
     # Hash de nueva contraseña
-    new_hashed_password = hash_password(password_data.password_nueva)
+    new_hashed_password = await hash_password_async(password_data.password_nueva)
 
     # Actualizar contraseña
     updates = {
@@ -262,10 +331,13 @@ async def change_password(
         "fecha_actualizacion": datetime.now(timezone.utc),
     }
 
-    if not update_usuario(current_user.id, updates):
+    if not await update_usuario_async(current_user.id, updates):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al actualizar contraseña",
         )
 
+    # Descartar el usuario cacheado para que nadie vea el hash anterior
+    invalidar_usuario(current_user.id)
+
     return {"message": "Contraseña cambiada exitosamente"}
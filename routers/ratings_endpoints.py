@@ -0,0 +1,93 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, status
+from constants import HistorialRating, PosicionRanking
+from ratings import historial_ratings, ranking_global
+from utils import cache_usuarios, ejecutar_almacenamiento, get_usuario_by_id
+
+router = APIRouter(prefix="/ratings", tags=["ratings"])
+
+
+def _posicion_ranking(
+    usuario_id: int, rating: int, puesto: int, percentil: float
+) -> PosicionRanking:
+    usuario = cache_usuarios.obtener_o_cargar(usuario_id, get_usuario_by_id)
+    return PosicionRanking(
+        usuario_id=usuario_id,
+        nombre=usuario.nombre if usuario else "",
+        apellido=usuario.apellido if usuario else "",
+        rating=rating,
+        puesto=puesto,
+        percentil=percentil,
+    )
+
+
+@router.get("/ranking", response_model=list[PosicionRanking])
+async def ranking(
+    limite: int = Query(50, ge=1, le=500),
+    desde: int = Query(0, ge=0),
+):
+    """
+    Obtiene el ranking global por rating vigente, paginado.
+
+    Los usuarios con el mismo rating comparten puesto.
+    """
+    return await ejecutar_almacenamiento(_ranking, limite, desde)
+
+
+def _ranking(limite: int, desde: int) -> list[PosicionRanking]:
+    return [
+        _posicion_ranking(
+            usuario_id, rating, puesto, ranking_global.percentil_de_rating(rating)
+        )
+        for usuario_id, rating, puesto in ranking_global.top(limite, desde)
+    ]
+
+
+@router.get("/{usuario_id}/ranking", response_model=PosicionRanking)
+async def posicion_en_ranking(usuario_id: int):
+    """Obtiene el puesto y el percentil de un usuario en el ranking global."""
+    return await ejecutar_almacenamiento(_posicion_en_ranking, usuario_id)
+
+
+def _posicion_en_ranking(usuario_id: int) -> PosicionRanking:
+    posicion = ranking_global.posicion(usuario_id)
+    if posicion is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="El usuario no tiene rating",
+        )
+    puesto, rating, percentil = posicion
+    return _posicion_ranking(usuario_id, rating, puesto, percentil)
+
+
+@router.get("/{usuario_id}/historial", response_model=HistorialRating)
+async def historial(
+    usuario_id: int,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+):
+    """
+    Obtiene la evolución del rating de un usuario, opcionalmente entre dos fechas.
+
+    Las fechas se devuelven en segundos epoch, en una columna paralela a la
+    de ratings, listas para graficar.
+    """
+    return await ejecutar_almacenamiento(_historial, usuario_id, desde, hasta)
+
+
+def _historial(
+    usuario_id: int, desde: Optional[datetime], hasta: Optional[datetime]
+) -> HistorialRating:
+    if cache_usuarios.obtener_o_cargar(usuario_id, get_usuario_by_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
+        )
+    fechas, ratings = historial_ratings.rango(usuario_id, desde, hasta)
+    return HistorialRating(
+        usuario_id=usuario_id,
+        actual=historial_ratings.actual(usuario_id),
+        fechas=fechas.tolist(),
+        ratings=ratings.tolist(),
+    )
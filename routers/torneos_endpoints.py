@@ -0,0 +1,656 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Iterator, Optional
+
+import orjson
+
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    status,
+    Depends,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from constants import (
+    ROLES,
+    ESTADOS_TORNEO,
+    PAGINA_STREAMING,
+    TIPOS_EVENTO,
+    Pagina,
+    PartidaDB,
+    TorneoDB,
+    TorneoRespuesta,
+    TorneoActualizar,
+    InscripcionRespuesta,
+    UsuarioRespuesta,
+    PartidaRespuesta,
+    PartidaActualizarResultado,
+    ResultadosLote,
+    PosicionTabla,
+)
+from auth.dependencies import (
+    require_arbitro_or_admin,
+    require_organizador_or_arbitro_or_admin,
+)
+from ratings import finalizar_ratings_torneo
+from torneos import (
+    generar_siguiente_ronda,
+    aplicar_resultados,
+    obtener_clasificacion,
+    claves_clasificacion,
+    registrar_resultado,
+    registrar_resultados,
+    difusor_eventos,
+    publicar_evento,
+    publicar_eventos,
+    reiniciar_log,
+)
+from utils import (
+    get_torneo_by_id,
+    get_torneo_by_id_async,
+    get_torneos_pagina,
+    update_torneo,
+    get_inscripciones_by_torneo,
+    get_inscripciones_pagina,
+    get_partidas_by_torneo,
+    get_partidas_pagina,
+    save_partidas,
+    recorrer_paginas,
+    ejecutar_almacenamiento,
+    cache_respuestas,
+    versiones,
+)
+from utils.bloqueo import bloqueo_torneo
+
+router = APIRouter(prefix="/torneos", tags=["torneos"])
+
+MEDIA_NDJSON = "application/x-ndjson"
+
+
+def _condicional(
+    request: Request, response: Response, *claves: tuple
+) -> Optional[Response]:
+    """
+    Valida la copia del cliente con las versiones de lo que lee la respuesta.
+
+    Agrega el ETag a la respuesta, calculado sin leer el almacenamiento. Las
+    rutas de un torneo incluyen su clave ("torneo", id): el ETag solo se
+    envía en respuestas 200, así que un torneo inexistente no puede
+    coincidir. `If-None-Match: *` no se atiende porque para saber si el
+    recurso existe habría que leerlo.
+
+    Returns:
+        Una respuesta 304 si el If-None-Match coincide; si no, None y la
+        ruta responde normalmente
+    """
+    variante = f"{request.url.path}?{request.url.query} {_pide_ndjson(request)}"
+    etag = versiones.etag(claves, variante)
+    # no-cache: los clientes y CDNs pueden guardarla, pero revalidan siempre
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+    si_no_coincide = request.headers.get("if-none-match")
+    if si_no_coincide is None:
+        return None
+    # Comparación débil, como pide If-None-Match
+    candidatos = {c.strip().removeprefix("W/") for c in si_no_coincide.split(",")}
+    if etag in candidatos:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers=dict(response.headers)
+        )
+    return None
+
+
+def _pide_ndjson(request: Request) -> bool:
+    return MEDIA_NDJSON in request.headers.get("accept", "")
+
+
+async def _listado(
+    request: Request,
+    response: Response,
+    obtener_pagina: Callable[[int, int], list],
+    modelo: type[BaseModel],
+    despues: int,
+    limite: int,
+):
+    """
+    Responde un listado paginado por cursor o, si se pide NDJSON, en streaming.
+
+    Con `Accept: application/x-ndjson` se envían todos los elementos
+    posteriores a `despues`, uno por línea, leyéndolos de a PAGINA_STREAMING
+    sin cargar el listado entero en memoria (StreamingResponse recorre el
+    iterador en su pool de hilos). Si no, se responde una Pagina con hasta
+    `limite` elementos y el cursor de la siguiente, leída en el pool de
+    almacenamiento.
+    """
+    if _pide_ndjson(request):
+        return StreamingResponse(
+            _lineas_ndjson(recorrer_paginas(obtener_pagina, despues), modelo),
+            media_type=MEDIA_NDJSON,
+            headers=dict(response.headers),
+        )
+    return await ejecutar_almacenamiento(_pagina, obtener_pagina, despues, limite)
+
+
+def _pagina(
+    obtener_pagina: Callable[[int, int], list], despues: int, limite: int
+) -> dict:
+    """Hasta `limite` elementos posteriores a `despues` y el cursor de la siguiente."""
+    # Un elemento de más indica si hay página siguiente
+    elementos = obtener_pagina(despues, limite + 1)
+    siguiente = elementos[limite - 1].id if len(elementos) > limite else None
+    return {"elementos": elementos[:limite], "siguiente": siguiente}
+
+
+def _volcar(elemento: BaseModel, modelo: type[BaseModel]) -> dict:
+    """Datos de un elemento listos para JSON, con los campos de `modelo`."""
+    return elemento.model_dump(mode="json", include=set(modelo.model_fields))
+
+
+async def _cacheada(
+    response: Response,
+    clave: tuple,
+    claves_version: Iterable[tuple],
+    calcular: Callable[[], Optional[bytes]],
+) -> Response:
+    """
+    Responde una lectura pública de un torneo desde la cache de respuestas.
+
+    Args:
+        response: Respuesta con los headers de caché ya agregados
+        clave: Identifica la respuesta (ruta y parámetros)
+        claves_version: Claves de versión de los datos que lee
+        calcular: Lee los datos y retorna el JSON, o None si el torneo no existe
+
+    Raises:
+        HTTPException: Si el torneo no existe
+    """
+    contenido = await cache_respuestas.obtener(clave, claves_version, calcular)
+    if contenido is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Torneo no encontrado"
+        )
+    return Response(
+        contenido, media_type="application/json", headers=dict(response.headers)
+    )
+
+
+def _torneo_json(torneo_id: int) -> Optional[bytes]:
+    torneo = get_torneo_by_id(torneo_id)
+    if torneo is None:
+        return None
+    return orjson.dumps(_volcar(torneo, TorneoRespuesta))
+
+
+def _partidas_json(torneo_id: int, despues: int, limite: int) -> Optional[bytes]:
+    if get_torneo_by_id(torneo_id) is None:
+        return None
+    pagina = _pagina(lambda d, l: get_partidas_pagina(torneo_id, d, l), despues, limite)
+    pagina["elementos"] = [
+        _volcar(partida, PartidaRespuesta) for partida in pagina["elementos"]
+    ]
+    return orjson.dumps(pagina)
+
+
+def _clasificacion_json(torneo_id: int) -> Optional[bytes]:
+    if get_torneo_by_id(torneo_id) is None:
+        return None
+    return orjson.dumps(
+        [
+            posicion.model_dump(mode="json")
+            for posicion in obtener_clasificacion(torneo_id)
+        ]
+    )
+
+
+def _lineas_ndjson(elementos: Iterator[BaseModel], modelo: type[BaseModel]):
+    """Serializa elementos como NDJSON con los campos de `modelo`, por lotes."""
+    campos = set(modelo.model_fields)
+    partes = []
+    for elemento in elementos:
+        partes.append(elemento.model_dump_json(include=campos))
+        if len(partes) >= PAGINA_STREAMING:
+            yield "\n".join(partes) + "\n"
+            partes = []
+    if partes:
+        yield "\n".join(partes) + "\n"
+
+
+def _publicar_partidas(torneo_id: int, tipo: str, partidas: list[PartidaDB]):
+    """
+    Publica partidas nuevas o con resultado y avisa que cambió la tabla.
+
+    La tabla no viaja en el evento: calcularla y serializarla en cada
+    resultado costaría aunque nadie mire el torneo. Los espectadores la
+    piden a `/clasificacion`, que se calcula una vez por versión.
+    """
+    publicar_eventos(
+        torneo_id,
+        [
+            (tipo, [_volcar(partida, PartidaRespuesta) for partida in partidas]),
+            (TIPOS_EVENTO["clasificacion"], None),
+        ],
+    )
+
+
+async def _flujo_sse(torneo_id: int, desde: Optional[int]):
+    """Eventos del torneo en formato Server-Sent Events."""
+    suscripcion = await difusor_eventos.suscribir(torneo_id, desde)
+    try:
+        async for evento in suscripcion.recibir():
+            yield b": keep-alive\n\n" if evento is None else evento.sse
+    finally:
+        difusor_eventos.desuscribir(suscripcion)
+
+
+async def obtener_torneo_existente(torneo_id: int) -> TorneoDB:
+    """
+    Obtiene un torneo por ID, leyéndolo en el pool de almacenamiento.
+
+    Raises:
+        HTTPException: Si el torneo no existe
+    """
+    torneo = await get_torneo_by_id_async(torneo_id)
+    if torneo is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Torneo no encontrado"
+        )
+    return torneo
+
+
+def obtener_torneo_gestionable(
+    torneo_id: int, current_user: UsuarioRespuesta
+) -> TorneoDB:
+    """
+    Obtiene un torneo verificando que el usuario pueda gestionarlo.
+
+    Un organizador solo puede gestionar sus propios torneos; árbitros y
+    administradores pueden gestionar cualquiera.
+
+    Raises:
+        HTTPException: Si el torneo no existe o el usuario no lo organiza
+    """
+    torneo = get_torneo_by_id(torneo_id)
+    if torneo is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Torneo no encontrado"
+        )
+    if (
+        current_user.rol == ROLES["organizador"]
+        and torneo.organizador_id != current_user.id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Solo el organizador del torneo puede gestionarlo",
+        )
+    return torneo
+
+
+@router.get("", response_model=Pagina[TorneoRespuesta])
+async def listar_torneos(
+    request: Request,
+    response: Response,
+    organizador_id: Optional[int] = None,
+    despues: int = Query(0, ge=0),
+    limite: int = Query(50, ge=1, le=500),
+):
+    """
+    Lista los torneos en orden de ID, paginados por cursor.
+
+    `despues` es el cursor (el `siguiente` de la página anterior). Con
+    `Accept: application/x-ndjson` se envían todos en streaming.
+    """
+    no_modificado = _condicional(request, response, ("torneos",))
+    if no_modificado is not None:
+        return no_modificado
+    return await _listado(
+        request,
+        response,
+        lambda d, l: get_torneos_pagina(d, l, organizador_id),
+        TorneoRespuesta,
+        despues,
+        limite,
+    )
+
+
+@router.get("/{torneo_id}", response_model=TorneoRespuesta)
+async def obtener_torneo(request: Request, response: Response, torneo_id: int):
+    """Obtiene los datos de un torneo."""
+    no_modificado = _condicional(request, response, ("torneo", torneo_id))
+    if no_modificado is not None:
+        return no_modificado
+    return await _cacheada(
+        response,
+        ("torneo", torneo_id),
+        [("torneo", torneo_id)],
+        lambda: _torneo_json(torneo_id),
+    )
+
+
+@router.get("/{torneo_id}/inscripciones", response_model=Pagina[InscripcionRespuesta])
+async def listar_inscripciones(
+    request: Request,
+    response: Response,
+    torneo_id: int,
+    despues: int = Query(0, ge=0),
+    limite: int = Query(50, ge=1, le=500),
+):
+    """
+    Lista las inscripciones de un torneo en orden de ID, paginadas por cursor.
+
+    Con `Accept: application/x-ndjson` se envían todas en streaming.
+    """
+    no_modificado = _condicional(
+        request, response, ("torneo", torneo_id), ("inscripciones", torneo_id)
+    )
+    if no_modificado is not None:
+        return no_modificado
+    await obtener_torneo_existente(torneo_id)
+    return await _listado(
+        request,
+        response,
+        lambda d, l: get_inscripciones_pagina(torneo_id, d, l),
+        InscripcionRespuesta,
+        despues,
+        limite,
+    )
+
+
+@router.get("/{torneo_id}/partidas", response_model=Pagina[PartidaRespuesta])
+async def listar_partidas(
+    request: Request,
+    response: Response,
+    torneo_id: int,
+    despues: int = Query(0, ge=0),
+    limite: int = Query(50, ge=1, le=500),
+):
+    """
+    Lista las partidas de un torneo en orden de ID, paginadas por cursor.
+
+    Con `Accept: application/x-ndjson` se envían todas en streaming.
+    """
+    claves = (("torneo", torneo_id), ("partidas", torneo_id))
+    no_modificado = _condicional(request, response, *claves)
+    if no_modificado is not None:
+        return no_modificado
+    if not _pide_ndjson(request):
+        # Los emparejamientos: la misma página para todos los espectadores
+        return await _cacheada(
+            response,
+            ("partidas", torneo_id, despues, limite),
+            claves,
+            lambda: _partidas_json(torneo_id, despues, limite),
+        )
+    await obtener_torneo_existente(torneo_id)
+    return await _listado(
+        request,
+        response,
+        lambda d, l: get_partidas_pagina(torneo_id, d, l),
+        PartidaRespuesta,
+        despues,
+        limite,
+    )
+
+
+@router.get("/{torneo_id}/eventos")
+async def eventos_torneo(
+    request: Request,
+    torneo_id: int,
+    desde: Optional[int] = Query(None, ge=0),
+):
+    """
+    Eventos en vivo del torneo como Server-Sent Events.
+
+    Tipos: `torneo`, `emparejamientos`, `resultados` y `clasificacion`. El
+    `data` de cada evento es JSON con `tipo`, `torneo_id` y `datos`; los de
+    `clasificacion` no traen datos: avisan que la tabla cambió y se obtiene
+    con `/clasificacion`. Para retomar después de una desconexión se envía
+    el ID del último evento recibido en el header Last-Event-ID (o en
+    `desde`); sin él, solo se reciben los eventos nuevos.
+    """
+    await obtener_torneo_existente(torneo_id)
+    ultimo = request.headers.get("last-event-id", "")
+    if ultimo.isdigit():
+        desde = int(ultimo)
+    return StreamingResponse(
+        _flujo_sse(torneo_id, desde),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/{torneo_id}/ws")
+async def eventos_torneo_ws(
+    websocket: WebSocket, torneo_id: int, desde: Optional[int] = None
+):
+    """
+    Los mismos eventos que `/eventos`, por WebSocket: un mensaje de texto
+    JSON por evento. Si la conexión no consume los eventos a tiempo se
+    cierra con el código 1013 y el cliente debe reconectarse.
+    """
+    if await get_torneo_by_id_async(torneo_id) is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    suscripcion = await difusor_eventos.suscribir(torneo_id, desde)
+
+    async def enviar():
+        async for evento in suscripcion.recibir():
+            if evento is not None:
+                await websocket.send_text(evento.texto)
+
+    async def esperar_cierre():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    envio = asyncio.create_task(enviar())
+    cierre = asyncio.create_task(esperar_cierre())
+    try:
+        await asyncio.wait((envio, cierre), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        envio.cancel()
+        cierre.cancel()
+        difusor_eventos.desuscribir(suscripcion)
+    if suscripcion.descartada and not cierre.done():
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+
+
+@router.put("/{torneo_id}", response_model=TorneoRespuesta)
+async def actualizar_torneo(
+    torneo_id: int,
+    datos: TorneoActualizar,
+    current_user: UsuarioRespuesta = Depends(require_organizador_or_arbitro_or_admin),
+):
+    """
+    Actualiza los datos de un torneo.
+
+    Al pasar el torneo a finalizado se calculan los nuevos ratings de todos
+    los participantes y se guardan de una sola vez. Si eso falla, volver a
+    enviar el estado finalizado reintenta el cálculo.
+    """
+    return await ejecutar_almacenamiento(
+        _actualizar_torneo, torneo_id, datos, current_user
+    )
+
+
+def _actualizar_torneo(
+    torneo_id: int, datos: TorneoActualizar, current_user: UsuarioRespuesta
+) -> TorneoDB:
+    """Actualiza el torneo y sus ratings si se finaliza; corre en el pool."""
+    torneo = obtener_torneo_gestionable(torneo_id, current_user)
+    updates = datos.model_dump(exclude_unset=True)
+    if not updates:
+        return torneo
+
+    finaliza = (
+        updates.get("estado") == ESTADOS_TORNEO["finalizado"]
+        and torneo.estado != ESTADOS_TORNEO["finalizado"]
+    )
+    updates["fecha_actualizacion"] = datetime.now(timezone.utc)
+
+    # Al finalizar, el torneo debe seguir en el estado leído: de dos
+    # solicitudes simultáneas solo una hace la transición y marca los ratings
+    # pendientes. Con el bloqueo de resultados no queda ninguno a medio cargar
+    if finaliza:
+        updates["ratings_pendientes"] = True
+        with bloqueo_torneo(torneo_id, "resultados"):
+            actualizado = update_torneo(torneo_id, updates, torneo.estado)
+    else:
+        actualizado = update_torneo(torneo_id, updates)
+    if not actualizado:
+        if finaliza and get_torneo_by_id(torneo_id) is not None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="El torneo cambió de estado mientras se actualizaba",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Torneo no encontrado"
+        )
+    if updates.get("estado") == ESTADOS_TORNEO["finalizado"]:
+        # No hace nada si los ratings ya se guardaron
+        finalizar_ratings_torneo(torneo_id)
+        # El log ya no recibe resultados: se descarta y el evento de
+        # finalización abre uno nuevo
+        reiniciar_log(torneo_id)
+    torneo = get_torneo_by_id(torneo_id)
+    publicar_evento(
+        torneo_id,
+        TIPOS_EVENTO["torneo"],
+        _volcar(torneo, TorneoRespuesta),
+    )
+    return torneo
+
+
+@router.post(
+    "/{torneo_id}/rondas",
+    response_model=list[PartidaRespuesta],
+    status_code=status.HTTP_201_CREATED,
+)
+async def generar_ronda(
+    torneo_id: int,
+    current_user: UsuarioRespuesta = Depends(require_organizador_or_arbitro_or_admin),
+):
+    """
+    Genera los emparejamientos de la próxima ronda del torneo.
+
+    Según el formato: sistema suizo, tabla de Berger (round-robin) o cuadro
+    de eliminación directa. Requiere que todas las partidas de la ronda
+    anterior tengan resultado. Un bye se devuelve como una partida contra
+    el jugador 0 ya ganada.
+    """
+    return await ejecutar_almacenamiento(_generar_ronda, torneo_id, current_user)
+
+
+def _generar_ronda(torneo_id: int, current_user: UsuarioRespuesta) -> list[PartidaDB]:
+    """Empareja y guarda la próxima ronda; corre en el pool de almacenamiento."""
+    # Una ronda por vez en todos los workers: el estado, las partidas (de
+    # las que sale el número de ronda) y los puntos se leen con el bloqueo de
+    # resultados del torneo tomado, así dos solicitudes simultáneas no
+    # emparejan la misma ronda ni una se cruza con resultados o la finalización
+    with bloqueo_torneo(torneo_id, "resultados"):
+        torneo = obtener_torneo_gestionable(torneo_id, current_user)
+        if torneo.estado == ESTADOS_TORNEO["finalizado"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="El torneo ya finalizó",
+            )
+
+        try:
+            nuevas = generar_siguiente_ronda(
+                torneo,
+                get_inscripciones_by_torneo(torneo_id),
+                get_partidas_by_torneo(torneo_id),
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        save_partidas(nuevas)
+        # Los byes ya vienen ganados y suman puntos en la tabla
+        aplicar_resultados(torneo_id, [p for p in nuevas if p.resultado is not None])
+    _publicar_partidas(torneo_id, TIPOS_EVENTO["emparejamientos"], nuevas)
+    return nuevas
+
+
+@router.get("/{torneo_id}/clasificacion", response_model=list[PosicionTabla])
+async def clasificacion(request: Request, response: Response, torneo_id: int):
+    """
+    Obtiene la tabla de posiciones del torneo.
+
+    Ordena por puntos y desempata por Buchholz, Buchholz mediano,
+    Sonneborn-Berger y rating inicial.
+    """
+    claves = claves_clasificacion(torneo_id)
+    no_modificado = _condicional(request, response, *claves)
+    if no_modificado is not None:
+        return no_modificado
+    return await _cacheada(
+        response,
+        ("clasificacion", torneo_id),
+        claves,
+        lambda: _clasificacion_json(torneo_id),
+    )
+
+
+@router.put("/partidas/{partida_id}/resultado", response_model=PartidaRespuesta)
+async def cargar_resultado(
+    partida_id: int,
+    datos: PartidaActualizarResultado,
+    current_user: UsuarioRespuesta = Depends(require_arbitro_or_admin),
+):
+    """
+    Registra o corrige el resultado de una partida.
+
+    La tabla de posiciones y los puntos de las inscripciones se actualizan
+    al instante.
+    """
+    return await ejecutar_almacenamiento(_cargar_resultado, partida_id, datos)
+
+
+def _cargar_resultado(partida_id: int, datos: PartidaActualizarResultado) -> PartidaDB:
+    """Registra el resultado y lo publica; corre en el pool."""
+    try:
+        partida = registrar_resultado(partida_id, datos.resultado)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if partida is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Partida no encontrada"
+        )
+    _publicar_partidas(partida.torneo_id, TIPOS_EVENTO["resultados"], [partida])
+    return partida
+
+
+@router.put("/{torneo_id}/resultados", response_model=list[PartidaRespuesta])
+async def cargar_resultados(
+    torneo_id: int,
+    datos: ResultadosLote,
+    current_user: UsuarioRespuesta = Depends(require_arbitro_or_admin),
+):
+    """
+    Registra o corrige los resultados de varias partidas del torneo a la vez.
+
+    Se aplican todos o ninguno, con una sola escritura de partidas y una de
+    puntos de inscripciones.
+    """
+    return await ejecutar_almacenamiento(_cargar_resultados, torneo_id, datos)
+
+
+def _cargar_resultados(torneo_id: int, datos: ResultadosLote) -> list[PartidaDB]:
+    """Registra los resultados y los publica; corre en el pool."""
+    if get_torneo_by_id(torneo_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Torneo no encontrado"
+        )
+    try:
+        partidas = registrar_resultados(
+            torneo_id, [(r.partida_id, r.resultado) for r in datos.resultados]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    _publicar_partidas(torneo_id, TIPOS_EVENTO["resultados"], partidas)
+    return partidas
@@ -0,0 +1,39 @@
+from .suizo import emparejar_ronda, generar_ronda_suiza, RondaSuiza
+from .calendarios import rondas_round_robin, ronda_berger, cuadro_eliminacion
+from .rondas import generar_siguiente_ronda, iterar_rondas
+from .clasificacion import (
+    MotorClasificacion,
+    obtener_clasificacion,
+    claves_clasificacion,
+    aplicar_resultados,
+    invalidar_motor,
+)
+from .resultados import registrar_resultado, registrar_resultados
+from .eventos import (
+    difusor_eventos,
+    publicar_evento,
+    publicar_eventos,
+    reiniciar_log,
+)
+
+__all__ = [
+    "emparejar_ronda",
+    "generar_ronda_suiza",
+    "RondaSuiza",
+    "rondas_round_robin",
+    "ronda_berger",
+    "cuadro_eliminacion",
+    "generar_siguiente_ronda",
+    "iterar_rondas",
+    "MotorClasificacion",
+    "obtener_clasificacion",
+    "claves_clasificacion",
+    "aplicar_resultados",
+    "invalidar_motor",
+    "registrar_resultado",
+    "registrar_resultados",
+    "difusor_eventos",
+    "publicar_evento",
+    "publicar_eventos",
+    "reiniciar_log",
+]
@@ -0,0 +1,115 @@
+from typing import Generator, Iterator, Optional
+
+from constants import BYE_ID
+
+# Una ronda es una lista de pares (blancas_id, negras_id)
+Ronda = list[tuple[int, int]]
+
+
+def total_rondas_round_robin(cantidad: int) -> int:
+    """Cantidad de rondas de un round-robin simple de `cantidad` jugadores."""
+    if cantidad < 2:
+        return 0
+    return cantidad - 1 if cantidad % 2 == 0 else cantidad
+
+
+def ronda_berger(jugadores: list[int], ronda: int) -> Ronda:
+    """
+    Calcula una ronda de la tabla de Berger en O(n), sin generar las demás.
+
+    Usa el método del círculo: el último jugador queda fijo y el resto rota
+    una posición por ronda. Con cantidad impar se agrega un bye (BYE_ID), y
+    quien lo recibe aparece con blancas frente a BYE_ID.
+
+    Args:
+        jugadores: IDs ordenados por número de sorteo
+        ronda: Número de ronda, desde 1
+
+    Returns:
+        Pares (blancas_id, negras_id) de la ronda
+    """
+    participantes = list(jugadores)
+    if len(participantes) % 2 == 1:
+        participantes.append(BYE_ID)
+    n = len(participantes)
+    total = n - 1
+    if not 1 <= ronda <= total:
+        raise ValueError(f"La ronda debe estar entre 1 y {total}")
+
+    r = ronda - 1
+    fijo = participantes[-1]
+    rival_fijo = participantes[r % total]
+    # El jugador fijo alterna colores ronda a ronda
+    pares = [(rival_fijo, fijo) if r % 2 == 0 else (fijo, rival_fijo)]
+    for i in range(1, n // 2):
+        a = participantes[(r + i) % total]
+        b = participantes[(r - i) % total]
+        pares.append((a, b) if i % 2 == 1 else (b, a))
+
+    # Un bye siempre se registra con el jugador real en blancas
+    return [
+        (negras, blancas) if blancas == BYE_ID else (blancas, negras)
+        for blancas, negras in pares
+    ]
+
+
+def rondas_round_robin(jugadores: list[int]) -> Iterator[Ronda]:
+    """
+    Genera perezosamente las rondas de un round-robin (tabla de Berger).
+
+    Cada ronda se calcula recién cuando se pide, así un torneo con O(n²)
+    partidas nunca las materializa todas a la vez.
+    """
+    for ronda in range(1, total_rondas_round_robin(len(jugadores)) + 1):
+        yield ronda_berger(jugadores, ronda)
+
+
+def orden_siembra(tamano: int) -> list[int]:
+    """
+    Orden de las siembras en un cuadro de `tamano` (potencia de 2).
+
+    Por ejemplo, para 8: [1, 8, 4, 5, 2, 7, 3, 6], de modo que las dos
+    mejores siembras solo pueden cruzarse en la final.
+    """
+    orden = [1]
+    while len(orden) < tamano:
+        total = len(orden) * 2 + 1
+        orden = [s for siembra in orden for s in (siembra, total - siembra)]
+    return orden
+
+
+def cuadro_eliminacion(
+    jugadores: list[int],
+) -> Generator[Ronda, Optional[list[int]], None]:
+    """
+    Genera perezosamente las rondas de un cuadro de eliminación directa.
+
+    El cuadro se completa hasta la siguiente potencia de 2: las mejores
+    siembras reciben bye en la primera ronda (un par contra BYE_ID). Tras
+    cada ronda hay que enviar al generador, con `send`, los ganadores de
+    cada par en el mismo orden en que se entregaron los pares.
+
+    Args:
+        jugadores: IDs ordenados por siembra (el primero es la siembra 1)
+
+    Yields:
+        Pares (blancas_id, negras_id) de cada ronda
+    """
+    if len(jugadores) < 2:
+        return
+    tamano = 1
+    while tamano < len(jugadores):
+        tamano *= 2
+
+    vivos = [
+        jugadores[siembra - 1] if siembra <= len(jugadores) else BYE_ID
+        for siembra in orden_siembra(tamano)
+    ]
+    while len(vivos) > 1:
+        pares = [
+            (b, a) if a == BYE_ID else (a, b) for a, b in zip(vivos[::2], vivos[1::2])
+        ]
+        ganadores = yield pares
+        if ganadores is None or len(ganadores) != len(pares):
+            raise ValueError("Se debe enviar un ganador por cada par de la ronda")
+        vivos = list(ganadores)
@@ -0,0 +1,327 @@
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+from constants import (
+    BYE_ID,
+    CLASIFICACION_TTL,
+    PUNTOS_RESULTADO,
+    RESULTADOS_PARTIDA,
+    InscripcionDB,
+    PartidaDB,
+    PosicionTabla,
+)
+from utils import (
+    cache_usuarios,
+    get_inscripciones_by_torneo,
+    get_partidas_by_torneo,
+    get_usuario_by_id,
+    update_inscripciones,
+    versiones,
+)
+
+# Datos de una partida ya contabilizada: (ronda, blancas_id, negras_id, resultado)
+PartidaContabilizada = tuple[int, int, int, str]
+
+
+class MotorClasificacion:
+    """
+    Tabla de posiciones de un torneo mantenida de forma incremental.
+
+    Cada jugador ocupa un slot en arreglos NumPy (puntos, victorias, etc.) y
+    en una matriz slot × ronda con su rival y su marcador en esa ronda.
+    Registrar un resultado cuesta O(1); los desempates (Buchholz, Buchholz
+    mediano y Sonneborn-Berger) se calculan vectorizados solo cuando la
+    tabla cambió, y mientras tanto se sirve la tabla ya ordenada.
+    """
+
+    def __init__(self, torneo_id: int, inscripciones: list[InscripcionDB]):
+        self.torneo_id = torneo_id
+        self._lock = threading.RLock()
+        self.slot: dict[int, int] = {}
+        self.usuarios: list[int] = []
+        self.inscripcion_ids: list[int] = []
+        self.nombres: list[tuple[str, str]] = []
+
+        capacidad = max(len(inscripciones), 1)
+        self.rating = np.zeros(capacidad, dtype=np.int64)
+        self.puntos = np.zeros(capacidad, dtype=np.float64)
+        self.victorias = np.zeros(capacidad, dtype=np.int32)
+        self.derrotas = np.zeros(capacidad, dtype=np.int32)
+        self.tablas = np.zeros(capacidad, dtype=np.int32)
+        self.rivales = np.full((capacidad, 1), -1, dtype=np.int32)
+        self.marcador = np.zeros((capacidad, 1), dtype=np.float64)
+
+        self._contabilizadas: dict[int, PartidaContabilizada] = {}
+        self._tabla: Optional[list[PosicionTabla]] = None
+
+        for inscripcion in inscripciones:
+            self.agregar_jugador(inscripcion)
+
+    # Slots y capacidad
+    def agregar_jugador(self, inscripcion: InscripcionDB) -> int:
+        """Asigna un slot a un inscripto (si no lo tenía) y retorna el slot."""
+        with self._lock:
+            if inscripcion.usuario_id in self.slot:
+                return self.slot[inscripcion.usuario_id]
+            s = len(self.usuarios)
+            self._asegurar_capacidad(s + 1, self.rivales.shape[1])
+            usuario = cache_usuarios.obtener_o_cargar(
+                inscripcion.usuario_id, get_usuario_by_id
+            )
+            self.slot[inscripcion.usuario_id] = s
+            self.usuarios.append(inscripcion.usuario_id)
+            self.inscripcion_ids.append(inscripcion.id)
+            self.nombres.append(
+                (usuario.nombre, usuario.apellido) if usuario else ("", "")
+            )
+            self.rating[s] = inscripcion.rating_inicial
+            self._tabla = None
+            return s
+
+    def _asegurar_capacidad(self, jugadores: int, rondas: int):
+        filas, columnas = self.rivales.shape
+        if jugadores <= filas and rondas <= columnas:
+            return
+        nuevas_filas = max(jugadores, filas * 2) if jugadores > filas else filas
+        nuevas_columnas = max(columnas, rondas)
+        extra = nuevas_filas - filas
+        for nombre in ("rating", "puntos", "victorias", "derrotas", "tablas"):
+            arreglo = getattr(self, nombre)
+            setattr(
+                self, nombre, np.concatenate([arreglo, np.zeros(extra, arreglo.dtype)])
+            )
+        relleno = ((0, extra), (0, nuevas_columnas - columnas))
+        self.rivales = np.pad(self.rivales, relleno, constant_values=-1)
+        self.marcador = np.pad(self.marcador, relleno)
+
+    # Resultados
+    def _contabilizar(self, datos: PartidaContabilizada, signo: int):
+        ronda, blancas, negras, resultado = datos
+        puntos_blancas, puntos_negras = PUNTOS_RESULTADO[resultado]
+        columna = ronda - 1
+        self._asegurar_capacidad(len(self.usuarios), ronda)
+
+        b = self.slot[blancas]
+        self.puntos[b] += signo * puntos_blancas
+        if negras == BYE_ID:
+            return
+
+        n = self.slot[negras]
+        self.puntos[n] += signo * puntos_negras
+        if resultado == RESULTADOS_PARTIDA["blancas_ganan"]:
+            self.victorias[b] += signo
+            self.derrotas[n] += signo
+        elif resultado == RESULTADOS_PARTIDA["negras_ganan"]:
+            self.victorias[n] += signo
+            self.derrotas[b] += signo
+        elif resultado == RESULTADOS_PARTIDA["tablas"]:
+            self.tablas[b] += signo
+            self.tablas[n] += signo
+
+        jugada = resultado != RESULTADOS_PARTIDA["no_jugada"] and signo > 0
+        self.rivales[b, columna] = n if jugada else -1
+        self.rivales[n, columna] = b if jugada else -1
+        self.marcador[b, columna] = puntos_blancas if jugada else 0
+        self.marcador[n, columna] = puntos_negras if jugada else 0
+
+    def aplicar(self, partida: PartidaDB) -> dict[int, float]:
+        """
+        Registra (o corrige) el resultado de una partida en O(1).
+
+        Si la partida ya estaba contabilizada con otro resultado, primero se
+        revierte su aporte, así que aplicar dos veces la misma partida es
+        seguro.
+
+        Returns:
+            Puntos actualizados de los jugadores afectados, por usuario_id
+        """
+        with self._lock:
+            anterior = self._contabilizadas.pop(partida.id, None)
+            if anterior is not None:
+                self._contabilizar(anterior, -1)
+
+            afectados = [partida.jugador_blancas_id, partida.jugador_negras_id]
+            afectados = [j for j in afectados if j in self.slot]
+            if partida.resultado is not None and len(afectados) == (
+                1 if partida.jugador_negras_id == BYE_ID else 2
+            ):
+                datos = (
+                    partida.ronda,
+                    partida.jugador_blancas_id,
+                    partida.jugador_negras_id,
+                    partida.resultado,
+                )
+                self._contabilizar(datos, 1)
+                self._contabilizadas[partida.id] = datos
+
+            self._tabla = None
+            return {j: float(self.puntos[self.slot[j]]) for j in afectados}
+
+    # Desempates y tabla
+    def desempates(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calcula Buchholz, Buchholz mediano y Sonneborn-Berger de todos los slots.
+
+        Se ignoran los byes y las partidas no jugadas. El Buchholz mediano
+        descarta el mejor y el peor rival cuando hay al menos tres.
+        """
+        n = len(self.usuarios)
+        rivales = self.rivales[:n]
+        jugadas = rivales >= 0
+        puntos_rivales = np.where(jugadas, self.puntos[np.maximum(rivales, 0)], 0.0)
+
+        buchholz = puntos_rivales.sum(axis=1)
+        mejor = np.where(jugadas, puntos_rivales, -np.inf).max(axis=1, initial=-np.inf)
+        peor = np.where(jugadas, puntos_rivales, np.inf).min(axis=1, initial=np.inf)
+        cantidad = jugadas.sum(axis=1)
+        # Solo donde hay tres rivales o más: en el resto mejor y peor son ±inf
+        mediano = buchholz.copy()
+        con_mediano = cantidad >= 3
+        mediano[con_mediano] -= mejor[con_mediano] + peor[con_mediano]
+        sonneborn_berger = (self.marcador[:n] * puntos_rivales).sum(axis=1)
+        return buchholz, mediano, sonneborn_berger
+
+    def tabla(self) -> list[PosicionTabla]:
+        """
+        Tabla de posiciones ordenada por puntos y desempates.
+
+        Se recalcula solo si hubo resultados nuevos desde la última consulta.
+        """
+        with self._lock:
+            if self._tabla is not None:
+                return self._tabla
+
+            n = len(self.usuarios)
+            buchholz, mediano, sonneborn_berger = self.desempates()
+            # np.lexsort ordena por la última clave primero
+            orden = np.lexsort(
+                (
+                    -self.rating[:n],
+                    -sonneborn_berger,
+                    -mediano,
+                    -buchholz,
+                    -self.puntos[:n],
+                )
+            )
+            self._tabla = [
+                PosicionTabla(
+                    usuario_id=self.usuarios[s],
+                    nombre=self.nombres[s][0],
+                    apellido=self.nombres[s][1],
+                    puntos=float(self.puntos[s]),
+                    rating=int(self.rating[s]),
+                    victorias=int(self.victorias[s]),
+                    derrotas=int(self.derrotas[s]),
+                    tablas=int(self.tablas[s]),
+                    buchholz=float(buchholz[s]),
+                    buchholz_mediano=float(mediano[s]),
+                    sonneborn_berger=float(sonneborn_berger[s]),
+                )
+                for s in orden.tolist()
+            ]
+            return self._tabla
+
+
+# Motores por torneo, con el instante (monotónico) en que se construyeron y
+# las versiones (sin las escrituras de este worker) de los datos que leyeron
+_motores: dict[int, tuple[MotorClasificacion, float, tuple[int, ...]]] = {}
+_motores_lock = threading.Lock()
+
+
+def claves_clasificacion(torneo_id: int) -> tuple[tuple, ...]:
+    """
+    Claves de versión (ver utils.versiones) de los datos de la tabla.
+
+    Incluye el torneo, para que un ETag no coincida si no existe, y los
+    usuarios porque la tabla muestra sus nombres.
+    """
+    return (
+        ("torneo", torneo_id),
+        ("inscripciones", torneo_id),
+        ("partidas", torneo_id),
+        ("usuarios",),
+    )
+
+
+def construir_motor(torneo_id: int) -> MotorClasificacion:
+    """Construye el motor de un torneo desde el almacenamiento (O(partidas))."""
+    motor = MotorClasificacion(torneo_id, get_inscripciones_by_torneo(torneo_id))
+    for partida in get_partidas_by_torneo(torneo_id):
+        if partida.resultado is not None:
+            motor.aplicar(partida)
+    return motor
+
+
+def obtener_motor(torneo_id: int) -> MotorClasificacion:
+    """
+    Obtiene el motor de un torneo, construyéndolo si no existe o venció.
+
+    Los resultados registrados en este proceso se aplican al instante; si
+    otro worker modificó las partidas o inscripciones del torneo, o si
+    cambió algún usuario, el motor se reconstruye en la próxima consulta.
+    Además se reconstruye cada CLASIFICACION_TTL segundos.
+    """
+    # Antes de leer: una escritura durante la construcción fuerza otra. Los
+    # nombres no se actualizan en el motor, así que cualquier cambio de
+    # usuarios (también de este proceso) lo reconstruye
+    version = (
+        versiones.ajenas(("inscripciones", torneo_id), ("partidas", torneo_id)),
+        versiones.leer(("usuarios",)),
+    )
+    with _motores_lock:
+        entrada = _motores.get(torneo_id)
+        if (
+            entrada is not None
+            and entrada[2] == version
+            and time.monotonic() - entrada[1] < CLASIFICACION_TTL
+        ):
+            return entrada[0]
+    motor = construir_motor(torneo_id)
+    with _motores_lock:
+        _motores[torneo_id] = (motor, time.monotonic(), version)
+    return motor
+
+
+def invalidar_motor(torneo_id: int):
+    """Descarta el motor de un torneo: se reconstruye en la próxima consulta."""
+    with _motores_lock:
+        _motores.pop(torneo_id, None)
+
+
+def obtener_clasificacion(torneo_id: int) -> list[PosicionTabla]:
+    """Obtiene la tabla de posiciones de un torneo."""
+    return obtener_motor(torneo_id).tabla()
+
+
+def aplicar_resultados(torneo_id: int, partidas: list[PartidaDB]):
+    """
+    Aplica resultados al motor del torneo y actualiza los puntos de las inscripciones.
+
+    Los puntos de todos los jugadores afectados se guardan en una sola escritura.
+    Debe llamarse con `bloqueo_torneo(torneo_id, "resultados")` tomado: el
+    motor se valida adentro (y se reconstruye si otro worker guardó
+    partidas), así dos cargas simultáneas no dejan puntos viejos en las
+    inscripciones, que usa el emparejamiento suizo.
+    """
+    if not partidas:
+        return
+    motor = obtener_motor(torneo_id)
+    jugadores = {p.jugador_blancas_id for p in partidas}
+    jugadores |= {p.jugador_negras_id for p in partidas} - {BYE_ID}
+    if not jugadores <= motor.slot.keys():
+        # Inscripciones posteriores a la construcción del motor
+        invalidar_motor(torneo_id)
+        motor = obtener_motor(torneo_id)
+    puntos: dict[int, float] = {}
+    for partida in partidas:
+        puntos.update(motor.aplicar(partida))
+    if puntos:
+        update_inscripciones(
+            {
+                motor.inscripcion_ids[motor.slot[usuario_id]]: {"puntos": valor}
+                for usuario_id, valor in puntos.items()
+            }
+        )
@@ -0,0 +1,333 @@
+"""
+Eventos en vivo de los torneos: emparejamientos, resultados y tabla.
+
+Cada evento se serializa una sola vez y se anexa como una línea al log del
+torneo (`EVENTOS_DIR/torneo_<id>.log`), que comparten todos los workers.
+Cada worker lee cada EVENTOS_INTERVALO segundos los logs de los torneos con
+espectadores conectados y entrega los mismos bytes a todas las conexiones.
+
+El ID de un evento es el offset del log donde termina, así un cliente que
+se reconecta con el último ID recibido retoma sin perder eventos. Cada
+conexión tiene una cola de EVENTOS_BUFFER eventos: si se llena, la conexión
+se descarta para no frenar a las demás y el cliente debe reconectarse.
+
+Los logs se leen en el pool de almacenamiento, nunca en el event loop. Al
+finalizar un torneo su log se descarta (ver `reiniciar_log`) para que no
+crezca sin límite; los espectadores conectados siguen desde el log nuevo.
+"""
+
+import asyncio
+import os
+from typing import Any, AsyncIterator, Optional
+
+import orjson
+
+from constants import (
+    EVENTOS_BUFFER,
+    EVENTOS_DIR,
+    EVENTOS_INTERVALO,
+    EVENTOS_KEEPALIVE,
+)
+from utils import ejecutar_almacenamiento
+
+
+def log_path(torneo_id: int) -> str:
+    """Ruta del log de eventos de un torneo."""
+    return os.path.join(EVENTOS_DIR, f"torneo_{torneo_id}.log")
+
+
+def _estado(file_path: str) -> tuple[int, int]:
+    """Inodo y tamaño de un log; (0, 0) si no existe."""
+    try:
+        estado = os.stat(file_path)
+    except FileNotFoundError:
+        return 0, 0
+    return estado.st_ino, estado.st_size
+
+
+def reiniciar_log(torneo_id: int):
+    """
+    Descarta el log de eventos de un torneo (por ejemplo, al finalizarlo).
+
+    Los eventos siguientes empiezan un log nuevo, con IDs desde cero: los
+    workers detectan el cambio de inodo y lo leen desde el principio.
+    """
+    try:
+        os.remove(log_path(torneo_id))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Error al reiniciar el log de eventos del torneo {torneo_id}: {e}")
+
+
+def publicar_evento(torneo_id: int, tipo: str, datos: Any):
+    """
+    Publica un evento para los espectadores del torneo en todos los workers.
+
+    Args:
+        torneo_id: ID del torneo
+        tipo: Tipo de evento (uno de TIPOS_EVENTO)
+        datos: Contenido del evento, serializable a JSON
+    """
+    publicar_eventos(torneo_id, [(tipo, datos)])
+
+
+def publicar_eventos(torneo_id: int, eventos: list[tuple[str, Any]]):
+    """
+    Publica varios eventos seguidos del torneo con una sola escritura al log.
+
+    Args:
+        torneo_id: ID del torneo
+        eventos: Tuplas (tipo, datos), en orden
+    """
+    linea = b"".join(
+        tipo.encode("utf-8")
+        + b" "
+        + orjson.dumps({"tipo": tipo, "torneo_id": torneo_id, "datos": datos})
+        + b"\n"
+        for tipo, datos in eventos
+    )
+    try:
+        os.makedirs(EVENTOS_DIR, exist_ok=True)
+        # Una sola escritura con O_APPEND: las líneas de distintos workers
+        # no se intercalan
+        fd = os.open(log_path(torneo_id), os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            vista = memoryview(linea)
+            while vista:
+                # Una escritura corta (p. ej. disco casi lleno) se completa
+                # en lugar de dejar una línea truncada en el log
+                escritos = os.write(fd, vista)
+                if escritos == 0:
+                    raise OSError("el log no admite más datos")
+                vista = vista[escritos:]
+        finally:
+            os.close(fd)
+    except OSError as e:
+        print(f"Error al publicar evento del torneo {torneo_id}: {e}")
+
+
+class Evento:
+    """Evento ya serializado, compartido por todas las conexiones."""
+
+    __slots__ = ("id", "texto", "sse")
+
+    def __init__(self, evento_id: int, tipo: bytes, contenido: bytes):
+        self.id = evento_id
+        # Mensaje de WebSocket y mensaje de Server-Sent Events
+        self.texto = contenido.decode("utf-8")
+        self.sse = b"id: %d\nevent: %s\ndata: %s\n\n" % (evento_id, tipo, contenido)
+
+
+def leer_eventos(
+    torneo_id: int, inicio: int, fin: Optional[int] = None
+) -> tuple[list[Evento], int]:
+    """
+    Lee los eventos completos del log entre dos offsets.
+
+    Si `inicio` no es el final de un evento, se empieza por el siguiente.
+
+    Returns:
+        Tupla (eventos, offset hasta donde se leyó)
+    """
+    desde = max(0, inicio - 1)
+    try:
+        with open(log_path(torneo_id), "rb") as f:
+            f.seek(desde)
+            datos = f.read(-1 if fin is None else fin - desde)
+    except FileNotFoundError:
+        return [], inicio
+
+    # Saltar hasta el primer inicio de línea
+    comienzo = datos.find(b"\n") + 1 if inicio > 0 else 0
+    final = datos.rfind(b"\n") + 1
+    if comienzo == 0 and inicio > 0 or final <= comienzo:
+        return [], inicio
+
+    eventos = []
+    offset = desde + comienzo
+    for linea in datos[comienzo:final].split(b"\n")[:-1]:
+        offset += len(linea) + 1
+        tipo, _, contenido = linea.partition(b" ")
+        if contenido:
+            eventos.append(Evento(offset, tipo, contenido))
+    return eventos, desde + final
+
+
+class Suscripcion:
+    """Conexión de un espectador a los eventos de un torneo."""
+
+    def __init__(self, torneo_id: int):
+        self.torneo_id = torneo_id
+        self.previos: list[Evento] = []
+        self.cola: "asyncio.Queue[Optional[Evento]]" = asyncio.Queue(EVENTOS_BUFFER)
+        self.descartada = False
+
+    def entregar(self, evento: Evento) -> bool:
+        """Encola un evento. Retorna False si la cola está llena."""
+        try:
+            self.cola.put_nowait(evento)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def descartar(self):
+        """Corta la suscripción: el lector recibe lo pendiente y termina."""
+        self.descartada = True
+        while not self.cola.empty():
+            self.cola.get_nowait()
+        self.cola.put_nowait(None)
+
+    async def recibir(self) -> AsyncIterator[Optional[Evento]]:
+        """
+        Itera los eventos en orden, empezando por los previos a la conexión.
+
+        Produce None cada EVENTOS_KEEPALIVE segundos sin eventos (para
+        mantener viva la conexión) y termina si la suscripción se descarta.
+        """
+        previos, self.previos = self.previos, []
+        for evento in previos:
+            yield evento
+        while True:
+            try:
+                evento = await asyncio.wait_for(self.cola.get(), EVENTOS_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            if evento is None:
+                return
+            yield evento
+
+
+class _Canal:
+    """Estado de un torneo con espectadores en este worker."""
+
+    __slots__ = ("inodo", "offset", "suscripciones")
+
+    def __init__(self, inodo: int, offset: int):
+        self.inodo = inodo
+        self.offset = offset
+        self.suscripciones: set[Suscripcion] = set()
+
+
+def _leer_pendientes(
+    posiciones: dict[int, tuple[int, int]],
+) -> dict[int, tuple[int, int, list[Evento]]]:
+    """
+    Lee los eventos nuevos de varios logs; corre en el pool.
+
+    Args:
+        posiciones: (inodo, offset) ya leídos de cada torneo
+
+    Returns:
+        (inodo, offset, eventos) nuevos de los torneos cuyo log cambió
+    """
+    leidos = {}
+    for torneo_id, (inodo, offset) in posiciones.items():
+        actual, tamano = _estado(log_path(torneo_id))
+        if actual != inodo or tamano < offset:
+            # El log se reinició
+            offset = 0
+        if (actual, tamano) == (inodo, offset):
+            continue
+        eventos, offset = leer_eventos(torneo_id, offset)
+        leidos[torneo_id] = (actual, offset, eventos)
+    return leidos
+
+
+class DifusorEventos:
+    """
+    Reparte los eventos de los logs a las conexiones de este worker.
+
+    Todos los métodos se llaman desde el event loop; los logs se leen en el
+    pool de almacenamiento.
+    """
+
+    def __init__(self):
+        self._canales: dict[int, _Canal] = {}
+        self._tarea: Optional[asyncio.Task] = None
+
+    def _asegurar_lector(self):
+        loop = asyncio.get_running_loop()
+        if self._tarea is not None and self._tarea.get_loop() is not loop:
+            # Las conexiones de otro event loop ya no existen
+            self._canales.clear()
+            self._tarea = None
+        if self._tarea is None or self._tarea.done():
+            self._tarea = loop.create_task(self._leer_logs())
+
+    async def _leer_logs(self):
+        while self._canales:
+            await self.repartir()
+            await asyncio.sleep(EVENTOS_INTERVALO)
+
+    async def repartir(self):
+        """Lee los eventos nuevos de cada torneo con espectadores y los entrega."""
+        posiciones = {
+            torneo_id: (canal.inodo, canal.offset)
+            for torneo_id, canal in self._canales.items()
+        }
+        if not posiciones:
+            return
+        leidos = await ejecutar_almacenamiento(_leer_pendientes, posiciones)
+        for torneo_id, (inodo, offset, eventos) in leidos.items():
+            canal = self._canales.get(torneo_id)
+            if canal is None or (canal.inodo, canal.offset) != posiciones[torneo_id]:
+                # El canal se cerró (o se recreó) durante la lectura
+                continue
+            canal.inodo, canal.offset = inodo, offset
+            for evento in eventos:
+                for suscripcion in list(canal.suscripciones):
+                    if not suscripcion.entregar(evento):
+                        canal.suscripciones.discard(suscripcion)
+                        suscripcion.descartar()
+
+    async def suscribir(
+        self, torneo_id: int, desde: Optional[int] = None
+    ) -> Suscripcion:
+        """
+        Suscribe una conexión a los eventos de un torneo.
+
+        La conexión recibe los eventos nuevos desde que se registra; los
+        anteriores que pide `desde` se leen en el pool mientras tanto.
+
+        Args:
+            torneo_id: ID del torneo
+            desde: ID del último evento recibido; los posteriores se entregan
+                primero. Sin él, solo se reciben los eventos nuevos.
+        """
+        # Antes de tocar los canales: descarta los de otro event loop
+        self._asegurar_lector()
+        if torneo_id not in self._canales:
+            estado = await ejecutar_almacenamiento(_estado, log_path(torneo_id))
+            if torneo_id not in self._canales:
+                self._canales[torneo_id] = _Canal(*estado)
+        canal = self._canales[torneo_id]
+        suscripcion = Suscripcion(torneo_id)
+        canal.suscripciones.add(suscripcion)
+        # El lector pudo terminar sin canales durante la espera
+        self._asegurar_lector()
+
+        hasta = canal.offset
+        if desde is not None and desde < hasta:
+            suscripcion.previos, _ = await ejecutar_almacenamiento(
+                leer_eventos, torneo_id, desde, hasta
+            )
+        return suscripcion
+
+    def desuscribir(self, suscripcion: Suscripcion):
+        """Quita una conexión; el torneo deja de leerse si no quedan espectadores."""
+        canal = self._canales.get(suscripcion.torneo_id)
+        if canal is None:
+            return
+        canal.suscripciones.discard(suscripcion)
+        if not canal.suscripciones:
+            del self._canales[suscripcion.torneo_id]
+
+    def espectadores(self, torneo_id: int) -> int:
+        """Cantidad de conexiones de este worker a los eventos de un torneo."""
+        canal = self._canales.get(torneo_id)
+        return len(canal.suscripciones) if canal else 0
+
+
+difusor_eventos = DifusorEventos()
@@ -0,0 +1,106 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from constants import BYE_ID, ESTADOS_TORNEO, PartidaDB
+from utils import (
+    get_partida_by_id,
+    get_partidas_by_torneo,
+    get_torneo_by_id,
+    update_partidas,
+)
+from utils.bloqueo import bloqueo_torneo
+
+from .clasificacion import aplicar_resultados
+
+
+def _verificar_no_finalizado(torneo_id: int):
+    """Rechaza cambios de resultados en un torneo finalizado (con el bloqueo tomado)."""
+    torneo = get_torneo_by_id(torneo_id)
+    if torneo is not None and torneo.estado == ESTADOS_TORNEO["finalizado"]:
+        raise ValueError("El torneo ya finalizó: no se pueden modificar resultados")
+
+
+def registrar_resultado(partida_id: int, resultado: str) -> Optional[PartidaDB]:
+    """
+    Guarda el resultado de una partida y lo aplica a la tabla de posiciones.
+
+    Corregir un resultado ya cargado revierte el anterior en la tabla.
+
+    Args:
+        partida_id: ID de la partida
+        resultado: Uno de RESULTADOS_PARTIDA
+
+    Returns:
+        PartidaDB actualizada o None si la partida no existe
+
+    Raises:
+        ValueError: Si la partida es un bye o el torneo ya finalizó
+    """
+    partida = get_partida_by_id(partida_id)
+    if partida is None:
+        return None
+    if partida.jugador_negras_id == BYE_ID:
+        raise ValueError("El resultado de un bye no se puede modificar")
+
+    with bloqueo_torneo(partida.torneo_id, "resultados"):
+        _verificar_no_finalizado(partida.torneo_id)
+        cambios = {
+            "resultado": resultado,
+            "fecha_resultado": datetime.now(timezone.utc),
+        }
+        update_partidas({partida_id: cambios})
+        partida = partida.model_copy(update=cambios)
+        aplicar_resultados(partida.torneo_id, [partida])
+    return partida
+
+
+def registrar_resultados(
+    torneo_id: int, resultados: list[tuple[int, str]]
+) -> list[PartidaDB]:
+    """
+    Guarda los resultados de varias partidas de un torneo de una sola vez.
+
+    Se validan todas antes de guardar: si alguna falla no se guarda ninguna.
+    Las partidas se actualizan en una sola escritura y los puntos de las
+    inscripciones afectadas, en otra.
+
+    Args:
+        torneo_id: ID del torneo
+        resultados: Tuplas (partida_id, resultado), cada resultado uno de
+            RESULTADOS_PARTIDA
+
+    Returns:
+        Partidas actualizadas, en el orden recibido
+
+    Raises:
+        ValueError: Si una partida se repite, no es del torneo o es un bye, o
+            si el torneo ya finalizó
+    """
+    existentes = {p.id: p for p in get_partidas_by_torneo(torneo_id)}
+    vistos: set[int] = set()
+    for partida_id, _ in resultados:
+        if partida_id in vistos:
+            raise ValueError(f"La partida {partida_id} está repetida")
+        vistos.add(partida_id)
+        partida = existentes.get(partida_id)
+        if partida is None:
+            raise ValueError(f"La partida {partida_id} no pertenece al torneo")
+        if partida.jugador_negras_id == BYE_ID:
+            raise ValueError(
+                f"El resultado de un bye no se puede modificar (partida {partida_id})"
+            )
+
+    ahora = datetime.now(timezone.utc)
+    cambios = {
+        partida_id: {"resultado": resultado, "fecha_resultado": ahora}
+        for partida_id, resultado in resultados
+    }
+    with bloqueo_torneo(torneo_id, "resultados"):
+        _verificar_no_finalizado(torneo_id)
+        update_partidas(cambios)
+        partidas = [
+            existentes[partida_id].model_copy(update=cambios[partida_id])
+            for partida_id, _ in resultados
+        ]
+        aplicar_resultados(torneo_id, partidas)
+    return partidas
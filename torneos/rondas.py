@@ -0,0 +1,170 @@
+from datetime import datetime, timezone
+from itertools import islice
+
+from constants import (
+    BYE_ID,
+    FORMATOS_TORNEO,
+    RESULTADOS_PARTIDA,
+    InscripcionDB,
+    PartidaDB,
+    TorneoDB,
+)
+from utils import get_next_partida_id
+
+from .calendarios import (
+    Ronda,
+    cuadro_eliminacion,
+    ronda_berger,
+    rondas_round_robin,
+    total_rondas_round_robin,
+)
+from .suizo import generar_ronda_suiza
+
+
+def _por_siembra(inscripciones: list[InscripcionDB]) -> list[int]:
+    """IDs de los jugadores ordenados por rating inicial (siembra 1 primero)."""
+    ordenadas = sorted(inscripciones, key=lambda i: (-i.rating_inicial, i.usuario_id))
+    return [i.usuario_id for i in ordenadas]
+
+
+def _ganador(partida: PartidaDB, siembra: dict[int, int]) -> int:
+    """
+    Ganador de una partida de eliminación.
+
+    Tablas o partida no jugada se desempatan a favor de la mejor siembra.
+    """
+    if partida.jugador_negras_id == BYE_ID:
+        return partida.jugador_blancas_id
+    if partida.resultado == RESULTADOS_PARTIDA["blancas_ganan"]:
+        return partida.jugador_blancas_id
+    if partida.resultado == RESULTADOS_PARTIDA["negras_ganan"]:
+        return partida.jugador_negras_id
+    return min(
+        (partida.jugador_blancas_id, partida.jugador_negras_id),
+        key=lambda j: siembra.get(j, len(siembra)),
+    )
+
+
+def _ronda_eliminacion(
+    inscripciones: list[InscripcionDB], partidas: list[PartidaDB], ronda: int
+) -> Ronda:
+    """
+    Reconstruye el cuadro hasta la ronda pedida usando los resultados guardados.
+
+    El generador del cuadro solo avanza ronda a ronda con los ganadores
+    reales, así nunca se calcula más allá de la ronda siguiente.
+    """
+    jugadores = _por_siembra(inscripciones)
+    siembra = {j: i for i, j in enumerate(jugadores)}
+    por_ronda: dict[int, dict[frozenset, PartidaDB]] = {}
+    for p in partidas:
+        clave = frozenset((p.jugador_blancas_id, p.jugador_negras_id))
+        por_ronda.setdefault(p.ronda, {})[clave] = p
+
+    cuadro = cuadro_eliminacion(jugadores)
+    pares = next(cuadro, None)
+    for numero in range(1, ronda):
+        if pares is None:
+            break
+        jugadas = por_ronda.get(numero, {})
+        ganadores = []
+        for blancas, negras in pares:
+            partida = jugadas.get(frozenset((blancas, negras)))
+            if partida is None:
+                raise ValueError(f"Faltan partidas de la ronda {numero}")
+            ganadores.append(_ganador(partida, siembra))
+        try:
+            pares = cuadro.send(ganadores)
+        except StopIteration:
+            pares = None
+
+    if pares is None:
+        raise ValueError("El cuadro de eliminación ya tiene un campeón")
+    return pares
+
+
+def calcular_ronda(
+    torneo: TorneoDB,
+    inscripciones: list[InscripcionDB],
+    partidas: list[PartidaDB],
+    ronda: int,
+) -> Ronda:
+    """
+    Calcula los pares de una ronda de round-robin o de eliminación.
+
+    Raises:
+        ValueError: Si la ronda no existe para el formato del torneo
+    """
+    if torneo.formato == FORMATOS_TORNEO["round_robin"]:
+        jugadores = _por_siembra(inscripciones)
+        total = total_rondas_round_robin(len(jugadores))
+        if ronda > total:
+            raise ValueError(f"El round-robin tiene {total} rondas")
+        return ronda_berger(jugadores, ronda)
+
+    if torneo.formato == FORMATOS_TORNEO["eliminacion"]:
+        return _ronda_eliminacion(inscripciones, partidas, ronda)
+
+    raise ValueError(f"Formato no soportado para calendarios: {torneo.formato}")
+
+
+def crear_partidas(torneo_id: int, ronda: int, pares: Ronda) -> list[PartidaDB]:
+    """Convierte los pares de una ronda en PartidaDB; los byes quedan ganados."""
+    ahora = datetime.now(timezone.utc)
+    partidas = []
+    for blancas, negras in pares:
+        es_bye = negras == BYE_ID
+        partidas.append(
+            PartidaDB(
+                id=get_next_partida_id(),
+                torneo_id=torneo_id,
+                ronda=ronda,
+                jugador_blancas_id=blancas,
+                jugador_negras_id=negras,
+                resultado=RESULTADOS_PARTIDA["blancas_ganan"] if es_bye else None,
+                fecha_creacion=ahora,
+                fecha_resultado=ahora if es_bye else None,
+            )
+        )
+    return partidas
+
+
+def generar_siguiente_ronda(
+    torneo: TorneoDB,
+    inscripciones: list[InscripcionDB],
+    partidas: list[PartidaDB],
+) -> list[PartidaDB]:
+    """
+    Genera las partidas de la próxima ronda según el formato del torneo.
+
+    Solo se calcula la ronda siguiente: el resto del calendario nunca se
+    materializa, y las partidas devueltas se guardan de una sola vez.
+
+    Raises:
+        ValueError: Si la ronda anterior no terminó o el torneo no tiene más rondas
+    """
+    if torneo.formato == FORMATOS_TORNEO["suizo"]:
+        return generar_ronda_suiza(torneo, inscripciones, partidas)
+
+    if any(p.resultado is None for p in partidas):
+        raise ValueError("La ronda anterior tiene partidas sin resultado")
+    ronda = max((p.ronda for p in partidas), default=0) + 1
+    pares = calcular_ronda(torneo, inscripciones, partidas, ronda)
+    return crear_partidas(torneo.id, ronda, pares)
+
+
+def iterar_rondas(torneo: TorneoDB, inscripciones: list[InscripcionDB], desde: int = 1):
+    """
+    Recorre perezosamente las rondas restantes de un round-robin.
+
+    Útil para exportar o mostrar el calendario completo ronda a ronda sin
+    construir todas las partidas en memoria.
+
+    Yields:
+        Tuplas (número de ronda, pares de la ronda)
+    """
+    if torneo.formato != FORMATOS_TORNEO["round_robin"]:
+        raise ValueError("Solo el round-robin tiene calendario fijo")
+
+    rondas = rondas_round_robin(_por_siembra(inscripciones))
+    yield from enumerate(islice(rondas, desde - 1, None), start=desde)
@@ -0,0 +1,341 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from constants import (
+    BYE_ID,
+    RESULTADOS_PARTIDA,
+    InscripcionDB,
+    PartidaDB,
+    TorneoDB,
+)
+from utils import get_next_partida_id
+
+# Colores
+BLANCAS = 1
+NEGRAS = -1
+
+# Cantidad máxima de emparejamientos ya hechos que se revisan al intentar
+# reparar los jugadores que quedaron sin rival en el último grupo
+MAX_REPARACIONES = 256
+
+
+class MatrizEnfrentamientos:
+    """
+    Matriz de bits n×n que indica qué jugadores ya se enfrentaron.
+
+    Ocupa n²/8 bytes (12,5 MB para 10.000 jugadores) y responde en O(1).
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self._bits = bytearray((n * n + 7) // 8)
+
+    def marcar(self, i: int, j: int):
+        for a, b in ((i, j), (j, i)):
+            pos = a * self.n + b
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def jugaron(self, i: int, j: int) -> bool:
+        pos = i * self.n + j
+        return bool(self._bits[pos >> 3] & (1 << (pos & 7)))
+
+
+@dataclass
+class RondaSuiza:
+    """Emparejamientos de una ronda: pares (blancas, negras) y el bye, si hay."""
+
+    pares: list[tuple[int, int]]
+    bye: Optional[int] = None
+
+
+class _EstadoSuizo:
+    """Historial de cada jugador indexado por su posición en el ranking."""
+
+    def __init__(
+        self,
+        jugadores: list[tuple[int, float, int]],
+        historial: Iterable[tuple[int, int]],
+    ):
+        # Orden del ranking: puntos, rating y luego ID
+        self.jugadores = sorted(jugadores, key=lambda j: (-j[1], -j[2], j[0]))
+        n = len(self.jugadores)
+        self.ids = [j[0] for j in self.jugadores]
+        self.puntos = [j[1] for j in self.jugadores]
+        self.slot = {usuario_id: i for i, usuario_id in enumerate(self.ids)}
+
+        self.matriz = MatrizEnfrentamientos(n)
+        self.diferencia = [0] * n  # blancas - negras
+        self.ultimo = [0] * n  # último color jugado
+        self.repetido = [False] * n  # los dos últimos colores coinciden
+        self.tuvo_bye = [False] * n
+
+        for blancas, negras in historial:
+            if negras == BYE_ID:
+                if blancas in self.slot:
+                    self.tuvo_bye[self.slot[blancas]] = True
+                continue
+            b = self.slot.get(blancas)
+            nb = self.slot.get(negras)
+            if b is not None and nb is not None:
+                self.matriz.marcar(b, nb)
+            for s, color in ((b, BLANCAS), (nb, NEGRAS)):
+                if s is None:
+                    continue
+                self.diferencia[s] += color
+                self.repetido[s] = self.ultimo[s] == color
+                self.ultimo[s] = color
+
+    def preferencia(self, s: int) -> tuple[int, bool]:
+        """Color preferido por el jugador y si la preferencia es absoluta."""
+        d = self.diferencia[s]
+        u = self.ultimo[s]
+        if d <= -2 or (u == NEGRAS and self.repetido[s]):
+            return BLANCAS, True
+        if d >= 2 or (u == BLANCAS and self.repetido[s]):
+            return NEGRAS, True
+        if d < 0:
+            return BLANCAS, False
+        if d > 0:
+            return NEGRAS, False
+        return -u, False
+
+    def compatibles(self, a: int, b: int) -> bool:
+        """Dos jugadores pueden enfrentarse si no jugaron y sus colores no chocan."""
+        if self.matriz.jugaron(a, b):
+            return False
+        color_a, absoluta_a = self.preferencia(a)
+        color_b, absoluta_b = self.preferencia(b)
+        return not (absoluta_a and absoluta_b and color_a == color_b)
+
+    def asignar_colores(self, a: int, b: int, tablero: int) -> tuple[int, int]:
+        """Asigna colores a un par (a mejor rankeado que b). Retorna (blancas, negras)."""
+        color_a, absoluta_a = self.preferencia(a)
+        color_b, absoluta_b = self.preferencia(b)
+        if color_a and color_a != color_b:
+            blancas_a = color_a == BLANCAS
+        elif color_b and not color_a:
+            blancas_a = color_b == NEGRAS
+        elif color_a:
+            # Misma preferencia: la cumple quien la tenga más fuerte, y si no
+            # hay diferencia, el mejor rankeado
+            fuerza_a = (absoluta_a, abs(self.diferencia[a]))
+            fuerza_b = (absoluta_b, abs(self.diferencia[b]))
+            gana_a = fuerza_a >= fuerza_b
+            blancas_a = (color_a == BLANCAS) == gana_a
+        else:
+            # Sin preferencias (primera ronda): alternar por tablero
+            blancas_a = tablero % 2 == 0
+        return (a, b) if blancas_a else (b, a)
+
+
+def _elegir_bye(estado: _EstadoSuizo, disponibles: list[int]) -> int:
+    """El peor rankeado que todavía no tuvo bye (o el último si todos tuvieron)."""
+    for s in reversed(disponibles):
+        if not estado.tuvo_bye[s]:
+            return s
+    return disponibles[-1]
+
+
+def _emparejar_grupo(
+    estado: _EstadoSuizo, grupo: list[int]
+) -> tuple[list[tuple[int, int]], list[int]]:
+    """
+    Empareja un grupo de puntaje dividiéndolo en mitad superior e inferior.
+
+    Cada jugador de la mitad superior se empareja con su homólogo de la
+    mitad inferior o, si no es posible (revancha o choque de colores), con
+    el siguiente compatible más cercano. Los que no consiguen rival se
+    intentan emparejar entre sí y el resto desciende al siguiente grupo.
+
+    Returns:
+        Pares (a, b) con a mejor rankeado, y jugadores que descienden
+    """
+    mitad = len(grupo) // 2
+    superior, inferior = grupo[:mitad], grupo[mitad:]
+    libre = [True] * len(inferior)
+    pares: list[tuple[int, int]] = []
+    sin_rival: list[int] = []
+
+    for i, a in enumerate(superior):
+        elegido = -1
+        # Buscar desde el homólogo hacia abajo y luego hacia arriba
+        for j in range(i, len(inferior)):
+            if libre[j] and estado.compatibles(a, inferior[j]):
+                elegido = j
+                break
+        else:
+            for j in range(min(i, len(inferior)) - 1, -1, -1):
+                if libre[j] and estado.compatibles(a, inferior[j]):
+                    elegido = j
+                    break
+        if elegido < 0:
+            sin_rival.append(a)
+        else:
+            libre[elegido] = False
+            pares.append((a, inferior[elegido]))
+
+    restantes = sorted(sin_rival + [b for j, b in enumerate(inferior) if libre[j]])
+    descienden: list[int] = []
+    while restantes:
+        a = restantes.pop(0)
+        for k, b in enumerate(restantes):
+            if estado.compatibles(a, b):
+                pares.append((a, restantes.pop(k)))
+                break
+        else:
+            descienden.append(a)
+    return pares, descienden
+
+
+def _reparar(
+    estado: _EstadoSuizo, pares: list[tuple[int, int]], restantes: list[int]
+) -> list[int]:
+    """
+    Intenta ubicar a los jugadores sin rival deshaciendo pares ya formados.
+
+    Para cada par de jugadores sin rival (x, y) busca, desde los últimos
+    grupos hacia arriba, un par (a, b) tal que x-a e y-b (o x-b e y-a) sean
+    válidos, y lo reemplaza por esos dos pares.
+
+    Returns:
+        Jugadores que siguen sin rival
+    """
+    sin_rival = list(restantes)
+    inicio = max(0, len(pares) - MAX_REPARACIONES)
+    cambiado = True
+    while len(sin_rival) >= 2 and cambiado:
+        cambiado = False
+        candidatos = (
+            (x, y) for i, x in enumerate(sin_rival) for y in sin_rival[i + 1 :]
+        )
+        for x, y in candidatos:
+            for k in range(len(pares) - 1, inicio - 1, -1):
+                a, b = pares[k]
+                for p, q in ((a, b), (b, a)):
+                    if estado.compatibles(x, p) and estado.compatibles(y, q):
+                        pares[k] = (min(x, p), max(x, p))
+                        pares.append((min(y, q), max(y, q)))
+                        sin_rival.remove(x)
+                        sin_rival.remove(y)
+                        cambiado = True
+                        break
+                if cambiado:
+                    break
+            if cambiado:
+                break
+    return sin_rival
+
+
+def emparejar_ronda(
+    jugadores: list[tuple[int, float, int]],
+    historial: Iterable[tuple[int, int]],
+) -> RondaSuiza:
+    """
+    Genera los emparejamientos suizos de la próxima ronda.
+
+    Agrupa a los jugadores por puntaje, empareja cada grupo (mitad superior
+    contra mitad inferior) respetando que no haya revanchas y equilibrando
+    colores, y hace descender a los que no encuentran rival. Si la cantidad
+    es impar, el peor rankeado sin bye previo recibe el bye. Como último
+    recurso, si un par sin rival no admite reparación, se permite la revancha.
+
+    Args:
+        jugadores: Tuplas (usuario_id, puntos, rating)
+        historial: Partidas previas como tuplas (blancas_id, negras_id);
+            un bye se indica con negras_id igual a BYE_ID
+
+    Returns:
+        RondaSuiza con los pares (blancas_id, negras_id) y el bye
+    """
+    estado = _EstadoSuizo(jugadores, historial)
+    disponibles = list(range(len(estado.ids)))
+    bye = None
+    if len(disponibles) % 2 == 1:
+        bye = _elegir_bye(estado, disponibles)
+        disponibles.remove(bye)
+
+    pares: list[tuple[int, int]] = []
+    descienden: list[int] = []
+    inicio = 0
+    while inicio < len(disponibles):
+        fin = inicio
+        puntos = estado.puntos[disponibles[inicio]]
+        while fin < len(disponibles) and estado.puntos[disponibles[fin]] == puntos:
+            fin += 1
+        grupo = descienden + disponibles[inicio:fin]
+        pares_grupo, descienden = _emparejar_grupo(estado, grupo)
+        pares.extend(pares_grupo)
+        inicio = fin
+
+    sin_rival = _reparar(estado, pares, descienden)
+    # Último recurso: revanchas entre los que siguen sin rival
+    pares.extend(zip(sin_rival[::2], sin_rival[1::2]))
+
+    pares.sort()
+    emparejamientos = [
+        estado.asignar_colores(a, b, tablero) for tablero, (a, b) in enumerate(pares)
+    ]
+    return RondaSuiza(
+        pares=[(estado.ids[b], estado.ids[n]) for b, n in emparejamientos],
+        bye=estado.ids[bye] if bye is not None else None,
+    )
+
+
+def generar_ronda_suiza(
+    torneo: TorneoDB,
+    inscripciones: list[InscripcionDB],
+    partidas: list[PartidaDB],
+) -> list[PartidaDB]:
+    """
+    Construye las partidas de la próxima ronda de un torneo suizo.
+
+    Args:
+        torneo: Torneo a emparejar
+        inscripciones: Inscripciones del torneo (puntos y rating inicial)
+        partidas: Partidas ya jugadas en el torneo
+
+    Returns:
+        Lista de PartidaDB de la nueva ronda (incluye el bye, con negras_id
+        igual a BYE_ID y resultado ya cargado)
+
+    Raises:
+        ValueError: Si la ronda anterior no terminó o ya se jugaron todas
+    """
+    ronda = max((p.ronda for p in partidas), default=0) + 1
+    if ronda > torneo.max_rondas:
+        raise ValueError(f"El torneo ya jugó sus {torneo.max_rondas} rondas")
+    if any(p.resultado is None for p in partidas):
+        raise ValueError("La ronda anterior tiene partidas sin resultado")
+
+    resultado = emparejar_ronda(
+        [(i.usuario_id, i.puntos, i.rating_inicial) for i in inscripciones],
+        ((p.jugador_blancas_id, p.jugador_negras_id) for p in partidas),
+    )
+
+    ahora = datetime.now(timezone.utc)
+    nuevas = [
+        PartidaDB(
+            id=get_next_partida_id(),
+            torneo_id=torneo.id,
+            ronda=ronda,
+            jugador_blancas_id=blancas,
+            jugador_negras_id=negras,
+            fecha_creacion=ahora,
+        )
+        for blancas, negras in resultado.pares
+    ]
+    if resultado.bye is not None:
+        nuevas.append(
+            PartidaDB(
+                id=get_next_partida_id(),
+                torneo_id=torneo.id,
+                ronda=ronda,
+                jugador_blancas_id=resultado.bye,
+                jugador_negras_id=BYE_ID,
+                resultado=RESULTADOS_PARTIDA["blancas_ganan"],
+                fecha_creacion=ahora,
+                fecha_resultado=ahora,
+            )
+        )
+    return nuevas
@@ -1,19 +1,186 @@
-from .json_utils import (
-    load_json,
-    save_json,
-    get_next_usuario_id,
-    get_usuario_by_email,
-    get_usuario_by_id,
-    save_usuario,
-    update_usuario,
-)
+from constants import BACKENDS_ALMACENAMIENTO, STORAGE_BACKEND
+from logs.metricas import medir_almacenamiento
+
+from .asincrono import ejecutar_almacenamiento, leer_coalescido, version_async
+from .cache import cache_respuestas, cache_usuarios, invalidar_usuario
+from .json_utils import load_json, save_json
+from .paginacion import recorrer_paginas
+from .versiones import versionar, versiones
+
+if STORAGE_BACKEND == BACKENDS_ALMACENAMIENTO["sqlite"]:
+    from .sqlite_utils import (
+        get_next_usuario_id,
+        get_next_usuario_ids,
+        get_emails_registrados,
+        get_usuario_by_email,
+        get_usuario_by_id,
+        get_usuario_indexado,
+        save_usuario,
+        save_usuarios,
+        update_usuario,
+        get_next_torneo_id,
+        get_torneo_by_id,
+        get_torneos,
+        get_torneos_by_organizador,
+        get_torneos_pagina,
+        save_torneo,
+        update_torneo,
+        get_next_inscripcion_id,
+        get_inscripcion_by_id,
+        get_inscripciones_by_usuario,
+        get_inscripciones_by_torneo,
+        get_inscripciones_pagina,
+        save_inscripcion,
+        update_inscripciones,
+        get_next_partida_id,
+        get_partida_by_id,
+        get_partidas_by_torneo,
+        get_partidas_pagina,
+        iterar_partidas,
+        save_partida,
+        save_partidas,
+        update_partidas,
+        get_next_rating_id,
+        get_ratings_by_usuario,
+        iterar_ratings,
+        save_rating,
+        save_ratings,
+    )
+else:
+    from .json_utils import (
+        get_next_usuario_id,
+        get_next_usuario_ids,
+        get_emails_registrados,
+        get_usuario_by_email,
+        get_usuario_by_id,
+        get_usuario_indexado,
+        save_usuario,
+        save_usuarios,
+        update_usuario,
+        get_next_torneo_id,
+        get_torneo_by_id,
+        get_torneos,
+        get_torneos_by_organizador,
+        get_torneos_pagina,
+        save_torneo,
+        update_torneo,
+        get_next_inscripcion_id,
+        get_inscripcion_by_id,
+        get_inscripciones_by_usuario,
+        get_inscripciones_by_torneo,
+        get_inscripciones_pagina,
+        save_inscripcion,
+        update_inscripciones,
+        get_next_partida_id,
+        get_partida_by_id,
+        get_partidas_by_torneo,
+        get_partidas_pagina,
+        iterar_partidas,
+        save_partida,
+        save_partidas,
+        update_partidas,
+        get_next_rating_id,
+        get_ratings_by_usuario,
+        iterar_ratings,
+        save_rating,
+        save_ratings,
+    )
 
 __all__ = [
     "load_json",
     "save_json",
+    "recorrer_paginas",
+    "ejecutar_almacenamiento",
+    "leer_coalescido",
+    "versiones",
+    "cache_usuarios",
+    "cache_respuestas",
+    "invalidar_usuario",
     "get_next_usuario_id",
+    "get_next_usuario_ids",
+    "get_emails_registrados",
     "get_usuario_by_email",
     "get_usuario_by_id",
+    "get_usuario_indexado",
     "save_usuario",
+    "save_usuarios",
     "update_usuario",
+    "get_next_torneo_id",
+    "get_torneo_by_id",
+    "get_torneos",
+    "get_torneos_by_organizador",
+    "get_torneos_pagina",
+    "save_torneo",
+    "update_torneo",
+    "get_next_inscripcion_id",
+    "get_inscripcion_by_id",
+    "get_inscripciones_by_usuario",
+    "get_inscripciones_by_torneo",
+    "get_inscripciones_pagina",
+    "save_inscripcion",
+    "update_inscripciones",
+    "get_next_partida_id",
+    "get_partida_by_id",
+    "get_partidas_by_torneo",
+    "get_partidas_pagina",
+    "iterar_partidas",
+    "save_partida",
+    "save_partidas",
+    "update_partidas",
+    "get_next_rating_id",
+    "get_ratings_by_usuario",
+    "iterar_ratings",
+    "save_rating",
+    "save_ratings",
+    "get_next_usuario_id_async",
+    "get_usuario_by_email_async",
+    "get_usuario_by_id_async",
+    "get_torneo_by_id_async",
+    "save_usuario_async",
+    "update_usuario_async",
 ]
+
+
+def _torneos_de(obtener, ids) -> set[int]:
+    return {registro.torneo_id for registro in map(obtener, ids) if registro}
+
+
+# Versiones que incrementa cada escritura (ver utils.versiones)
+_VERSIONADAS = {
+    "save_usuario": lambda *_: [("usuarios",)],
+    "save_usuarios": lambda *_: [("usuarios",)],
+    "update_usuario": lambda *_: [("usuarios",)],
+    "save_torneo": lambda torneo: [("torneos",), ("torneo", torneo.id)],
+    "update_torneo": lambda torneo_id, *_: [("torneos",), ("torneo", torneo_id)],
+    "save_inscripcion": lambda inscripcion: [("inscripciones", inscripcion.torneo_id)],
+    "update_inscripciones": lambda cambios: [
+        ("inscripciones", torneo_id)
+        for torneo_id in _torneos_de(get_inscripcion_by_id, cambios)
+    ],
+    "save_partida": lambda partida: [("partidas", partida.torneo_id)],
+    "save_partidas": lambda nuevas: [("partidas", p.torneo_id) for p in nuevas],
+    "update_partidas": lambda cambios: [
+        ("partidas", torneo_id) for torneo_id in _torneos_de(get_partida_by_id, cambios)
+    ],
+    "save_rating": lambda *_: [("ratings",)],
+    "save_ratings": lambda *_: [("ratings",)],
+}
+for _nombre, _claves in _VERSIONADAS.items():
+    globals()[_nombre] = versionar(_claves)(globals()[_nombre])
+
+# Duración de cada función de almacenamiento, expuesta en /metrics. Los
+# iteradores no se miden: solo se mediría la creación del generador.
+for _nombre in __all__:
+    if _nombre.endswith("_async"):
+        continue
+    if _nombre.startswith(("get_", "save_", "update_")):
+        globals()[_nombre] = medir_almacenamiento(globals()[_nombre])
+
+# Versiones awaitable para las rutas async: corren en el pool de
+# almacenamiento y las lecturas iguales en vuelo se comparten
+get_next_usuario_id_async = version_async(get_next_usuario_id)
+get_usuario_by_email_async = version_async(get_usuario_by_email, coalescer=True)
+get_usuario_by_id_async = version_async(get_usuario_by_id, coalescer=True)
+get_torneo_by_id_async = version_async(get_torneo_by_id, coalescer=True)
+save_usuario_async = version_async(save_usuario)
+update_usuario_async = version_async(update_usuario)
@@ -0,0 +1,87 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from constants import ALMACENAMIENTO_WORKERS
+
+T = TypeVar("T")
+
+# Las lecturas y escrituras (open, json, fsync, sqlite) corren en estos
+# hilos para que un disco lento no frene al resto de las solicitudes
+_pool_almacenamiento = ThreadPoolExecutor(
+    max_workers=ALMACENAMIENTO_WORKERS, thread_name_prefix="almacenamiento"
+)
+
+# Ejecuciones en vuelo por (event loop, clave)
+_en_vuelo: dict[Hashable, "asyncio.Future[Any]"] = {}
+
+
+async def ejecutar_almacenamiento(funcion: Callable[..., T], *args) -> T:
+    """Ejecuta una función de almacenamiento en el pool y espera su resultado."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pool_almacenamiento, funcion, *args)
+
+
+async def ejecutar_coalescido(clave: Hashable, funcion: Callable[..., T], *args) -> T:
+    """
+    Ejecuta una función en el pool una sola vez por clave mientras está en
+    vuelo: las llamadas con la misma clave esperan el mismo resultado.
+
+    Args:
+        clave: Identifica a las llamadas que pueden compartir el resultado
+        funcion: Función sin efectos más allá de los de la primera llamada
+        *args: Argumentos de la función
+
+    Returns:
+        El resultado de `funcion(*args)`, el mismo objeto para todos los que
+        esperaban la misma clave
+    """
+    loop = asyncio.get_running_loop()
+    clave = (loop, clave)
+    futuro = _en_vuelo.get(clave)
+    if futuro is None:
+        futuro = loop.run_in_executor(_pool_almacenamiento, funcion, *args)
+        _en_vuelo[clave] = futuro
+        futuro.add_done_callback(lambda _: _en_vuelo.pop(clave, None))
+    # Si se cancela una solicitud, la ejecución sigue para las demás
+    return await asyncio.shield(futuro)
+
+
+async def leer_coalescido(funcion: Callable[..., T], *args) -> T:
+    """
+    Ejecuta una lectura en el pool, compartiendo el resultado entre las
+    solicitudes que piden lo mismo mientras la lectura está en vuelo.
+
+    Args:
+        funcion: Función de lectura (sin efectos) del almacenamiento
+        *args: Argumentos de la función; deben ser hasheables
+
+    Returns:
+        El resultado de `funcion(*args)`, el mismo objeto para todos los que
+        esperaban la misma lectura
+    """
+    return await ejecutar_coalescido((funcion, args), funcion, *args)
+
+
+def version_async(
+    funcion: Callable[..., T], coalescer: bool = False
+) -> Callable[..., Awaitable[T]]:
+    """
+    Versión awaitable de una función de almacenamiento.
+
+    Args:
+        funcion: Función sincrónica de utils
+        coalescer: Si es una lectura que puede compartirse entre solicitudes
+
+    Returns:
+        Función async con los mismos argumentos
+    """
+    ejecutar = leer_coalescido if coalescer else ejecutar_almacenamiento
+
+    @wraps(funcion)
+    async def envoltura(*args):
+        return await ejecutar(funcion, *args)
+
+    envoltura.__name__ = envoltura.__qualname__ = f"{funcion.__name__}_async"
+    return envoltura
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from constants import BLOQUEOS_DIR
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+def _bloquear(fd: int):
+    if os.name == "nt":
+        # msvcrt.locking reintenta solo 10 veces: se reintenta hasta obtenerlo
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                time.sleep(0.01)
+    fcntl.flock(fd, fcntl.LOCK_EX)
+
+
+def _desbloquear(fd: int):
+    if os.name == "nt":
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+@contextmanager
+def bloqueo_archivo(file_path: str) -> Iterator[None]:
+    """
+    Bloqueo exclusivo entre procesos asociado a un archivo.
+
+    Usa un archivo auxiliar `<file_path>.lock`, de modo que el archivo de
+    datos puede reemplazarse atómicamente mientras el bloqueo está tomado.
+    """
+    directorio = os.path.dirname(file_path)
+    if directorio and not os.path.exists(directorio):
+        os.makedirs(directorio, exist_ok=True)
+
+    fd = os.open(file_path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        _bloquear(fd)
+        try:
+            yield
+        finally:
+            _desbloquear(fd)
+    finally:
+        os.close(fd)
+
+
+def bloqueo_torneo(torneo_id: int, recurso: str):
+    """
+    Bloqueo entre procesos de un recurso de un torneo (p. ej. "resultados").
+
+    No es reentrante: no debe tomarse dos veces el mismo en un hilo.
+    """
+    return bloqueo_archivo(os.path.join(BLOQUEOS_DIR, f"torneo_{torneo_id}_{recurso}"))
+
+
+def escribir_atomico(file_path: str, datos: bytes):
+    """
+    Escribe un archivo de forma atómica y durable.
+
+    Los datos se escriben en un archivo temporal del mismo directorio, se
+    sincronizan a disco y luego se renombran sobre el destino: un lector (o
+    un crash) ve el archivo viejo completo o el nuevo completo, nunca uno
+    truncado.
+    """
+    directorio = os.path.dirname(file_path) or "."
+    fd, temporal = tempfile.mkstemp(
+        dir=directorio, prefix=os.path.basename(file_path) + ".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(datos)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, file_path)
+    except BaseException:
+        try:
+            os.remove(temporal)
+        except FileNotFoundError:
+            pass
+        raise
+
+    if os.name != "nt":
+        # Sincronizar el directorio para que el rename sobreviva a un crash
+        fd_dir = os.open(directorio, os.O_RDONLY)
+        try:
+            os.fsync(fd_dir)
+        finally:
+            os.close(fd_dir)
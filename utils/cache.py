@@ -0,0 +1,177 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Generic,
+    Hashable,
+    Iterable,
+    Optional,
+    TypeVar,
+)
+
+from constants import (
+    CACHE_RESPUESTAS_MAX,
+    CACHE_RESPUESTAS_TTL,
+    USUARIO_CACHE_MAX,
+    USUARIO_CACHE_TTL,
+)
+from logs.metricas import respuestas_cacheadas_total
+
+from .asincrono import ejecutar_coalescido
+from .versiones import Clave, versiones
+
+V = TypeVar("V")
+
+
+class CacheLRU(Generic[V]):
+    """
+    Cache LRU acotada y segura entre hilos, con expiración por entrada.
+
+    Cada entrada expira en el instante (epoch, segundos) indicado al
+    guardarla o, si no se indica, `ttl` segundos después.
+    """
+
+    def __init__(self, max_entradas: int, ttl: Optional[float] = None):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._datos: "OrderedDict[Hashable, tuple[V, Optional[float]]]" = OrderedDict()
+
+    def obtener(self, clave: Hashable) -> Optional[V]:
+        """Obtiene el valor vigente de una clave o None si no está o expiró."""
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            valor, expira = entrada
+            if expira is not None and expira <= time.time():
+                del self._datos[clave]
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave: Hashable, valor: V, expira: Optional[float] = None):
+        """Guarda un valor, descartando el menos usado si se supera el máximo."""
+        if expira is None and self.ttl is not None:
+            expira = time.time() + self.ttl
+        with self._lock:
+            self._datos[clave] = (valor, expira)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def obtener_o_cargar(
+        self, clave: Hashable, cargar: Callable[[Any], Optional[V]]
+    ) -> Optional[V]:
+        """Obtiene el valor cacheado o lo carga con `cargar(clave)` y lo guarda."""
+        valor = self.obtener(clave)
+        if valor is None:
+            valor = cargar(clave)
+            if valor is not None:
+                self.guardar(clave, valor)
+        return valor
+
+    async def obtener_o_cargar_async(
+        self, clave: Hashable, cargar: Callable[[Any], Awaitable[Optional[V]]]
+    ) -> Optional[V]:
+        """Como obtener_o_cargar, pero esperando a `cargar(clave)` si falta."""
+        valor = self.obtener(clave)
+        if valor is None:
+            valor = await cargar(clave)
+            if valor is not None:
+                self.guardar(clave, valor)
+        return valor
+
+    def invalidar(self, clave: Hashable):
+        """Elimina una clave de la cache."""
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def limpiar(self):
+        """Vacía la cache."""
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+
+class CacheRespuestas:
+    """
+    Respuestas ya serializadas de lecturas caras, por clave.
+
+    Cada respuesta guarda las versiones (ver utils.versiones) de los datos
+    que leyó y solo se usa mientras sigan siendo las actuales: cualquier
+    escritura de cualquier worker la invalida al instante. El TTL acota lo
+    que tarda en verse un cambio que no pasa por las escrituras de utils
+    (por ejemplo, el nombre de un jugador en la tabla).
+
+    Los fallos simultáneos de la misma clave y versión comparten un solo
+    cálculo: miles de solicitudes de la misma tabla justo después de una
+    ronda calculan y serializan la tabla una vez.
+    """
+
+    def __init__(self, max_entradas: int, ttl: Optional[float] = None):
+        self._cache: CacheLRU[tuple[tuple[int, ...], Optional[bytes]]] = CacheLRU(
+            max_entradas, ttl
+        )
+
+    def _calcular(
+        self,
+        clave: Hashable,
+        version: tuple[int, ...],
+        calcular: Callable[[], Optional[bytes]],
+    ) -> Optional[bytes]:
+        contenido = calcular()
+        self._cache.guardar(clave, (version, contenido))
+        respuestas_cacheadas_total.sumar(("calculo",))
+        return contenido
+
+    async def obtener(
+        self,
+        clave: Hashable,
+        claves_version: Iterable[Clave],
+        calcular: Callable[[], Optional[bytes]],
+    ) -> Optional[bytes]:
+        """
+        Obtiene la respuesta vigente o la calcula en el pool de almacenamiento.
+
+        Args:
+            clave: Identifica la respuesta (ruta y parámetros)
+            claves_version: Claves de versión de los datos que lee
+            calcular: Función que lee los datos y retorna la respuesta
+                serializada, o None si el recurso no existe
+
+        Returns:
+            La respuesta serializada, o None si el recurso no existe
+        """
+        # Antes de calcular: una escritura durante el cálculo lo invalida
+        version = versiones.leer(*claves_version)
+        entrada = self._cache.obtener(clave)
+        if entrada is not None and entrada[0] == version:
+            respuestas_cacheadas_total.sumar(("acierto",))
+            return entrada[1]
+        return await ejecutar_coalescido(
+            ("respuesta", clave, version), self._calcular, clave, version, calcular
+        )
+
+    def limpiar(self):
+        """Vacía la cache."""
+        self._cache.limpiar()
+
+
+# Registros de usuario por ID. El TTL acota cuánto tarda en verse un cambio
+# hecho por otro worker; los cambios del propio worker invalidan al instante.
+cache_usuarios: CacheLRU = CacheLRU(USUARIO_CACHE_MAX, ttl=USUARIO_CACHE_TTL)
+
+
+def invalidar_usuario(user_id: int):
+    """Descarta el usuario cacheado para que la próxima lectura vaya al almacenamiento."""
+    cache_usuarios.invalidar(user_id)
+
+
+# Respuestas de las lecturas públicas de torneos
+cache_respuestas = CacheRespuestas(CACHE_RESPUESTAS_MAX, ttl=CACHE_RESPUESTAS_TTL)
@@ -0,0 +1,260 @@
+"""
+Índice binario de usuarios compartido entre workers.
+
+Cada versión se guarda en su propio directorio como arreglos .npy que los
+workers mapean en memoria en modo solo lectura; las páginas las comparte el
+sistema operativo, así que agregar workers no agrega una copia de los
+usuarios por proceso:
+
+- entradas: indexado por usuario_id, con (offset, longitud) del registro
+  en `registros`, el rol (posición en ROLES) y el flag activo
+- registros: los demás campos públicos de cada usuario, en JSON
+
+Como en el historial de ratings, el archivo `ACTUAL` apunta a la versión
+vigente y se reemplaza atómicamente. Cada versión recuerda la firma de
+usuarios.json (y de su journal) con la que se construyó: cuando cambia, un
+solo worker la reconstruye en segundo plano y los demás mapean la nueva.
+La revisión también corre en segundo plano: las consultas usan la última
+versión mapeada sin tocar el disco. Hasta entonces los cambios hechos por
+otros workers no se ven (como con la cache de usuarios); los usuarios que
+modificó este worker se leen del almacenamiento.
+
+Cada reconstrucción es completa: con el backend JSON ver un cambio ya exige
+releer usuarios.json entero, y armar los arreglos cuesta poco más que eso.
+Como corre fuera de las solicitudes y a lo sumo una vez por revisión, una
+ráfaga de escrituras produce una sola reconstrucción.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import numpy as np
+import orjson
+
+from constants import INDICE_USUARIOS_INTERVALO, ROLES, UsuarioRespuesta
+
+from .bloqueo import bloqueo_archivo, escribir_atomico
+from .repositorio import construir_confiable, firma_archivo
+
+ENTRADA = np.dtype(
+    [("offset", "<i8"), ("longitud", "<u4"), ("rol", "u1"), ("activo", "u1")]
+)
+ARREGLOS = ("entradas", "registros")
+
+# Arreglos de una versión: (entradas, registros)
+Arreglos = tuple[np.ndarray, np.ndarray]
+
+LISTA_ROLES = list(ROLES.values())
+# Campos guardados en `registros` (id, rol y activo van en las entradas)
+CAMPOS_REGISTRO = tuple(
+    campo
+    for campo in UsuarioRespuesta.model_fields
+    if campo not in ("id", "rol", "activo")
+)
+
+
+def construir_arreglos(usuarios: list[dict[str, Any]]) -> Arreglos:
+    """Construye los arreglos del índice a partir de los registros de usuario."""
+    usuarios = [u for u in usuarios if isinstance(u.get("id"), int) and u["id"] >= 0]
+    ids = np.array([u["id"] for u in usuarios], dtype=np.int64)
+    entradas = np.zeros(int(ids.max()) + 1 if len(ids) else 0, dtype=ENTRADA)
+
+    partes, longitudes = [], []
+    for usuario in usuarios:
+        registro = orjson.dumps(
+            {campo: usuario.get(campo) for campo in CAMPOS_REGISTRO}
+        )
+        partes.append(registro)
+        longitudes.append(len(registro))
+
+    longitudes = np.array(longitudes, dtype=np.int64)
+    entradas["longitud"][ids] = longitudes
+    entradas["offset"][ids] = np.cumsum(longitudes) - longitudes
+    entradas["rol"][ids] = [LISTA_ROLES.index(u["rol"]) for u in usuarios]
+    entradas["activo"][ids] = [bool(u.get("activo", True)) for u in usuarios]
+
+    registros = np.frombuffer(b"".join(partes), dtype=np.uint8)
+    return entradas, registros
+
+
+class IndiceUsuarios:
+    """Índice de usuarios por ID, mapeado en memoria."""
+
+    def __init__(
+        self,
+        directorio: str,
+        fuentes: list[str],
+        leer: Callable[[], list[dict[str, Any]]],
+    ):
+        """
+        Args:
+            directorio: Directorio donde se guardan las versiones
+            fuentes: Archivos cuyos cambios invalidan la versión vigente
+            leer: Función que lee todos los registros de usuario
+        """
+        self.directorio = directorio
+        self.fuentes = fuentes
+        self._leer = leer
+        self._puntero = os.path.join(directorio, "ACTUAL")
+        self._lock = threading.Lock()
+        self._firma = None
+        self._datos: Optional[Arreglos] = None
+        self._firma_fuentes_version: Optional[list] = None
+        # Usuarios modificados por este worker, con el momento del cambio
+        self._modificados: dict[int, float] = {}
+        self._proxima_revision = 0.0
+        self._revisando = False
+
+    def _firma_fuentes(self) -> list:
+        return [list(f) if f else None for f in map(firma_archivo, self.fuentes)]
+
+    # Versiones en disco
+    def _cargar_vigente(self) -> bool:
+        """Mapea la versión vigente si cambió. Retorna False si no hay ninguna."""
+        firma = firma_archivo(self._puntero)
+        if firma is None:
+            return False
+        if firma == self._firma:
+            return True
+        try:
+            with open(self._puntero, "r", encoding="utf-8") as f:
+                version = os.path.join(self.directorio, f.read().strip())
+            with open(os.path.join(version, "fuente.json"), "rb") as f:
+                fuente = json.load(f)
+            # Vistas ndarray comunes: indexar un np.memmap cuesta varias veces más
+            datos = tuple(
+                np.asarray(
+                    np.load(os.path.join(version, f"{nombre}.npy"), mmap_mode="r")
+                )
+                for nombre in ARREGLOS
+            )
+        except FileNotFoundError:
+            # Otro worker publicó una versión más nueva mientras se leía; se
+            # mapeará en la próxima revisión
+            return False
+        with self._lock:
+            self._datos = datos
+            self._firma_fuentes_version = fuente["firma"]
+            self._firma = firma
+            self._modificados = {
+                user_id: momento
+                for user_id, momento in self._modificados.items()
+                if momento >= fuente["construido"]
+            }
+        return True
+
+    def _publicar(self, datos: Arreglos, firma_fuentes: list, construido: float):
+        """Escribe una versión nueva y la marca como vigente (con el bloqueo tomado)."""
+        nombre = f"v{time.time_ns()}"
+        version = os.path.join(self.directorio, nombre)
+        os.makedirs(version)
+        for archivo, arreglo in zip(ARREGLOS, datos):
+            with open(os.path.join(version, f"{archivo}.npy"), "wb") as f:
+                np.save(f, arreglo)
+                f.flush()
+                os.fsync(f.fileno())
+        fuente = {"firma": firma_fuentes, "construido": construido}
+        escribir_atomico(
+            os.path.join(version, "fuente.json"), json.dumps(fuente).encode("utf-8")
+        )
+        escribir_atomico(self._puntero, nombre.encode("utf-8"))
+
+        # Los workers que aún mapean una versión vieja la conservan abierta
+        for anterior in os.listdir(self.directorio):
+            if anterior.startswith("v") and anterior != nombre:
+                try:
+                    shutil.rmtree(os.path.join(self.directorio, anterior))
+                except OSError as e:
+                    print(f"Error al borrar la versión {anterior} del índice: {e}")
+        self._cargar_vigente()
+
+    def reconstruir(self, forzar: bool = False):
+        """
+        Reconstruye el índice desde los usuarios guardados.
+
+        Args:
+            forzar: Reconstruir aunque la versión vigente esté al día
+        """
+        with bloqueo_archivo(self._puntero):
+            # La firma se toma antes de leer: si cambia durante la lectura,
+            # la próxima revisión vuelve a reconstruir
+            firma_fuentes = self._firma_fuentes()
+            if (
+                not forzar
+                and self._cargar_vigente()
+                and self._firma_fuentes_version == firma_fuentes
+            ):
+                return
+            construido = time.time()
+            self._publicar(construir_arreglos(self._leer()), firma_fuentes, construido)
+
+    def _revisar(self):
+        """Mapea la versión vigente y la reconstruye si los usuarios cambiaron."""
+        if (
+            self._cargar_vigente()
+            and self._firma_fuentes_version == self._firma_fuentes()
+        ):
+            return
+        self.reconstruir()
+
+    def _revisar_en_segundo_plano(self):
+        try:
+            self._revisar()
+        except Exception as e:
+            print(f"Error al revisar el índice de usuarios: {e}")
+        finally:
+            with self._lock:
+                self._revisando = False
+
+    def _vigente(self) -> Optional[Arreglos]:
+        """
+        Última versión mapeada, sin tocar el disco.
+
+        Cada INDICE_USUARIOS_INTERVALO segundos lanza la revisión en un hilo
+        aparte (una a la vez); mientras corre se sigue usando esta versión.
+        """
+        ahora = time.monotonic()
+        if ahora >= self._proxima_revision:
+            with self._lock:
+                revisar = not self._revisando and ahora >= self._proxima_revision
+                if revisar:
+                    self._revisando = True
+                    self._proxima_revision = ahora + INDICE_USUARIOS_INTERVALO
+            if revisar:
+                threading.Thread(
+                    target=self._revisar_en_segundo_plano,
+                    name="indice-usuarios",
+                    daemon=True,
+                ).start()
+        return self._datos
+
+    # Consultas
+    def obtener(self, user_id: int) -> Optional[UsuarioRespuesta]:
+        """
+        Obtiene un usuario (sin el hash de la contraseña) desde el índice.
+
+        Returns:
+            El usuario, o None si aún no hay índice, si no está en la versión
+            vigente o si este worker lo modificó después de construirla; en
+            esos casos hay que leerlo del almacenamiento
+        """
+        datos = self._vigente()
+        if datos is None or user_id in self._modificados:
+            return None
+        entradas, registros = datos
+        if not 0 <= user_id < len(entradas):
+            return None
+        offset, longitud, rol, activo = entradas[user_id].item()
+        if longitud == 0:
+            return None
+        campos = orjson.loads(registros[offset : offset + longitud].tobytes())
+        campos.update(id=user_id, rol=LISTA_ROLES[rol], activo=bool(activo))
+        return construir_confiable(UsuarioRespuesta, campos)
+
+    def marcar_modificado(self, user_id: int):
+        """Hace que el usuario se lea del almacenamiento hasta la próxima versión."""
+        self._modificados[user_id] = time.time()
@@ -0,0 +1,173 @@
+import json
+import os
+import threading
+import weakref
+from typing import Any, Optional
+
+from constants import JOURNAL_INTERVALO_COMPACTACION, JOURNAL_MAX_ENTRADAS
+
+from .bloqueo import bloqueo_archivo
+from .repositorio import Coleccion, firma_archivo
+
+
+def journal_path(file_path: str) -> str:
+    """Ruta del journal asociado a un snapshot (`usuarios.json` -> `usuarios.journal`)."""
+    return os.path.splitext(file_path)[0] + ".journal"
+
+
+class ColeccionJournal(Coleccion):
+    """
+    Colección que persiste las escrituras en un journal de solo anexado.
+
+    Cada inserción o actualización se agrega como una línea JSON al journal,
+    por lo que una escritura cuesta O(tamaño del registro) en vez de
+    reescribir todo el archivo. Las lecturas reproducen el journal sobre el
+    último snapshot, y el compactador integra periódicamente el journal en
+    un snapshot nuevo.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.journal_path = journal_path(self.file_path)
+        self._offset_journal = 0
+        self._entradas_journal = 0
+
+    # Lectura del journal
+    def _reproducir_journal(self):
+        """Aplica las líneas completas del journal a partir del último offset leído."""
+        try:
+            with open(self.journal_path, "rb") as f:
+                f.seek(self._offset_journal)
+                datos = f.read()
+        except FileNotFoundError:
+            return
+
+        # Una línea sin salto final puede estar a medio escribir
+        fin = datos.rfind(b"\n") + 1
+        for linea in datos[:fin].splitlines():
+            if not linea.strip():
+                continue
+            try:
+                self._aplicar(json.loads(linea))
+            except json.JSONDecodeError:
+                continue
+            self._entradas_journal += 1
+        self._offset_journal += fin
+
+    def _tamano_journal(self) -> int:
+        try:
+            return os.path.getsize(self.journal_path)
+        except FileNotFoundError:
+            return 0
+
+    def _refrescar(self):
+        """Recarga el snapshot si cambió y reproduce las entradas nuevas del journal."""
+        firma = firma_archivo(self.file_path)
+        tamano = self._tamano_journal()
+        if not self._cargado or firma != self._firma or tamano < self._offset_journal:
+            self._registros = self._cargar(self.file_path)
+            self._firma = firma
+            self._cargado = True
+            self._offset_journal = 0
+            self._entradas_journal = 0
+            self._reconstruir_indices()
+        if tamano > self._offset_journal:
+            self._reproducir_journal()
+
+    # Escritura
+    def _registrar(
+        self, operaciones: list[dict[str, Any]], registros: list[dict[str, Any]]
+    ):
+        """Agrega las operaciones al journal en una única escritura."""
+        datos = "".join(
+            json.dumps(op, ensure_ascii=False, default=str) + "\n" for op in operaciones
+        ).encode("utf-8")
+
+        with open(self.journal_path, "ab") as f:
+            inicio = f.tell()
+            f.write(datos)
+            f.flush()
+            os.fsync(f.fileno())
+            fin = f.tell()
+
+        # Bajo el bloqueo de escritura nadie más escribe en el journal, así
+        # que las operaciones ya aplicadas en memoria quedan al día. Si aun así
+        # el tamaño no coincide (o un lector ya las releyó), se releen desde
+        # el offset anterior (reaplicarlas es idempotente).
+        with self._lock:
+            if inicio == self._offset_journal and fin == inicio + len(datos):
+                self._offset_journal = fin
+                self._entradas_journal += len(operaciones)
+        compactador.registrar(self)
+
+    # Compactación
+    def necesita_compactar(self) -> bool:
+        """Indica si el journal superó el máximo de entradas configurado."""
+        with self._lock:
+            return self._entradas_journal >= JOURNAL_MAX_ENTRADAS
+
+    def compactar(self):
+        """
+        Integra el journal en un snapshot nuevo y vacía el journal.
+
+        El snapshot se escribe antes de truncar el journal: un lector que vea
+        el snapshot nuevo junto al journal viejo solo reaplica operaciones
+        idempotentes.
+        """
+        with self._escritura_lock, bloqueo_archivo(self.file_path):
+            with self._lock:
+                self._refrescar()
+                if self._entradas_journal == 0:
+                    return
+                registros = list(self._registros)
+            self._guardar(self.file_path, registros)
+            with open(self.journal_path, "wb"):
+                pass
+            firma = firma_archivo(self.file_path)
+            with self._lock:
+                # Si un lector ya recargó el snapshot, queda igual
+                self._firma = firma
+                self._offset_journal = 0
+                self._entradas_journal = 0
+
+
+class Compactador:
+    """Hilo en segundo plano que compacta periódicamente los journals."""
+
+    def __init__(self, intervalo: float):
+        self.intervalo = intervalo
+        self._colecciones: "weakref.WeakSet[ColeccionJournal]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._hilo: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+
+    def registrar(self, coleccion: ColeccionJournal):
+        """Registra una colección y arranca el hilo la primera vez."""
+        with self._lock:
+            self._colecciones.add(coleccion)
+            if self._hilo is None or not self._hilo.is_alive():
+                self._detener.clear()
+                self._hilo = threading.Thread(
+                    target=self._ejecutar, name="compactador-journal", daemon=True
+                )
+                self._hilo.start()
+
+    def compactar_todo(self, forzar: bool = False):
+        """Compacta las colecciones registradas que lo necesiten."""
+        for coleccion in list(self._colecciones):
+            if forzar or coleccion.necesita_compactar():
+                try:
+                    coleccion.compactar()
+                except Exception as e:
+                    print(f"Error al compactar {coleccion.journal_path}: {e}")
+
+    def detener(self):
+        """Detiene el hilo compactador."""
+        self._detener.set()
+
+    def _ejecutar(self):
+        while not self._detener.wait(self.intervalo):
+            self.compactar_todo()
+
+
+compactador = Compactador(JOURNAL_INTERVALO_COMPACTACION)
@@ -1,7 +1,24 @@
 import json
 import os
-from typing import Optional, Any
-from constants import UsuarioDB, TorneoDB, InscripcionDB, PartidaDB, RatingDB
+from typing import Any, Iterable, Iterator, Optional
+from constants import (
+    UsuarioDB,
+    TorneoDB,
+    InscripcionDB,
+    PartidaDB,
+    RatingDB,
+    UsuarioRespuesta,
+    BACKENDS_ALMACENAMIENTO,
+    INDICE_USUARIOS_DIR,
+    STORAGE_BACKEND,
+)
+
+from .bloqueo import escribir_atomico
+from .cache import invalidar_usuario
+from .indice_usuarios import IndiceUsuarios
+from .journal import ColeccionJournal, journal_path
+from .repositorio import Coleccion, construir_confiable, por_campo
+from .secuencias import SecuenciaArchivo, secuencia_path
 
 # Rutas de archivos JSON
 DATA_DIR = "data"
@@ -27,134 +44,297 @@ def load_json(file_path: str) -> list[dict[str, Any]]:
 
 
 def save_json(file_path: str, data: list[dict[str, Any]]):
-    """Guarda datos en un archivo JSON."""
+    """Guarda datos en un archivo JSON de forma atómica (temporal + fsync + rename)."""
     if not os.path.exists(DATA_DIR):
         os.makedirs(DATA_DIR)
-    with open(file_path, "w", encoding="utf-8") as file:
-        json.dump(data, file, indent=2, ensure_ascii=False, default=str)
+    contenido = json.dumps(data, indent=2, ensure_ascii=False, default=str)
+    escribir_atomico(file_path, contenido.encode("utf-8"))
+
+
+# Colecciones en memoria con índices hash. En modo journal las escrituras
+# se anexan a `<coleccion>.journal` y se compactan en segundo plano.
+_Coleccion = (
+    ColeccionJournal
+    if STORAGE_BACKEND == BACKENDS_ALMACENAMIENTO["journal"]
+    else Coleccion
+)
+
+usuarios = _Coleccion(
+    USUARIOS_FILE,
+    load_json,
+    save_json,
+    indices={"email": lambda u: u["email"].lower()},
+)
+torneos = _Coleccion(
+    TORNEOS_FILE,
+    load_json,
+    save_json,
+    indices={"organizador_id": por_campo("organizador_id")},
+)
+inscripciones = _Coleccion(
+    INSCRIPCIONES_FILE,
+    load_json,
+    save_json,
+    indices={
+        "torneo_id": por_campo("torneo_id"),
+        "usuario_id": por_campo("usuario_id"),
+    },
+)
+partidas = _Coleccion(
+    PARTIDAS_FILE,
+    load_json,
+    save_json,
+    indices={"torneo_id": por_campo("torneo_id")},
+)
+ratings = _Coleccion(
+    RATINGS_FILE,
+    load_json,
+    save_json,
+    indices={"usuario_id": por_campo("usuario_id")},
+)
+
+
+# Secuencias de IDs persistidas junto a cada colección
+secuencia_usuarios = SecuenciaArchivo(secuencia_path(USUARIOS_FILE), usuarios.max_id)
+secuencia_torneos = SecuenciaArchivo(secuencia_path(TORNEOS_FILE), torneos.max_id)
+secuencia_inscripciones = SecuenciaArchivo(
+    secuencia_path(INSCRIPCIONES_FILE), inscripciones.max_id
+)
+secuencia_partidas = SecuenciaArchivo(secuencia_path(PARTIDAS_FILE), partidas.max_id)
+secuencia_ratings = SecuenciaArchivo(secuencia_path(RATINGS_FILE), ratings.max_id)
+
+
+# Índice de usuarios compartido entre workers. Se construye leyendo el
+# archivo en una colección aparte, que no queda cargada en el worker.
+indice_usuarios = IndiceUsuarios(
+    INDICE_USUARIOS_DIR,
+    [USUARIOS_FILE, journal_path(USUARIOS_FILE)],
+    lambda: _Coleccion(USUARIOS_FILE, load_json, save_json).todos(),
+)
 
 
 # Funciones para usuarios
 def get_next_usuario_id() -> int:
-    """Obtiene el siguiente ID disponible para usuarios."""
-    usuarios = load_json(USUARIOS_FILE)
-    return max(usuario.get("id", 0) for usuario in usuarios) + 1 if usuarios else 1
+    """Reserva el siguiente ID disponible para usuarios."""
+    return secuencia_usuarios.siguiente()
+
+
+def get_next_usuario_ids(cantidad: int) -> range:
+    """Reserva `cantidad` IDs consecutivos para usuarios."""
+    inicio = secuencia_usuarios.reservar(cantidad)
+    return range(inicio, inicio + cantidad)
+
+
+def get_emails_registrados(emails: Iterable[str]) -> set[str]:
+    """De los emails dados, los que ya tienen usuario (en minúsculas)."""
+    return set(usuarios.buscar_varios("email", {e.lower() for e in emails}))
 
 
 def get_usuario_by_email(email: str) -> Optional[UsuarioDB]:
-    """Busca un usuario por email."""
-    usuarios = load_json(USUARIOS_FILE)
-    return next((UsuarioDB(**u) for u in usuarios if u["email"] == email), None)
+    """Busca un usuario por email (sin distinguir mayúsculas)."""
+    encontrados = usuarios.buscar("email", email.lower())
+    return construir_confiable(UsuarioDB, encontrados[0]) if encontrados else None
 
 
 def get_usuario_by_id(user_id: int) -> Optional[UsuarioDB]:
     """Busca un usuario por ID."""
-    usuarios = load_json(USUARIOS_FILE)
-    return next((UsuarioDB(**u) for u in usuarios if u["id"] == user_id), None)
+    usuario = usuarios.por_id(user_id)
+    return construir_confiable(UsuarioDB, usuario) if usuario else None
+
+
+def get_usuario_indexado(user_id: int) -> Optional[UsuarioRespuesta]:
+    """
+    Busca un usuario por ID en el índice compartido entre workers.
+
+    Retorna None si el índice no lo tiene al día; en ese caso hay que usar
+    get_usuario_by_id.
+    """
+    return indice_usuarios.obtener(user_id)
 
 
 def save_usuario(usuario: UsuarioDB):
     """Guarda un usuario en el archivo JSON."""
-    usuarios = load_json(USUARIOS_FILE)
-    usuarios.append(usuario.model_dump())
-    save_json(USUARIOS_FILE, usuarios)
+    usuarios.insertar(usuario.model_dump())
+
+
+def save_usuarios(nuevos: list[UsuarioDB]):
+    """Guarda varios usuarios en una sola escritura."""
+    usuarios.insertar_varios([u.model_dump() for u in nuevos])
 
 
 def update_usuario(user_id: int, updates: dict[str, Any]):
     """Actualiza un usuario con los datos proporcionados."""
     try:
-        usuarios = load_json(USUARIOS_FILE)
-        for i, u in enumerate(usuarios):
-            if u["id"] == user_id:
-                usuarios[i].update(updates)
-                save_json(USUARIOS_FILE, usuarios)
+        return usuarios.actualizar(user_id, updates)
     except Exception as e:
         print(f"Error al actualizar usuario: {e}")
         return False
-    return True
+    finally:
+        invalidar_usuario(user_id)
+        indice_usuarios.marcar_modificado(user_id)
 
 
 # Funciones para torneos
 def get_next_torneo_id() -> int:
-    """Obtiene el siguiente ID disponible para torneos."""
-    torneos = load_json(TORNEOS_FILE)
-    return max(t.get("id", 0) for t in torneos) + 1 if torneos else 1
+    """Reserva el siguiente ID disponible para torneos."""
+    return secuencia_torneos.siguiente()
 
 
 def get_torneo_by_id(torneo_id: int) -> Optional[TorneoDB]:
     """Busca un torneo por ID."""
-    torneos = load_json(TORNEOS_FILE)
-    return next((TorneoDB(**t) for t in torneos if t["id"] == torneo_id), None)
+    torneo = torneos.por_id(torneo_id)
+    return TorneoDB(**torneo) if torneo else None
+
+
+def get_torneos() -> list[TorneoDB]:
+    """Obtiene todos los torneos."""
+    return [TorneoDB(**t) for t in torneos.todos()]
+
+
+def get_torneos_pagina(
+    despues: int, limite: int, organizador_id: Optional[int] = None
+) -> list[TorneoDB]:
+    """Obtiene hasta `limite` torneos con ID mayor que `despues`, en orden de ID."""
+    if organizador_id is None:
+        pagina = torneos.pagina(despues, limite)
+    else:
+        pagina = torneos.pagina(despues, limite, "organizador_id", organizador_id)
+    return [TorneoDB(**t) for t in pagina]
 
 
 def get_torneos_by_organizador(organizador_id: int) -> list[TorneoDB]:
     """Obtiene todos los torneos de un organizador."""
-    torneos = load_json(TORNEOS_FILE)
-    return [TorneoDB(**t) for t in torneos if t["organizador_id"] == organizador_id]
+    return [TorneoDB(**t) for t in torneos.buscar("organizador_id", organizador_id)]
 
 
 def save_torneo(torneo: TorneoDB):
     """Guarda un torneo en el archivo JSON."""
-    torneos = load_json(TORNEOS_FILE)
-    torneos.append(torneo.model_dump())
-    save_json(TORNEOS_FILE, torneos)
+    torneos.insertar(torneo.model_dump())
+
+
+def update_torneo(
+    torneo_id: int, updates: dict[str, Any], estado: Optional[str] = None
+):
+    """
+    Actualiza un torneo con los datos proporcionados.
+
+    Si se indica `estado`, solo se actualiza si el torneo sigue en ese
+    estado, comprobándolo bajo el bloqueo de escritura.
+    """
+    try:
+        condicion = None if estado is None else {"estado": estado}
+        return torneos.actualizar(torneo_id, updates, condicion)
+    except Exception as e:
+        print(f"Error al actualizar torneo: {e}")
+        return False
 
 
 # Funciones para inscripciones
 def get_next_inscripcion_id() -> int:
-    """Obtiene el siguiente ID disponible para inscripciones."""
-    inscripciones = load_json(INSCRIPCIONES_FILE)
-    return max(i.get("id", 0) for i in inscripciones) + 1 if inscripciones else 1
+    """Reserva el siguiente ID disponible para inscripciones."""
+    return secuencia_inscripciones.siguiente()
+
+
+def get_inscripcion_by_id(inscripcion_id: int) -> Optional[InscripcionDB]:
+    """Busca una inscripción por ID."""
+    inscripcion = inscripciones.por_id(inscripcion_id)
+    return InscripcionDB(**inscripcion) if inscripcion else None
 
 
 def get_inscripciones_by_usuario(user_id: int) -> list[InscripcionDB]:
     """Obtiene todas las inscripciones de un usuario."""
-    inscripciones = load_json(INSCRIPCIONES_FILE)
-    return [InscripcionDB(**i) for i in inscripciones if i["usuario_id"] == user_id]
+    return [InscripcionDB(**i) for i in inscripciones.buscar("usuario_id", user_id)]
 
 
 def get_inscripciones_by_torneo(torneo_id: int) -> list[InscripcionDB]:
     """Obtiene todas las inscripciones de un torneo."""
-    inscripciones = load_json(INSCRIPCIONES_FILE)
-    return [InscripcionDB(**i) for i in inscripciones if i["torneo_id"] == torneo_id]
+    return [InscripcionDB(**i) for i in inscripciones.buscar("torneo_id", torneo_id)]
+
+
+def get_inscripciones_pagina(
+    torneo_id: int, despues: int, limite: int
+) -> list[InscripcionDB]:
+    """Obtiene hasta `limite` inscripciones de un torneo con ID mayor que `despues`."""
+    pagina = inscripciones.pagina(despues, limite, "torneo_id", torneo_id)
+    return [InscripcionDB(**i) for i in pagina]
 
 
 def save_inscripcion(inscripcion: InscripcionDB):
     """Guarda una inscripción en el archivo JSON."""
-    inscripciones = load_json(INSCRIPCIONES_FILE)
-    inscripciones.append(inscripcion.model_dump())
-    save_json(INSCRIPCIONES_FILE, inscripciones)
+    inscripciones.insertar(inscripcion.model_dump())
+
+
+def update_inscripciones(cambios: dict[int, dict[str, Any]]) -> bool:
+    """Actualiza varias inscripciones (por ID) en una sola escritura."""
+    return all(inscripciones.actualizar_varios(cambios))
 
 
 # Funciones para partidas
 def get_next_partida_id() -> int:
-    """Obtiene el siguiente ID disponible para partidas."""
-    partidas = load_json(PARTIDAS_FILE)
-    return max(p.get("id", 0) for p in partidas) + 1 if partidas else 1
+    """Reserva el siguiente ID disponible para partidas."""
+    return secuencia_partidas.siguiente()
+
+
+def get_partida_by_id(partida_id: int) -> Optional[PartidaDB]:
+    """Busca una partida por ID."""
+    partida = partidas.por_id(partida_id)
+    return PartidaDB(**partida) if partida else None
 
 
 def get_partidas_by_torneo(torneo_id: int) -> list[PartidaDB]:
     """Obtiene todas las partidas de un torneo."""
-    partidas = load_json(PARTIDAS_FILE)
-    return [PartidaDB(**p) for p in partidas if p["torneo_id"] == torneo_id]
+    return [PartidaDB(**p) for p in partidas.buscar("torneo_id", torneo_id)]
+
+
+def get_partidas_pagina(torneo_id: int, despues: int, limite: int) -> list[PartidaDB]:
+    """Obtiene hasta `limite` partidas de un torneo con ID mayor que `despues`."""
+    pagina = partidas.pagina(despues, limite, "torneo_id", torneo_id)
+    return [PartidaDB(**p) for p in pagina]
+
+
+def iterar_partidas() -> Iterator[PartidaDB]:
+    """Recorre todas las partidas, en orden de ID."""
+    for p in sorted(partidas.todos(), key=lambda p: p["id"]):
+        yield PartidaDB(**p)
 
 
 def save_partida(partida: PartidaDB):
     """Guarda una partida en el archivo JSON."""
-    partidas = load_json(PARTIDAS_FILE)
-    partidas.append(partida.model_dump())
-    save_json(PARTIDAS_FILE, partidas)
+    partidas.insertar(partida.model_dump())
+
+
+def save_partidas(nuevas: list[PartidaDB]):
+    """Guarda varias partidas en una sola escritura."""
+    partidas.insertar_varios([p.model_dump() for p in nuevas])
+
+
+def update_partidas(cambios: dict[int, dict[str, Any]]) -> bool:
+    """Actualiza varias partidas (por ID) en una sola escritura."""
+    return all(partidas.actualizar_varios(cambios))
 
 
 # Funciones para ratings
+def get_next_rating_id() -> int:
+    """Reserva el siguiente ID disponible para ratings."""
+    return secuencia_ratings.siguiente()
+
+
 def get_ratings_by_usuario(user_id: int) -> list[RatingDB]:
     """Obtiene todos los ratings de un usuario."""
-    ratings = load_json(RATINGS_FILE)
-    return [RatingDB(**r) for r in ratings if r["usuario_id"] == user_id]
+    return [RatingDB(**r) for r in ratings.buscar("usuario_id", user_id)]
+
+
+def iterar_ratings() -> Iterator[RatingDB]:
+    """Recorre todos los ratings, en orden de ID."""
+    for r in sorted(ratings.todos(), key=lambda r: r["id"]):
+        yield RatingDB(**r)
 
 
 def save_rating(rating: RatingDB):
     """Guarda un rating en el archivo JSON."""
-    ratings = load_json(RATINGS_FILE)
-    ratings.append(rating.model_dump())
-    save_json(RATINGS_FILE, ratings)
+    ratings.insertar(rating.model_dump())
+
+
+def save_ratings(nuevos: list[RatingDB]):
+    """Guarda varios ratings en una sola escritura."""
+    ratings.insertar_varios([r.model_dump() for r in nuevos])
@@ -0,0 +1,112 @@
+"""
+Migra los archivos `data/*.json` a la base de datos SQLite.
+
+Uso:
+    python -m utils.migrar_sqlite
+
+Los archivos se leen en streaming (registro a registro) y se insertan en
+lotes, por lo que la migración no necesita cargar colecciones completas en
+memoria. Si existen journals (`STORAGE_BACKEND=journal`), sus operaciones se
+aplican después del snapshot correspondiente.
+"""
+
+import json
+import os
+from itertools import islice
+from typing import Any, Iterator
+
+from .journal import journal_path
+from .json_utils import (
+    USUARIOS_FILE,
+    TORNEOS_FILE,
+    INSCRIPCIONES_FILE,
+    PARTIDAS_FILE,
+    RATINGS_FILE,
+)
+from .repositorio import OP_INSERTAR
+from .sqlite_utils import actualizar_fila, get_conexion, insertar_filas
+
+ARCHIVOS_POR_TABLA = {
+    "usuarios": USUARIOS_FILE,
+    "torneos": TORNEOS_FILE,
+    "inscripciones": INSCRIPCIONES_FILE,
+    "partidas": PARTIDAS_FILE,
+    "ratings": RATINGS_FILE,
+}
+
+TAMANO_LOTE = 5000
+TAMANO_BLOQUE = 1 << 20
+
+
+def iterar_json(file_path: str) -> Iterator[dict[str, Any]]:
+    """Recorre los elementos de un arreglo JSON sin cargar el archivo completo."""
+    if not os.path.exists(file_path):
+        return
+
+    decoder = json.JSONDecoder()
+    separadores = " \t\r\n,"
+    with open(file_path, "r", encoding="utf-8") as f:
+        buffer = f.read(TAMANO_BLOQUE).lstrip()
+        if not buffer.startswith("["):
+            raise ValueError(f"{file_path} no contiene un arreglo JSON")
+        posicion = 1
+        fin_archivo = False
+
+        while True:
+            while posicion < len(buffer) and buffer[posicion] in separadores:
+                posicion += 1
+            if buffer.startswith("]", posicion):
+                return
+            try:
+                elemento, posicion = decoder.raw_decode(buffer, posicion)
+            except json.JSONDecodeError:
+                if fin_archivo:
+                    if not buffer[posicion:].strip():
+                        return
+                    raise
+                bloque = f.read(TAMANO_BLOQUE)
+                fin_archivo = not bloque
+                buffer = buffer[posicion:] + bloque
+                posicion = 0
+                continue
+            yield elemento
+
+
+def iterar_journal(file_path: str) -> Iterator[dict[str, Any]]:
+    """Recorre las operaciones completas del journal de una colección."""
+    ruta = journal_path(file_path)
+    if not os.path.exists(ruta):
+        return
+    with open(ruta, "r", encoding="utf-8") as f:
+        for linea in f:
+            if linea.endswith("\n") and linea.strip():
+                yield json.loads(linea)
+
+
+def migrar_tabla(tabla: str, file_path: str) -> int:
+    """Migra una colección JSON (snapshot + journal) a su tabla. Retorna las filas leídas."""
+    conexion = get_conexion()
+    total = 0
+    registros = iterar_json(file_path)
+    with conexion:
+        while lote := list(islice(registros, TAMANO_LOTE)):
+            insertar_filas(conexion, tabla, lote)
+            total += len(lote)
+
+        for operacion in iterar_journal(file_path):
+            if operacion["op"] == OP_INSERTAR:
+                insertar_filas(conexion, tabla, [operacion["registro"]])
+                total += 1
+            else:
+                actualizar_fila(conexion, tabla, operacion["id"], operacion["cambios"])
+    return total
+
+
+def main():
+    for tabla, file_path in ARCHIVOS_POR_TABLA.items():
+        total = migrar_tabla(tabla, file_path)
+        print(f"{tabla}: {total} registros migrados desde {file_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+from typing import Callable, Iterator, TypeVar
+
+from constants import PAGINA_STREAMING
+
+T = TypeVar("T")
+
+
+def recorrer_paginas(
+    obtener_pagina: Callable[[int, int], list[T]],
+    despues: int = 0,
+    tamano: int = PAGINA_STREAMING,
+) -> Iterator[T]:
+    """
+    Recorre un listado paginado por cursor sin cargarlo entero en memoria.
+
+    Cada página se pide por separado (sin cursores abiertos entre una y
+    otra), así el recorrido puede continuar desde otro hilo, como ocurre al
+    enviar una respuesta en streaming.
+
+    Args:
+        obtener_pagina: Función (despues, limite) que retorna los elementos
+            con ID mayor que `despues`, en orden de ID
+        despues: ID desde el cual empezar (excluido)
+        tamano: Elementos por página
+    """
+    while True:
+        pagina = obtener_pagina(despues, tamano)
+        yield from pagina
+        if len(pagina) < tamano:
+            return
+        despues = pagina[-1].id
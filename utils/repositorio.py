@@ -0,0 +1,399 @@
+import bisect
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Callable, Iterable, Mapping, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from constants import COMMIT_VENTANA_MS
+
+from .bloqueo import bloqueo_archivo
+
+# Tipos de operación de escritura
+OP_INSERTAR = "insertar"
+OP_ACTUALIZAR = "actualizar"
+
+# Clave de orden de los registros dentro de la colección y de cada índice
+clave_id = itemgetter("id")
+
+# Firma de un archivo en disco: (mtime en ns, tamaño en bytes)
+Firma = Optional[tuple[int, int]]
+
+
+def firma_archivo(file_path: str) -> Firma:
+    """Obtiene la firma (mtime, tamaño) de un archivo o None si no existe."""
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def normalizar_registro(registro: dict[str, Any]) -> dict[str, Any]:
+    """
+    Convierte un registro a su forma serializada en JSON.
+
+    Así el registro en memoria es idéntico al que se obtendría al releer el
+    archivo (por ejemplo, las fechas quedan como strings).
+    """
+    return json.loads(json.dumps(registro, ensure_ascii=False, default=str))
+
+
+M = TypeVar("M", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def _conversiones(modelo: type[BaseModel]) -> tuple[tuple[str, Callable], ...]:
+    """Campos del modelo que no se guardan con su tipo de Python y cómo leerlos."""
+    conversiones = []
+    for nombre, campo in modelo.model_fields.items():
+        if campo.annotation in (datetime, Optional[datetime]):
+            conversiones.append((nombre, datetime.fromisoformat))
+        elif campo.annotation is bool:
+            conversiones.append((nombre, bool))
+    return tuple(conversiones)
+
+
+def construir_confiable(modelo: type[M], registro: Mapping[str, Any]) -> M:
+    """
+    Construye un modelo desde un registro guardado, sin volver a validarlo.
+
+    Los registros se validan al escribirse, así que al leerlos solo hace
+    falta reconvertir lo que el almacenamiento guarda con otro tipo (fechas
+    como strings, booleanos como enteros en SQLite).
+    """
+    datos = dict(registro)
+    for nombre, convertir in _conversiones(modelo):
+        valor = datos.get(nombre)
+        if isinstance(valor, (str, int)):
+            datos[nombre] = convertir(valor)
+    return modelo.model_construct(**datos)
+
+
+class Coleccion:
+    """
+    Colección de registros JSON cargada una sola vez en memoria.
+
+    Mantiene un índice hash por ID y uno por cada clave configurada, y se
+    recarga automáticamente cuando cambia la firma (mtime/tamaño) del
+    archivo, por ejemplo si otro proceso lo modificó. Los registros y cada
+    grupo de los índices se mantienen ordenados por ID, lo que permite
+    paginar por cursor (keyset) con búsqueda binaria.
+
+    Las escrituras las hace un hilo escritor por colección, con un bloqueo
+    entre procesos, y se agrupan (group commit): todo lo que se encoló
+    mientras se escribía el lote anterior se persiste en la siguiente
+    escritura. Si hay varios escritores concurrentes, además se esperan
+    COMMIT_VENTANA_MS para sumar más operaciones; un escritor solo no
+    espera. Las lecturas solo se bloquean mientras el lote se aplica en
+    memoria, no durante la escritura en disco.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        cargar: Callable[[str], list[dict[str, Any]]],
+        guardar: Callable[[str, list[dict[str, Any]]], None],
+        indices: Optional[dict[str, Callable[[dict[str, Any]], Any]]] = None,
+    ):
+        """
+        Args:
+            file_path: Ruta del archivo JSON de la colección
+            cargar: Función que lee la lista de registros desde disco
+            guardar: Función que escribe la lista de registros en disco
+            indices: Nombre de cada índice secundario y función que extrae
+                su clave de un registro
+        """
+        self.file_path = file_path
+        self._cargar = cargar
+        self._guardar = guardar
+        self._extractores = indices or {}
+        self._lock = threading.RLock()
+        self._firma: Firma = None
+        self._cargado = False
+        self._registros: list[dict[str, Any]] = []
+        self._por_id: dict[Any, dict[str, Any]] = {}
+        self._max_id = 0
+        self._indices: dict[str, dict[Any, list[dict[str, Any]]]] = {}
+        # Serializa los lotes (el bloqueo de lectura se toma solo para
+        # aplicarlos en memoria)
+        self._escritura_lock = threading.Lock()
+        self._cola = threading.Condition(threading.Lock())
+        self._pendientes: list[tuple[dict[str, Any], Future]] = []
+        self._llamadas_pendientes = 0
+        self._escritor: Optional[threading.Thread] = None
+
+    # Carga e índices
+    def _reconstruir_indices(self):
+        self._registros.sort(key=clave_id)
+        self._por_id = {r.get("id"): r for r in self._registros}
+        self._max_id = max((i for i in self._por_id if isinstance(i, int)), default=0)
+        self._indices = {nombre: {} for nombre in self._extractores}
+        for registro in self._registros:
+            self._indexar(registro)
+
+    def _indexar(self, registro: dict[str, Any]):
+        for nombre, extractor in self._extractores.items():
+            grupo = self._indices[nombre].setdefault(extractor(registro), [])
+            bisect.insort(grupo, registro, key=clave_id)
+
+    def _desindexar(self, registro: dict[str, Any]):
+        for nombre, extractor in self._extractores.items():
+            grupo = self._indices[nombre].get(extractor(registro))
+            if grupo is None:
+                continue
+            grupo[:] = [r for r in grupo if r is not registro]
+            if not grupo:
+                del self._indices[nombre][extractor(registro)]
+
+    def _refrescar(self):
+        """Recarga la colección si el archivo cambió desde la última lectura."""
+        firma = firma_archivo(self.file_path)
+        if self._cargado and firma == self._firma:
+            return
+        self._registros = self._cargar(self.file_path)
+        self._firma = firma
+        self._cargado = True
+        self._reconstruir_indices()
+
+    # Lecturas
+    def por_id(self, registro_id: Any) -> Optional[dict[str, Any]]:
+        """Obtiene un registro por su ID en O(1)."""
+        with self._lock:
+            self._refrescar()
+            return self._por_id.get(registro_id)
+
+    def buscar(self, indice: str, clave: Any) -> list[dict[str, Any]]:
+        """Obtiene los registros cuyo índice `indice` vale `clave` en O(1)."""
+        with self._lock:
+            self._refrescar()
+            return list(self._indices[indice].get(clave, ()))
+
+    def buscar_varios(
+        self, indice: str, claves: Iterable[Any]
+    ) -> dict[Any, list[dict[str, Any]]]:
+        """Busca varias claves de un índice bajo un solo bloqueo; omite las que no están."""
+        with self._lock:
+            self._refrescar()
+            encontrados = self._indices[indice]
+            return {c: list(encontrados[c]) for c in claves if c in encontrados}
+
+    def todos(self) -> list[dict[str, Any]]:
+        """Obtiene una copia de la lista de todos los registros."""
+        with self._lock:
+            self._refrescar()
+            return list(self._registros)
+
+    def pagina(
+        self,
+        despues: int,
+        limite: int,
+        indice: Optional[str] = None,
+        clave: Any = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Obtiene hasta `limite` registros con ID mayor que `despues`, en orden de ID.
+
+        Sin `indice` recorre toda la colección; con él, solo los registros
+        cuyo índice vale `clave`. Cuesta O(log n + limite).
+        """
+        with self._lock:
+            self._refrescar()
+            grupo = (
+                self._registros
+                if indice is None
+                else self._indices[indice].get(clave, [])
+            )
+            inicio = bisect.bisect_right(grupo, despues, key=clave_id)
+            return grupo[inicio : inicio + limite]
+
+    def max_id(self) -> int:
+        """Obtiene el mayor ID de la colección (0 si está vacía)."""
+        with self._lock:
+            self._refrescar()
+            return self._max_id
+
+    # Escrituras
+    def _aplicar(self, operacion: dict[str, Any]) -> bool:
+        """
+        Aplica una operación de escritura sobre los datos en memoria.
+
+        Las operaciones son idempotentes: volver a insertar un ID existente
+        reemplaza el registro, de modo que reaplicarlas es seguro.
+
+        Returns:
+            True si la operación se aplicó, False si el registro no existe o
+            no cumple la condición de la actualización
+        """
+        if operacion["op"] == OP_INSERTAR:
+            registro = operacion["registro"]
+            anterior = self._por_id.get(registro.get("id"))
+            if anterior is not None:
+                self._desindexar(anterior)
+                self._registros[self._registros.index(anterior)] = registro
+            else:
+                bisect.insort(self._registros, registro, key=clave_id)
+            self._por_id[registro.get("id")] = registro
+            if isinstance(registro.get("id"), int):
+                self._max_id = max(self._max_id, registro["id"])
+            self._indexar(registro)
+            return True
+
+        registro = self._por_id.get(operacion["id"])
+        if registro is None:
+            return False
+        condicion = operacion.get("si", {})
+        if any(registro.get(campo) != valor for campo, valor in condicion.items()):
+            return False
+        self._desindexar(registro)
+        registro.update(operacion["cambios"])
+        self._indexar(registro)
+        return True
+
+    def _registrar(
+        self, operaciones: list[dict[str, Any]], registros: list[dict[str, Any]]
+    ):
+        """
+        Persiste en disco las operaciones ya aplicadas en memoria.
+
+        Se llama con el bloqueo de escritura tomado y sin el de lectura.
+
+        Args:
+            operaciones: Operaciones aplicadas en este lote
+            registros: Copia de la lista de registros tras aplicarlas
+        """
+        self._guardar(self.file_path, registros)
+        firma = firma_archivo(self.file_path)
+        with self._lock:
+            self._firma = firma
+
+    def _comprometer(self, lote: list[tuple[dict[str, Any], Future]]):
+        """Aplica un lote de operaciones y las persiste en una sola escritura."""
+        try:
+            with self._escritura_lock, bloqueo_archivo(self.file_path):
+                with self._lock:
+                    # Releer bajo el bloqueo para no pisar escrituras de otros
+                    # procesos
+                    self._refrescar()
+                    resultados = [self._aplicar(operacion) for operacion, _ in lote]
+                    # Solo este hilo modifica los registros: la copia de la
+                    # lista alcanza para escribirlos sin el bloqueo de lectura
+                    registros = list(self._registros)
+                aplicadas = [op for (op, _), ok in zip(lote, resultados) if ok]
+                if aplicadas:
+                    self._registrar(aplicadas, registros)
+        except Exception as e:
+            # La memoria pudo quedar distinta del disco: forzar una recarga
+            with self._lock:
+                self._cargado = False
+            for _, futuro in lote:
+                futuro.set_exception(e)
+            return
+        for (_, futuro), resultado in zip(lote, resultados):
+            futuro.set_result(resultado)
+
+    def _escribir(self):
+        """Hilo escritor: compromete lotes a medida que llegan operaciones."""
+        while True:
+            with self._cola:
+                while not self._pendientes:
+                    self._cola.wait()
+                if COMMIT_VENTANA_MS > 0 and self._llamadas_pendientes > 1:
+                    # Escritores concurrentes: esperar la ventana para que el
+                    # lote sume los que están por llegar
+                    fin = time.monotonic() + COMMIT_VENTANA_MS / 1000
+                    while (restante := fin - time.monotonic()) > 0:
+                        self._cola.wait(restante)
+                lote, self._pendientes = self._pendientes, []
+                self._llamadas_pendientes = 0
+            self._comprometer(lote)
+
+    def _ejecutar_varios(self, operaciones: list[dict[str, Any]]) -> list[bool]:
+        """
+        Encola operaciones y espera a que el hilo escritor las persista.
+
+        Las operaciones de una misma llamada siempre se comprometen juntas.
+        """
+        futuros: list[Future] = [Future() for _ in operaciones]
+        with self._cola:
+            self._pendientes.extend(zip(operaciones, futuros))
+            self._llamadas_pendientes += 1
+            if self._escritor is None:
+                self._escritor = threading.Thread(
+                    target=self._escribir,
+                    name=f"escritor-{os.path.basename(self.file_path)}",
+                    daemon=True,
+                )
+                self._escritor.start()
+            self._cola.notify()
+        return [futuro.result() for futuro in futuros]
+
+    def _ejecutar(self, operacion: dict[str, Any]) -> bool:
+        return self._ejecutar_varios([operacion])[0]
+
+    def insertar(self, registro: dict[str, Any]):
+        """Agrega un registro a la colección y la persiste."""
+        self._ejecutar({"op": OP_INSERTAR, "registro": normalizar_registro(registro)})
+
+    def insertar_varios(self, registros: list[dict[str, Any]]):
+        """Agrega varios registros y los persiste en una sola escritura."""
+        self._ejecutar_varios(
+            [{"op": OP_INSERTAR, "registro": normalizar_registro(r)} for r in registros]
+        )
+
+    def actualizar(
+        self,
+        registro_id: Any,
+        cambios: dict[str, Any],
+        condicion: Optional[dict[str, Any]] = None,
+    ) -> bool:
+        """
+        Actualiza un registro existente y persiste la colección.
+
+        Args:
+            registro_id: ID del registro
+            cambios: Campos a modificar
+            condicion: Valores que el registro debe tener para actualizarse;
+                se comprueban bajo el bloqueo de escritura (compare-and-set)
+
+        Returns:
+            True si el registro existía (y cumplía la condición), False en
+            caso contrario
+        """
+        operacion = {
+            "op": OP_ACTUALIZAR,
+            "id": registro_id,
+            "cambios": normalizar_registro(cambios),
+        }
+        if condicion:
+            operacion["si"] = normalizar_registro(condicion)
+        return self._ejecutar(operacion)
+
+    def actualizar_varios(self, cambios: dict[Any, dict[str, Any]]) -> list[bool]:
+        """
+        Actualiza varios registros y los persiste en una sola escritura.
+
+        Returns:
+            Para cada ID, en orden, si el registro existía
+        """
+        return self._ejecutar_varios(
+            [
+                {
+                    "op": OP_ACTUALIZAR,
+                    "id": registro_id,
+                    "cambios": normalizar_registro(campos),
+                }
+                for registro_id, campos in cambios.items()
+            ]
+        )
+
+
+def por_campo(campo: str) -> Callable[[dict[str, Any]], Any]:
+    """Extractor de índice que usa el valor de un campo del registro."""
+    return itemgetter(campo)
@@ -0,0 +1,93 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable
+
+from constants import SECUENCIA_BLOQUE
+
+from .bloqueo import bloqueo_archivo, escribir_atomico
+
+
+class Secuencia(ABC):
+    """
+    Asignador de IDs que reserva bloques de la secuencia persistida.
+
+    Cada proceso reserva SECUENCIA_BLOQUE IDs a la vez con una operación
+    atómica entre procesos y luego los entrega desde memoria en O(1), así
+    los workers no compiten por cada inserción. Los IDs de un bloque que no
+    se usen (por ejemplo, al reiniciar el worker) quedan como huecos.
+    """
+
+    def __init__(self, tam_bloque: int = SECUENCIA_BLOQUE):
+        self.tam_bloque = max(1, tam_bloque)
+        self._lock = threading.Lock()
+        self._siguiente = 0
+        self._limite = 0
+        self._pid = None
+
+    @abstractmethod
+    def _reservar(self, cantidad: int) -> int:
+        """Reserva `cantidad` IDs consecutivos y retorna el primero."""
+
+    def siguiente(self) -> int:
+        """Reserva y retorna el siguiente ID."""
+        with self._lock:
+            # Un proceso bifurcado no puede reutilizar el bloque de su padre
+            if self._pid != os.getpid() or self._siguiente >= self._limite:
+                inicio = self._reservar(self.tam_bloque)
+                self._siguiente = inicio
+                self._limite = inicio + self.tam_bloque
+                self._pid = os.getpid()
+            valor = self._siguiente
+            self._siguiente += 1
+            return valor
+
+    def reservar(self, cantidad: int) -> int:
+        """
+        Reserva `cantidad` IDs consecutivos y retorna el primero.
+
+        Si no entran en lo que queda del bloque actual se reservan con un
+        único acceso a la secuencia persistida, sin tocar el bloque.
+        """
+        with self._lock:
+            if self._pid == os.getpid() and self._limite - self._siguiente >= cantidad:
+                inicio = self._siguiente
+                self._siguiente += cantidad
+                return inicio
+            return self._reservar(cantidad)
+
+
+class SecuenciaArchivo(Secuencia):
+    """Secuencia persistida en un archivo de texto con el próximo ID libre."""
+
+    def __init__(
+        self,
+        file_path: str,
+        max_id_actual: Callable[[], int],
+        tam_bloque: int = SECUENCIA_BLOQUE,
+    ):
+        """
+        Args:
+            file_path: Ruta del archivo de la secuencia
+            max_id_actual: Función que retorna el mayor ID existente; solo se
+                usa para inicializar la secuencia si el archivo no existe
+            tam_bloque: Cantidad de IDs reservados por cada acceso a disco
+        """
+        super().__init__(tam_bloque)
+        self.file_path = file_path
+        self._max_id_actual = max_id_actual
+
+    def _reservar(self, cantidad: int) -> int:
+        with bloqueo_archivo(self.file_path):
+            try:
+                with open(self.file_path, "r", encoding="utf-8") as f:
+                    inicio = int(f.read().strip())
+            except (FileNotFoundError, ValueError):
+                inicio = self._max_id_actual() + 1
+            escribir_atomico(self.file_path, str(inicio + cantidad).encode("utf-8"))
+            return inicio
+
+
+def secuencia_path(file_path: str) -> str:
+    """Ruta de la secuencia asociada a una colección (`usuarios.json` -> `usuarios.seq`)."""
+    return os.path.splitext(file_path)[0] + ".seq"
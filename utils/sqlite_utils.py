@@ -0,0 +1,538 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Iterable, Iterator, Optional
+
+from constants import (
+    UsuarioDB,
+    TorneoDB,
+    InscripcionDB,
+    PartidaDB,
+    RatingDB,
+    UsuarioRespuesta,
+    SQLITE_PATH,
+)
+
+from .cache import invalidar_usuario
+from .repositorio import construir_confiable
+from .secuencias import Secuencia
+
+# Parámetros por consulta en las búsquedas con IN (SQLite admite 999 en
+# las versiones más viejas)
+MAX_PARAMETROS = 500
+
+# Tablas, modelo de cada fila e índices secundarios
+TABLAS = {
+    "usuarios": (UsuarioDB, {"idx_usuarios_email": "lower(email)"}),
+    "torneos": (TorneoDB, {"idx_torneos_organizador": "organizador_id"}),
+    "inscripciones": (
+        InscripcionDB,
+        {
+            "idx_inscripciones_torneo": "torneo_id",
+            "idx_inscripciones_usuario": "usuario_id",
+        },
+    ),
+    "partidas": (PartidaDB, {"idx_partidas_torneo": "torneo_id"}),
+    "ratings": (RatingDB, {"idx_ratings_usuario": "usuario_id"}),
+}
+
+# Conexión por hilo dentro de cada proceso (worker)
+_local = threading.local()
+_init_lock = threading.Lock()
+_inicializado_pid: Optional[int] = None
+
+
+def _columnas(tabla: str) -> list[str]:
+    modelo, _ = TABLAS[tabla]
+    return list(modelo.model_fields)
+
+
+def crear_esquema(conexion: sqlite3.Connection):
+    """
+    Crea las tablas e índices si no existen.
+
+    A las tablas ya creadas se les agregan las columnas nuevas del modelo,
+    con su valor por defecto para las filas existentes.
+    """
+    with conexion:
+        for tabla, (modelo, indices) in TABLAS.items():
+            columnas = ", ".join(
+                "id INTEGER PRIMARY KEY" if c == "id" else c for c in _columnas(tabla)
+            )
+            conexion.execute(f"CREATE TABLE IF NOT EXISTS {tabla} ({columnas})")
+            existentes = {
+                fila[1] for fila in conexion.execute(f"PRAGMA table_info({tabla})")
+            }
+            for nombre, campo in modelo.model_fields.items():
+                if nombre in existentes:
+                    continue
+                por_defecto = (
+                    ""
+                    if campo.is_required() or campo.default_factory is not None
+                    else f" DEFAULT {_literal(campo.default)}"
+                )
+                conexion.execute(
+                    f"ALTER TABLE {tabla} ADD COLUMN {nombre}{por_defecto}"
+                )
+            for nombre, expresion in indices.items():
+                conexion.execute(
+                    f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} ({expresion})"
+                )
+        conexion.execute(
+            "CREATE TABLE IF NOT EXISTS secuencias "
+            "(nombre TEXT PRIMARY KEY, siguiente INTEGER NOT NULL)"
+        )
+
+
+def get_conexion() -> sqlite3.Connection:
+    """
+    Obtiene la conexión SQLite del hilo actual, creándola si hace falta.
+
+    Cada hilo de cada worker reutiliza su propia conexión. Si el proceso se
+    bifurcó (fork), se abre una conexión nueva en lugar de heredar la del padre.
+    """
+    global _inicializado_pid
+
+    conexion = getattr(_local, "conexion", None)
+    if conexion is not None and _local.pid == os.getpid():
+        return conexion
+
+    directorio = os.path.dirname(SQLITE_PATH)
+    if directorio and not os.path.exists(directorio):
+        os.makedirs(directorio)
+
+    conexion = sqlite3.connect(SQLITE_PATH, timeout=30, check_same_thread=False)
+    conexion.row_factory = sqlite3.Row
+    conexion.execute("PRAGMA journal_mode=WAL")
+    conexion.execute("PRAGMA synchronous=NORMAL")
+    conexion.execute("PRAGMA busy_timeout=30000")
+
+    with _init_lock:
+        if _inicializado_pid != os.getpid():
+            crear_esquema(conexion)
+            _inicializado_pid = os.getpid()
+
+    _local.conexion = conexion
+    _local.pid = os.getpid()
+    return conexion
+
+
+def _valor(valor: Any) -> Any:
+    """Adapta un valor de Python al formato guardado (igual que en los JSON)."""
+    if isinstance(valor, datetime):
+        return str(valor)
+    if isinstance(valor, bool):
+        return int(valor)
+    return valor
+
+
+def _literal(valor: Any) -> str:
+    """Literal SQL de un valor por defecto (para ALTER TABLE)."""
+    valor = _valor(valor)
+    if valor is None:
+        return "NULL"
+    if isinstance(valor, (int, float)):
+        return str(valor)
+    return "'" + str(valor).replace("'", "''") + "'"
+
+
+def insertar_filas(
+    conexion: sqlite3.Connection, tabla: str, filas: Iterable[dict[str, Any]]
+):
+    """Inserta (o reemplaza por ID) varias filas en una tabla."""
+    columnas = _columnas(tabla)
+    sql = (
+        f"INSERT OR REPLACE INTO {tabla} ({', '.join(columnas)}) "
+        f"VALUES ({', '.join('?' for _ in columnas)})"
+    )
+    conexion.executemany(
+        sql, ([_valor(fila.get(c)) for c in columnas] for fila in filas)
+    )
+
+
+def actualizar_fila(
+    conexion: sqlite3.Connection,
+    tabla: str,
+    fila_id: int,
+    cambios: dict[str, Any],
+    condicion: Optional[dict[str, Any]] = None,
+) -> bool:
+    """
+    Actualiza las columnas indicadas de una fila.
+
+    Con `condicion`, solo se actualiza si la fila tiene esos valores.
+
+    Returns:
+        Si la fila existía (y cumplía la condición)
+    """
+    condicion = condicion or {}
+    columnas = _columnas(tabla)
+    invalidas = (set(cambios) | set(condicion)) - set(columnas)
+    if invalidas:
+        raise ValueError(f"Columnas inválidas para {tabla}: {sorted(invalidas)}")
+    filtro = "".join(f" AND {c} = ?" for c in condicion)
+    valores_filtro = [fila_id] + [_valor(v) for v in condicion.values()]
+    if not cambios:
+        return (
+            conexion.execute(
+                f"SELECT 1 FROM {tabla} WHERE id = ?{filtro}", valores_filtro
+            ).fetchone()
+            is not None
+        )
+
+    asignaciones = ", ".join(f"{c} = ?" for c in cambios)
+    cursor = conexion.execute(
+        f"UPDATE {tabla} SET {asignaciones} WHERE id = ?{filtro}",
+        [_valor(v) for v in cambios.values()] + valores_filtro,
+    )
+    return cursor.rowcount > 0
+
+
+class SecuenciaSQLite(Secuencia):
+    """Secuencia persistida en la tabla `secuencias` de la base de datos."""
+
+    def __init__(self, tabla: str):
+        super().__init__()
+        self.tabla = tabla
+
+    def _reservar(self, cantidad: int) -> int:
+        conexion = get_conexion()
+        # BEGIN IMMEDIATE toma el bloqueo de escritura antes de leer
+        conexion.execute("BEGIN IMMEDIATE")
+        try:
+            fila = conexion.execute(
+                "SELECT siguiente FROM secuencias WHERE nombre = ?", (self.tabla,)
+            ).fetchone()
+            if fila is None:
+                inicio = conexion.execute(
+                    f"SELECT COALESCE(MAX(id), 0) + 1 FROM {self.tabla}"
+                ).fetchone()[0]
+            else:
+                inicio = fila[0]
+            conexion.execute(
+                "INSERT OR REPLACE INTO secuencias (nombre, siguiente) VALUES (?, ?)",
+                (self.tabla, inicio + cantidad),
+            )
+            conexion.execute("COMMIT")
+        except BaseException:
+            conexion.execute("ROLLBACK")
+            raise
+        return inicio
+
+
+secuencias = {tabla: SecuenciaSQLite(tabla) for tabla in TABLAS}
+
+
+def _guardar(tabla: str, registro: dict[str, Any]):
+    conexion = get_conexion()
+    with conexion:
+        insertar_filas(conexion, tabla, [registro])
+
+
+# Funciones para usuarios
+def get_next_usuario_id() -> int:
+    """Reserva el siguiente ID disponible para usuarios."""
+    return secuencias["usuarios"].siguiente()
+
+
+def get_next_usuario_ids(cantidad: int) -> range:
+    """Reserva `cantidad` IDs consecutivos para usuarios."""
+    inicio = secuencias["usuarios"].reservar(cantidad)
+    return range(inicio, inicio + cantidad)
+
+
+def get_emails_registrados(emails: Iterable[str]) -> set[str]:
+    """De los emails dados, los que ya tienen usuario (en minúsculas)."""
+    buscados = list({e.lower() for e in emails})
+    conexion = get_conexion()
+    registrados = set()
+    for inicio in range(0, len(buscados), MAX_PARAMETROS):
+        lote = buscados[inicio : inicio + MAX_PARAMETROS]
+        marcadores = ", ".join("?" * len(lote))
+        registrados.update(
+            email
+            for (email,) in conexion.execute(
+                f"SELECT lower(email) FROM usuarios WHERE lower(email) IN ({marcadores})",
+                lote,
+            )
+        )
+    return registrados
+
+
+def get_usuario_by_email(email: str) -> Optional[UsuarioDB]:
+    """Busca un usuario por email (sin distinguir mayúsculas)."""
+    fila = (
+        get_conexion()
+        .execute(
+            "SELECT * FROM usuarios WHERE lower(email) = lower(?) LIMIT 1", (email,)
+        )
+        .fetchone()
+    )
+    return construir_confiable(UsuarioDB, fila) if fila else None
+
+
+def get_usuario_by_id(user_id: int) -> Optional[UsuarioDB]:
+    """Busca un usuario por ID."""
+    fila = (
+        get_conexion()
+        .execute("SELECT * FROM usuarios WHERE id = ?", (user_id,))
+        .fetchone()
+    )
+    return construir_confiable(UsuarioDB, fila) if fila else None
+
+
+def get_usuario_indexado(user_id: int) -> Optional[UsuarioRespuesta]:
+    """
+    SQLite ya comparte los datos entre workers sin cargarlos en cada uno, así
+    que no hay un índice aparte: siempre retorna None.
+    """
+    return None
+
+
+def save_usuario(usuario: UsuarioDB):
+    """Guarda un usuario en la base de datos."""
+    _guardar("usuarios", usuario.model_dump())
+
+
+def save_usuarios(usuarios: list[UsuarioDB]):
+    """Guarda varios usuarios en una sola transacción."""
+    conexion = get_conexion()
+    with conexion:
+        insertar_filas(conexion, "usuarios", (u.model_dump() for u in usuarios))
+
+
+def update_usuario(user_id: int, updates: dict[str, Any]):
+    """Actualiza un usuario con los datos proporcionados."""
+    try:
+        conexion = get_conexion()
+        with conexion:
+            return actualizar_fila(conexion, "usuarios", user_id, updates)
+    except Exception as e:
+        print(f"Error al actualizar usuario: {e}")
+        return False
+    finally:
+        invalidar_usuario(user_id)
+
+
+# Funciones para torneos
+def get_next_torneo_id() -> int:
+    """Reserva el siguiente ID disponible para torneos."""
+    return secuencias["torneos"].siguiente()
+
+
+def get_torneo_by_id(torneo_id: int) -> Optional[TorneoDB]:
+    """Busca un torneo por ID."""
+    fila = (
+        get_conexion()
+        .execute("SELECT * FROM torneos WHERE id = ?", (torneo_id,))
+        .fetchone()
+    )
+    return TorneoDB(**fila) if fila else None
+
+
+def get_torneos() -> list[TorneoDB]:
+    """Obtiene todos los torneos."""
+    return [TorneoDB(**f) for f in get_conexion().execute("SELECT * FROM torneos")]
+
+
+def get_torneos_pagina(
+    despues: int, limite: int, organizador_id: Optional[int] = None
+) -> list[TorneoDB]:
+    """Obtiene hasta `limite` torneos con ID mayor que `despues`, en orden de ID."""
+    if organizador_id is None:
+        filas = get_conexion().execute(
+            "SELECT * FROM torneos WHERE id > ? ORDER BY id LIMIT ?",
+            (despues, limite),
+        )
+    else:
+        filas = get_conexion().execute(
+            "SELECT * FROM torneos WHERE organizador_id = ? AND id > ? "
+            "ORDER BY id LIMIT ?",
+            (organizador_id, despues, limite),
+        )
+    return [TorneoDB(**f) for f in filas]
+
+
+def get_torneos_by_organizador(organizador_id: int) -> list[TorneoDB]:
+    """Obtiene todos los torneos de un organizador."""
+    filas = get_conexion().execute(
+        "SELECT * FROM torneos WHERE organizador_id = ? ORDER BY id", (organizador_id,)
+    )
+    return [TorneoDB(**f) for f in filas]
+
+
+def save_torneo(torneo: TorneoDB):
+    """Guarda un torneo en la base de datos."""
+    _guardar("torneos", torneo.model_dump())
+
+
+def update_torneo(
+    torneo_id: int, updates: dict[str, Any], estado: Optional[str] = None
+):
+    """
+    Actualiza un torneo con los datos proporcionados.
+
+    Si se indica `estado`, solo se actualiza si el torneo sigue en ese
+    estado, comprobándolo en la misma sentencia UPDATE.
+    """
+    try:
+        conexion = get_conexion()
+        condicion = None if estado is None else {"estado": estado}
+        with conexion:
+            return actualizar_fila(conexion, "torneos", torneo_id, updates, condicion)
+    except Exception as e:
+        print(f"Error al actualizar torneo: {e}")
+        return False
+
+
+# Funciones para inscripciones
+def get_next_inscripcion_id() -> int:
+    """Reserva el siguiente ID disponible para inscripciones."""
+    return secuencias["inscripciones"].siguiente()
+
+
+def get_inscripcion_by_id(inscripcion_id: int) -> Optional[InscripcionDB]:
+    """Busca una inscripción por ID."""
+    fila = (
+        get_conexion()
+        .execute("SELECT * FROM inscripciones WHERE id = ?", (inscripcion_id,))
+        .fetchone()
+    )
+    return InscripcionDB(**fila) if fila else None
+
+
+def get_inscripciones_by_usuario(user_id: int) -> list[InscripcionDB]:
+    """Obtiene todas las inscripciones de un usuario."""
+    filas = get_conexion().execute(
+        "SELECT * FROM inscripciones WHERE usuario_id = ? ORDER BY id", (user_id,)
+    )
+    return [InscripcionDB(**f) for f in filas]
+
+
+def get_inscripciones_by_torneo(torneo_id: int) -> list[InscripcionDB]:
+    """Obtiene todas las inscripciones de un torneo."""
+    filas = get_conexion().execute(
+        "SELECT * FROM inscripciones WHERE torneo_id = ? ORDER BY id", (torneo_id,)
+    )
+    return [InscripcionDB(**f) for f in filas]
+
+
+def get_inscripciones_pagina(
+    torneo_id: int, despues: int, limite: int
+) -> list[InscripcionDB]:
+    """Obtiene hasta `limite` inscripciones de un torneo con ID mayor que `despues`."""
+    filas = get_conexion().execute(
+        "SELECT * FROM inscripciones WHERE torneo_id = ? AND id > ? "
+        "ORDER BY id LIMIT ?",
+        (torneo_id, despues, limite),
+    )
+    return [InscripcionDB(**f) for f in filas]
+
+
+def save_inscripcion(inscripcion: InscripcionDB):
+    """Guarda una inscripción en la base de datos."""
+    _guardar("inscripciones", inscripcion.model_dump())
+
+
+def _actualizar_varios(tabla: str, cambios: dict[int, dict[str, Any]]) -> bool:
+    conexion = get_conexion()
+    with conexion:
+        resultados = [
+            actualizar_fila(conexion, tabla, fila_id, campos)
+            for fila_id, campos in cambios.items()
+        ]
+    return all(resultados)
+
+
+def update_inscripciones(cambios: dict[int, dict[str, Any]]) -> bool:
+    """Actualiza varias inscripciones (por ID) en una sola transacción."""
+    return _actualizar_varios("inscripciones", cambios)
+
+
+# Funciones para partidas
+def get_next_partida_id() -> int:
+    """Reserva el siguiente ID disponible para partidas."""
+    return secuencias["partidas"].siguiente()
+
+
+def get_partida_by_id(partida_id: int) -> Optional[PartidaDB]:
+    """Busca una partida por ID."""
+    fila = (
+        get_conexion()
+        .execute("SELECT * FROM partidas WHERE id = ?", (partida_id,))
+        .fetchone()
+    )
+    return PartidaDB(**fila) if fila else None
+
+
+def get_partidas_by_torneo(torneo_id: int) -> list[PartidaDB]:
+    """Obtiene todas las partidas de un torneo."""
+    filas = get_conexion().execute(
+        "SELECT * FROM partidas WHERE torneo_id = ? ORDER BY id", (torneo_id,)
+    )
+    return [PartidaDB(**f) for f in filas]
+
+
+def get_partidas_pagina(torneo_id: int, despues: int, limite: int) -> list[PartidaDB]:
+    """Obtiene hasta `limite` partidas de un torneo con ID mayor que `despues`."""
+    filas = get_conexion().execute(
+        "SELECT * FROM partidas WHERE torneo_id = ? AND id > ? ORDER BY id LIMIT ?",
+        (torneo_id, despues, limite),
+    )
+    return [PartidaDB(**f) for f in filas]
+
+
+def iterar_partidas() -> Iterator[PartidaDB]:
+    """Recorre todas las partidas, en orden de ID, sin cargarlas todas en memoria."""
+    for fila in get_conexion().execute("SELECT * FROM partidas ORDER BY id"):
+        yield PartidaDB(**fila)
+
+
+def save_partida(partida: PartidaDB):
+    """Guarda una partida en la base de datos."""
+    _guardar("partidas", partida.model_dump())
+
+
+def save_partidas(partidas: list[PartidaDB]):
+    """Guarda varias partidas en una sola transacción."""
+    conexion = get_conexion()
+    with conexion:
+        insertar_filas(conexion, "partidas", (p.model_dump() for p in partidas))
+
+
+def update_partidas(cambios: dict[int, dict[str, Any]]) -> bool:
+    """Actualiza varias partidas (por ID) en una sola transacción."""
+    return _actualizar_varios("partidas", cambios)
+
+
+# Funciones para ratings
+def get_next_rating_id() -> int:
+    """Reserva el siguiente ID disponible para ratings."""
+    return secuencias["ratings"].siguiente()
+
+
+def get_ratings_by_usuario(user_id: int) -> list[RatingDB]:
+    """Obtiene todos los ratings de un usuario."""
+    filas = get_conexion().execute(
+        "SELECT * FROM ratings WHERE usuario_id = ? ORDER BY id", (user_id,)
+    )
+    return [RatingDB(**f) for f in filas]
+
+
+def iterar_ratings() -> Iterator[RatingDB]:
+    """Recorre todos los ratings, en orden de ID, sin cargarlos todos en memoria."""
+    for fila in get_conexion().execute("SELECT * FROM ratings ORDER BY id"):
+        yield RatingDB(**fila)
+
+
+def save_rating(rating: RatingDB):
+    """Guarda un rating en la base de datos."""
+    _guardar("ratings", rating.model_dump())
+
+
+def save_ratings(ratings: list[RatingDB]):
+    """Guarda varios ratings en una sola transacción."""
+    conexion = get_conexion()
+    with conexion:
+        insertar_filas(conexion, "ratings", (r.model_dump() for r in ratings))
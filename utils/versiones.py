@@ -0,0 +1,169 @@
+"""
+Contadores de versión de las colecciones, compartidos entre workers.
+
+Cada save_*/update_* incrementa los contadores de lo que modifica:
+
+- ("usuarios",), ("torneos",) y ("ratings",): la colección entera
+- ("torneo", torneo_id): un torneo
+- ("inscripciones", torneo_id) y ("partidas", torneo_id): las inscripciones
+  y las partidas de un torneo
+
+Con ellos las rutas de lectura arman un ETag sin leer el almacenamiento, así
+un If-None-Match que coincide se responde con 304 sin cargar ni serializar
+nada.
+
+Los contadores viven en un archivo mapeado en memoria: leerlos no bloquea ni
+hace llamadas al sistema, e incrementarlos toma el bloqueo del archivo para
+que dos workers no pierdan incrementos. Cada clave cae en una de
+VERSIONES_CASILLAS casillas según su hash; si dos claves comparten casilla,
+solo se invalidan de más. El archivo empieza con una época aleatoria que
+forma parte de los ETags: si se borra, los ETags anteriores dejan de
+coincidir aunque los contadores vuelvan a cero.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from functools import lru_cache, wraps
+from typing import Any, Callable, Hashable, Iterable, Optional, TypeVar
+
+from constants import VERSIONES_CASILLAS, VERSIONES_PATH
+
+from .bloqueo import bloqueo_archivo, escribir_atomico
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+Clave = tuple[Hashable, ...]
+
+CONTADOR = struct.Struct("<Q")
+
+
+@lru_cache(maxsize=4096)
+def _casilla(clave: Clave, casillas: int) -> int:
+    """Casilla de una clave, igual en todos los procesos (la 0 es la época)."""
+    digest = hashlib.blake2b(repr(clave).encode("utf-8"), digest_size=8).digest()
+    return 1 + int.from_bytes(digest, "little") % casillas
+
+
+class VersionesCompartidas:
+    """Contadores de versión en un archivo mapeado en memoria."""
+
+    def __init__(self, file_path: str, casillas: int):
+        """
+        Args:
+            file_path: Archivo de los contadores (se crea si no existe)
+            casillas: Cantidad de contadores del archivo
+        """
+        self.file_path = file_path
+        self.casillas = casillas
+        self._tamano = CONTADOR.size * (casillas + 1)
+        self._mapa: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+        # Incrementos hechos por este proceso, por casilla
+        self._propios: dict[int, int] = {}
+
+    def _abrir(self) -> mmap.mmap:
+        if self._mapa is not None:
+            return self._mapa
+        with self._lock:
+            if self._mapa is None:
+                with bloqueo_archivo(self.file_path):
+                    if (
+                        not os.path.exists(self.file_path)
+                        or os.path.getsize(self.file_path) != self._tamano
+                    ):
+                        epoca = int.from_bytes(os.urandom(8), "little")
+                        escribir_atomico(
+                            self.file_path,
+                            CONTADOR.pack(epoca) + bytes(self._tamano - CONTADOR.size),
+                        )
+                    with open(self.file_path, "r+b") as f:
+                        self._mapa = mmap.mmap(f.fileno(), self._tamano)
+        return self._mapa
+
+    def _offsets(self, claves: Iterable[Clave]) -> list[int]:
+        casillas = {_casilla(clave, self.casillas) for clave in claves}
+        return [CONTADOR.size * casilla for casilla in sorted(casillas)]
+
+    def leer(self, *claves: Clave) -> tuple[int, ...]:
+        """Versiones actuales de las claves, en orden."""
+        mapa = self._abrir()
+        offsets = [CONTADOR.size * _casilla(clave, self.casillas) for clave in claves]
+        return tuple(CONTADOR.unpack_from(mapa, offset)[0] for offset in offsets)
+
+    def ajenas(self, *claves: Clave) -> tuple[int, ...]:
+        """
+        Versiones de las claves sin contar los incrementos de este proceso.
+
+        Sirve a las estructuras en memoria que ya aplican las escrituras de
+        su propio proceso y solo deben reconstruirse ante las de otro worker.
+        """
+        with self._lock:
+            propios = [
+                self._propios.get(_casilla(clave, self.casillas), 0) for clave in claves
+            ]
+        return tuple(
+            version - propio for version, propio in zip(self.leer(*claves), propios)
+        )
+
+    def incrementar(self, *claves: Clave):
+        """Incrementa la versión de las claves en todos los workers."""
+        offsets = self._offsets(claves)
+        if not offsets:
+            return
+        mapa = self._abrir()
+        with self._lock, bloqueo_archivo(self.file_path):
+            for offset in offsets:
+                (version,) = CONTADOR.unpack_from(mapa, offset)
+                CONTADOR.pack_into(mapa, offset, version + 1)
+                casilla = offset // CONTADOR.size
+                self._propios[casilla] = self._propios.get(casilla, 0) + 1
+            mapa.flush()
+
+    def etag(self, claves: Iterable[Clave], variante: str = "") -> str:
+        """
+        ETag fuerte de una respuesta que depende de las claves.
+
+        Args:
+            claves: Lo que lee la respuesta
+            variante: Lo que distingue a la respuesta de otras que leen lo
+                mismo (ruta, parámetros, formato)
+        """
+        claves = tuple(claves)
+        mapa = self._abrir()
+        (epoca,) = CONTADOR.unpack_from(mapa, 0)
+        firma = repr((epoca, self.leer(*claves), variante)).encode("utf-8")
+        return '"' + hashlib.blake2b(firma, digest_size=12).hexdigest() + '"'
+
+
+versiones = VersionesCompartidas(VERSIONES_PATH, VERSIONES_CASILLAS)
+
+
+def versionar(claves: Callable[..., Iterable[Clave]]) -> Callable[[F], F]:
+    """
+    Decorador que incrementa las versiones de lo que modifica una escritura.
+
+    Se incrementan antes y después de escribir: un ETag calculado mientras
+    la escritura está en curso (con los datos viejos o con los nuevos) ya no
+    coincide una vez que termina.
+
+    Args:
+        claves: Función que recibe los mismos argumentos que la escritura y
+            retorna las claves que modifica
+    """
+
+    def decorador(funcion: F) -> F:
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            modificadas = list(claves(*args, **kwargs))
+            versiones.incrementar(*modificadas)
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                versiones.incrementar(*modificadas)
+
+        return envoltura  # type: ignore[return-value]
+
+    return decorador